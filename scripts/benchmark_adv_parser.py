@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Benchmark advertisement parsing.
+
+Feeds a stream of distinct advertisements (more than the parser cache
+can hold, like a busy RF area) through parse_advertisement_data and
+prints the average cost per advertisement, then the cost of feeding
+the parsed advertisements to devices.
+"""
+import sys
+import timeit
+import tracemalloc
+
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+from switchbot.adv_parser import (
+    get_parse_cache,
+    parse_advertisement_data,
+    parse_advertisements_bulk,
+    set_parsed_records,
+)
+from switchbot.devices.device import SwitchbotDevice
+
+SERVICE_UUID = "0000fd3d-0000-1000-8000-00805f9b34fb"
+
+# (manufacturer_data, service_data) templates, byte 6 of the manufacturer
+# data is replaced with a rolling sequence number.
+TEMPLATES = [
+    ({2409: b"\xe7\xabF\xac\x8f\x92|\x0f\x00\x11\x04"}, {SERVICE_UUID: b"c\xc0X\x00\x11\x04"}),
+    ({2409: b"\xd7\xc1}]\xebC\xde\x03\x06\x985"}, {SERVICE_UUID: b"T\x00\xe4\x06\x985"}),
+    ({2409: b"\xaa\xbb\xcc\xdd\xee\xff\xe0\x0f\x06\x985\x00"}, {SERVICE_UUID: b"w\x00\xe4"}),
+    ({2409: b"\xc0!\x9a\xe8\xbcIj\x1c\x00f"}, {SERVICE_UUID: b"s\x00\xe2\x00f\x01"}),
+    ({2409: b"\xcb9\xcd\xc4=FA,\x00F\x01\x8f\xc4"}, {}),
+    ({2409: b"\x84\xf7\x03\xb4\xcbz\x03\xe4!\x00\x00"}, {SERVICE_UUID: b"u\x00d"}),
+    ({2409: b"`U\xf9(\xe5\x96\x00\x80\x00\x00\x11\x00"}, {SERVICE_UUID: b"g\x00\x00"}),
+    ({741: b"\xac\xa2\x1a\x8a\xec\xd0"}, {SERVICE_UUID: b"e\x80\x00\xf9\x80Bc\x00"}),
+]
+
+
+def build_stream(count: int) -> list[tuple[BLEDevice, AdvertisementData]]:
+    """Build a stream of distinct advertisements."""
+    stream = []
+    for idx in range(count):
+        mfr_template, service_data = TEMPLATES[idx % len(TEMPLATES)]
+        manufacturer_data = {}
+        for mfr_id, payload in mfr_template.items():
+            if len(payload) > 6:
+                payload = payload[:6] + bytes([(idx // len(TEMPLATES)) & 0xFF]) + payload[7:]
+            manufacturer_data[mfr_id] = payload
+        address = f"AA:BB:CC:DD:EE:{idx % 256:02X}"
+        stream.append(
+            (
+                BLEDevice(address=address, name=None, details=None),
+                AdvertisementData(
+                    local_name=None,
+                    manufacturer_data=manufacturer_data,
+                    service_data=service_data,
+                    service_uuids=[],
+                    tx_power=-127,
+                    rssi=-60,
+                    platform_data=((),),
+                ),
+            )
+        )
+    return stream
+
+
+def bench_parse(stream: list[tuple[BLEDevice, AdvertisementData]], repeat: int) -> float:
+    """Return the best average parse time per advertisement in microseconds."""
+
+    def _run() -> None:
+        for device, advertisement_data in stream:
+            parse_advertisement_data(device, advertisement_data)
+
+    best = min(timeit.repeat(_run, number=1, repeat=repeat))
+    return best / len(stream) * 1e6
+
+
+def bench_bulk(stream: list[tuple[BLEDevice, AdvertisementData]], repeat: int) -> float:
+    """Return the best average bulk parse time per advertisement in microseconds."""
+    records = [
+        (
+            device.address,
+            advertisement_data.service_data,
+            advertisement_data.manufacturer_data,
+            advertisement_data.rssi,
+        )
+        for device, advertisement_data in stream
+    ]
+
+    def _run() -> None:
+        for _ in parse_advertisements_bulk(records):
+            pass
+
+    best = min(timeit.repeat(_run, number=1, repeat=repeat))
+    return best / len(records) * 1e6
+
+
+def bench_device_updates(
+    stream: list[tuple[BLEDevice, AdvertisementData]], repeat: int
+) -> float:
+    """Return the best average device update time per advertisement in microseconds."""
+    advertisements = [
+        parsed
+        for device, advertisement_data in stream
+        if (parsed := parse_advertisement_data(device, advertisement_data))
+    ]
+    devices = {
+        advertisement.address: SwitchbotDevice(advertisement.device)
+        for advertisement in advertisements
+    }
+
+    def _run() -> None:
+        for advertisement in advertisements:
+            devices[advertisement.address].update_from_advertisement(advertisement)
+
+    best = min(timeit.repeat(_run, number=1, repeat=repeat))
+    return best / len(advertisements) * 1e6
+
+
+def bench_memory(stream: list[tuple[BLEDevice, AdvertisementData]]) -> float:
+    """Return the heap held by the parsed advertisements in bytes per advertisement."""
+    get_parse_cache().clear()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    results = [
+        parse_advertisement_data(device, advertisement_data)
+        for device, advertisement_data in stream
+    ]
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    get_parse_cache().clear()
+    return retained / len(results)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    stream = build_stream(count)
+    print(f"parse_advertisement_data: {bench_parse(stream, 20):.2f} us/advertisement")
+    print(f"parse_advertisements_bulk: {bench_bulk(stream, 20):.2f} us/advertisement")
+    print(f"device updates: {bench_device_updates(stream, 20):.2f} us/advertisement")
+    print(f"heap with dicts: {bench_memory(stream):.0f} bytes/advertisement")
+    set_parsed_records(True)
+    print(f"heap with parsed records: {bench_memory(stream):.0f} bytes/advertisement")
+    print(f"parse with parsed records: {bench_parse(stream, 20):.2f} us/advertisement")
+    print(
+        "device updates with parsed records: "
+        f"{bench_device_updates(stream, 20):.2f} us/advertisement"
+    )
+    set_parsed_records(False)
+
+
+if __name__ == "__main__":
+    main()
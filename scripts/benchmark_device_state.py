@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark applying advertisements to device state.
+
+Replays advertisement streams to devices the way a scanner callback
+does and prints the average cost per advertisement:
+
+- repeated: every device hears the same advertisement over and over,
+  like a sensor whose readings did not change
+- rolling: every advertisement carries a new sequence number or
+  reading, so the device data changes every time
+"""
+import sys
+import timeit
+
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+from switchbot.adv_parser import parse_advertisement_data, set_parsed_records
+from switchbot.devices.device import SwitchbotDevice
+from switchbot.models import SwitchBotAdvertisement
+
+SERVICE_UUID = "0000fd3d-0000-1000-8000-00805f9b34fb"
+
+# (manufacturer_data, service_data) templates of a bot, a meter, an
+# indoor/outdoor meter, a motion sensor and a plug mini
+TEMPLATES = [
+    ({2409: b"\xe7\xabF\xac\x8f\x92|\x0f\x00\x11\x04"}, {SERVICE_UUID: b"H\x10\xe1"}),
+    ({2409: b"\xd7\xc1}]\xebC\xde\x03\x06\x985"}, {SERVICE_UUID: b"T\x00\xe4\x06\x985"}),
+    ({2409: b"\xaa\xbb\xcc\xdd\xee\xff\xe0\x0f\x06\x985\x00"}, {SERVICE_UUID: b"w\x00\xe4"}),
+    ({2409: b"\xc0!\x9a\xe8\xbcIj\x1c\x00f"}, {SERVICE_UUID: b"s\x00\xe2\x00f\x01"}),
+    ({2409: b"\xcb9\xcd\xc4=FA,\x00F\x01\x8f\xc4"}, {}),
+]
+
+DEVICES = 100
+
+
+def build_stream(count: int, rolling: bool) -> list[SwitchBotAdvertisement]:
+    """Parse a stream of advertisements of DEVICES devices."""
+    stream = []
+    for idx in range(count):
+        mfr_template, service_data = TEMPLATES[idx % len(TEMPLATES)]
+        sequence = (idx // DEVICES) & 0xFF if rolling else 0
+        manufacturer_data = {
+            mfr_id: payload[:8] + bytes([sequence]) + payload[9:]
+            for mfr_id, payload in mfr_template.items()
+        }
+        address = f"AA:BB:CC:DD:{(idx % DEVICES) // 256:02X}:{idx % DEVICES % 256:02X}"
+        advertisement = parse_advertisement_data(
+            BLEDevice(address=address, name=None, details=None),
+            AdvertisementData(
+                local_name=None,
+                manufacturer_data=manufacturer_data,
+                service_data=service_data,
+                service_uuids=[],
+                tx_power=-127,
+                rssi=-60,
+                platform_data=((),),
+            ),
+        )
+        if advertisement:
+            stream.append(advertisement)
+    return stream
+
+
+def bench(stream: list[SwitchBotAdvertisement], repeat: int) -> float:
+    """Return the best average update time per advertisement in microseconds."""
+    devices = {
+        advertisement.address: SwitchbotDevice(advertisement.device)
+        for advertisement in stream
+    }
+    for advertisement in stream:
+        devices[advertisement.address].update_from_advertisement(advertisement)
+
+    def _run() -> None:
+        for advertisement in stream:
+            devices[advertisement.address].update_from_advertisement(advertisement)
+
+    best = min(timeit.repeat(_run, number=1, repeat=repeat))
+    return best / len(stream) * 1e6
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    for records in (False, True):
+        set_parsed_records(records)
+        kind = "parsed records" if records else "dicts"
+        for rolling in (False, True):
+            name = "rolling" if rolling else "repeated"
+            stream = build_stream(count, rolling)
+            print(f"{name} with {kind}: {bench(stream, 20):.2f} us/advertisement")
+    set_parsed_records(False)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,11 @@ setup(
         "boto3>=1.20.24",
         "requests>=2.28.1",
     ],
+    extras_require={
+        "numpy": ["numpy>=1.21.0"],
+    },
     version="0.44.1",
+    python_requires=">=3.10",
     description="A library to communicate with Switchbot",
     author="Daniel Hjelseth Hoyer",
     url="https://github.com/Danielhiversen/pySwitchbot/",
@@ -7,7 +7,17 @@ from bleak_retry_connector import (
     get_device,
 )
 
-from .adv_parser import SwitchbotSupportedType, parse_advertisement_data
+from .adv_parser import (
+    UNCHANGED,
+    AdvertisementDeduplicator,
+    SwitchbotSupportedType,
+    get_parse_cache,
+    parse_advertisement_data,
+    parse_advertisements_bulk,
+    set_parse_cache,
+    set_parsed_records,
+)
+from .callbacks import BatchedCallback
 from .const import (
     LockStatus,
     SwitchbotAccountConnectionError,
@@ -25,15 +35,80 @@ from .devices.humidifier import SwitchbotHumidifier
 from .devices.light_strip import SwitchbotLightStrip
 from .devices.lock import SwitchbotLock
 from .devices.plug import SwitchbotPlugMini
-from .discovery import GetSwitchbotDevices
-from .models import SwitchBotAdvertisement
+from .discovery import GetSwitchbotDevices, SwitchbotScanner
+from .fleet import FleetCommand, FleetController, FleetResult
+from .gatt_cache import (
+    CharacteristicHandles,
+    GattHandleCache,
+    get_gatt_handle_cache,
+    set_gatt_handle_cache,
+)
+from .metrics import DeviceMetrics, Histogram, format_prometheus
+from .models import (
+    DeviceDataChanged,
+    FieldChange,
+    ParsedRecord,
+    SwitchBotAdvertisement,
+)
+from .parse_cache import (
+    LRUParseCache,
+    ParseCache,
+    ParseCacheStats,
+    PerAddressParseCache,
+    TTLParseCache,
+)
+from .policies import AdaptiveTimeout, KeepAlivePolicy, RetryAction, RetryPolicy
+from .registry import SwitchbotDeviceRegistry
+from .scheduler import (
+    ConnectionPriority,
+    ConnectionScheduler,
+    ConnectionSchedulerStats,
+    get_connection_scheduler,
+    set_connection_scheduler,
+)
 
 __all__ = [
     "get_device",
     "close_stale_connections",
     "close_stale_connections_by_address",
     "parse_advertisement_data",
+    "parse_advertisements_bulk",
+    "set_parsed_records",
+    "ParsedRecord",
+    "AdvertisementDeduplicator",
+    "UNCHANGED",
+    "get_parse_cache",
+    "set_parse_cache",
+    "ParseCache",
+    "ParseCacheStats",
+    "LRUParseCache",
+    "PerAddressParseCache",
+    "TTLParseCache",
     "GetSwitchbotDevices",
+    "SwitchbotScanner",
+    "SwitchbotDeviceRegistry",
+    "AdaptiveTimeout",
+    "KeepAlivePolicy",
+    "RetryAction",
+    "RetryPolicy",
+    "ConnectionPriority",
+    "ConnectionScheduler",
+    "ConnectionSchedulerStats",
+    "get_connection_scheduler",
+    "set_connection_scheduler",
+    "CharacteristicHandles",
+    "GattHandleCache",
+    "get_gatt_handle_cache",
+    "set_gatt_handle_cache",
+    "DeviceMetrics",
+    "Histogram",
+    "format_prometheus",
+    "FleetCommand",
+    "FleetController",
+    "FleetResult",
+    "BatchedCallback",
+    "DeviceDataChanged",
+    "FieldChange",
     "SwitchBotAdvertisement",
     "SwitchbotAccountConnectionError",
     "SwitchbotAuthenticationError",
@@ -2,27 +2,29 @@
 from __future__ import annotations
 
 import logging
-from collections.abc import Callable
-from functools import lru_cache
-from typing import Any, TypedDict
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from itertools import islice
+from typing import Any, Final, TypedDict
 
 from bleak.backends.device import BLEDevice
 from bleak.backends.scanner import AdvertisementData
 
-from .adv_parsers.blind_tilt import process_woblindtilt
-from .adv_parsers.bot import process_wohand
-from .adv_parsers.bulb import process_color_bulb
-from .adv_parsers.ceiling_light import process_woceiling
-from .adv_parsers.contact import process_wocontact
-from .adv_parsers.curtain import process_wocurtain
-from .adv_parsers.humidifier import process_wohumidifier
-from .adv_parsers.light_strip import process_wostrip
-from .adv_parsers.lock import process_wolock
-from .adv_parsers.meter import process_wosensorth
-from .adv_parsers.motion import process_wopresence
-from .adv_parsers.plug import process_woplugmini
+from .adv_parsers.blind_tilt import WoBlindTiltRecord, process_woblindtilt
+from .adv_parsers.bot import WoHandRecord, process_wohand
+from .adv_parsers.bulb import WoBulbRecord, process_color_bulb
+from .adv_parsers.ceiling_light import WoCeilingRecord, process_woceiling
+from .adv_parsers.contact import WoContactRecord, process_wocontact
+from .adv_parsers.curtain import WoCurtainRecord, process_wocurtain
+from .adv_parsers.humidifier import WoHumiRecord, process_wohumidifier
+from .adv_parsers.light_strip import WoStripRecord, process_wostrip
+from .adv_parsers.lock import WoLockRecord, process_wolock
+from .adv_parsers.meter import WoSensorTHRecord, process_wosensorth
+from .adv_parsers.motion import WoPresenceRecord, process_wopresence
+from .adv_parsers.plug import WoPlugMiniRecord, process_woplugmini
 from .const import SwitchbotModel
-from .models import SwitchBotAdvertisement
+from .models import ParsedRecord, SwitchBotAdvertisement
+from .parse_cache import MISSING, LRUParseCache, ParseCache
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,6 +34,11 @@ SERVICE_DATA_ORDER = (
 )
 MFR_DATA_ORDER = (2409, 741, 89)
 
+# Leading manufacturer data bytes that no parser reads. For 2409 these
+# are the MAC address of the device so they are left out of the parse
+# cache key, which lets devices in the same state share an entry.
+MFR_DATA_KEY_OFFSET = {2409: 6}
+
 
 class SwitchbotSupportedType(TypedDict):
     """Supported type of Switchbot."""
@@ -165,12 +172,66 @@ for model_chr, model in SUPPORTED_TYPES.items():
         MODELS_BY_MANUFACTURER_DATA[mfr_id].append((model_chr, model))
 
 
-def parse_advertisement_data(
-    device: BLEDevice,
+def _build_model_byte_table() -> tuple[tuple[str, bool], ...]:
+    """Build the lookup table of the first service data byte.
+
+    The lower 7 bits of the byte are the model char and the high bit
+    flags encrypted advertisements.
+    """
+    return tuple(
+        (chr(model_byte & 0b01111111), bool(model_byte & 0b10000000))
+        for model_byte in range(256)
+    )
+
+
+def _build_manufacturer_data_index() -> dict[tuple[int, int], str]:
+    """Build the (manufacturer id, data length) to model char index."""
+    index: dict[tuple[int, int], str] = {}
+    for mfr_id, models in MODELS_BY_MANUFACTURER_DATA.items():
+        for model_chr, model_data in models:
+            if (length := model_data.get("manufacturer_data_length")) is not None:
+                index.setdefault((mfr_id, length), model_chr)
+    return index
+
+
+_MODEL_BYTE_TABLE = _build_model_byte_table()
+_MODEL_BY_MANUFACTURER_DATA_LENGTH = _build_manufacturer_data_index()
+
+RECORDS_BY_PARSER: dict[Callable[..., dict[str, Any]], type[ParsedRecord]] = {
+    process_color_bulb: WoBulbRecord,
+    process_woblindtilt: WoBlindTiltRecord,
+    process_woceiling: WoCeilingRecord,
+    process_wocontact: WoContactRecord,
+    process_wocurtain: WoCurtainRecord,
+    process_wohand: WoHandRecord,
+    process_wohumidifier: WoHumiRecord,
+    process_wolock: WoLockRecord,
+    process_woplugmini: WoPlugMiniRecord,
+    process_wopresence: WoPresenceRecord,
+    process_wosensorth: WoSensorTHRecord,
+    process_wostrip: WoStripRecord,
+}
+
+_USE_PARSED_RECORDS = False
+
+
+def set_parsed_records(enabled: bool) -> None:
+    """Enable or disable returning ParsedRecord objects as parsed data.
+
+    When enabled the "data" of every parsed advertisement is an immutable,
+    slotted record per model instead of a dict. Records are read-only
+    mappings, so code reading the data like a dict keeps working.
+    """
+    global _USE_PARSED_RECORDS
+    if enabled != _USE_PARSED_RECORDS:
+        _USE_PARSED_RECORDS = enabled
+        _PARSE_CACHE.clear()
+
+
+def _get_payloads(
     advertisement_data: AdvertisementData,
-    model: SwitchbotModel | None = None,
-) -> SwitchBotAdvertisement | None:
-    """Parse advertisement data."""
+) -> tuple[bytes | None, int | None, bytes | None]:
+    """Return the Switchbot service data and manufacturer id and data."""
     service_data = advertisement_data.service_data
 
     _service_data = None
@@ -181,22 +242,51 @@ def parse_advertisement_data(
 
     _mfr_data = None
     _mfr_id = None
+    manufacturer_data = advertisement_data.manufacturer_data
     for mfr_id in MFR_DATA_ORDER:
-        if mfr_id in advertisement_data.manufacturer_data:
+        if mfr_id in manufacturer_data:
             _mfr_id = mfr_id
-            _mfr_data = advertisement_data.manufacturer_data[mfr_id]
+            _mfr_data = manufacturer_data[mfr_id]
             break
 
+    return _service_data, _mfr_id, _mfr_data
+
+
+def parse_advertisement_data(
+    device: BLEDevice,
+    advertisement_data: AdvertisementData,
+    model: SwitchbotModel | None = None,
+) -> SwitchBotAdvertisement | None:
+    """Parse advertisement data."""
+    _service_data, _mfr_id, _mfr_data = _get_payloads(advertisement_data)
+    return _parse_payloads(
+        device, advertisement_data, _service_data, _mfr_id, _mfr_data, model
+    )
+
+
+def _parse_payloads(
+    device: BLEDevice,
+    advertisement_data: AdvertisementData,
+    _service_data: bytes | None,
+    _mfr_id: int | None,
+    _mfr_data: bytes | None,
+    model: SwitchbotModel | None,
+) -> SwitchBotAdvertisement | None:
+    """Parse the Switchbot payloads of an advertisement."""
     if _mfr_data is None and _service_data is None:
         return None
 
+    # The cache key leaves out manufacturer data bytes no parser reads
+    if _mfr_data is not None and (offset := MFR_DATA_KEY_OFFSET.get(_mfr_id)):
+        key = (_service_data, _mfr_id, len(_mfr_data), _mfr_data[offset:], model)
+    else:
+        key = (_service_data, _mfr_id, None, _mfr_data, model)
+
+    cache = _PARSE_CACHE
     try:
-        data = _parse_data(
-            _service_data,
-            _mfr_data,
-            _mfr_id,
-            model,
-        )
+        if (data := cache.get(device.address, key)) is MISSING:
+            data = _parse_data(_service_data, _mfr_data, _mfr_id, model)
+            cache.set(device.address, key, data)
     except Exception as err:  # pylint: disable=broad-except
         _LOGGER.exception(
             "Failed to parse advertisement data: %s: %s", advertisement_data, err
@@ -207,50 +297,302 @@ def parse_advertisement_data(
         return None
 
     return SwitchBotAdvertisement(
-        device.address, data, device, advertisement_data.rssi, bool(_service_data)
+        device.address,
+        data,
+        device,
+        advertisement_data.rssi,
+        bool(_service_data),
+        (_service_data, _mfr_data, model),
     )
 
 
-@lru_cache(maxsize=128)
-def _parse_data(
+class _Unchanged:
+    """Type of the UNCHANGED sentinel."""
+
+    def __repr__(self) -> str:
+        return "UNCHANGED"
+
+
+UNCHANGED: Final = _Unchanged()
+
+DEFAULT_DEDUPLICATOR_SIZE = 1024
+
+
+class AdvertisementDeduplicator:
+    """Skip parsing advertisements that repeat the previous one of an address.
+
+    The Switchbot service and manufacturer data bytes are compared with
+    the last advertisement seen from the same address. When they are
+    identical nothing is parsed or allocated and either UNCHANGED or,
+    with return_previous, the previous result is returned. RSSI changes
+    alone do not count as a change. At most maxsize addresses are
+    remembered, the least recently seen ones are forgotten first.
+    """
+
+    def __init__(
+        self,
+        return_previous: bool = False,
+        maxsize: int | None = DEFAULT_DEDUPLICATOR_SIZE,
+    ) -> None:
+        """Advertisement deduplicator constructor."""
+        self._return_previous = return_previous
+        self.maxsize = maxsize
+        self._last: OrderedDict[
+            str,
+            tuple[
+                bytes | None,
+                bytes | None,
+                SwitchbotModel | None,
+                SwitchBotAdvertisement | None,
+            ],
+        ] = OrderedDict()
+
+    def parse(
+        self,
+        device: BLEDevice,
+        advertisement_data: AdvertisementData,
+        model: SwitchbotModel | None = None,
+    ) -> SwitchBotAdvertisement | _Unchanged | None:
+        """Parse advertisement data unless it is unchanged."""
+        _service_data, _mfr_id, _mfr_data = _get_payloads(advertisement_data)
+        address = device.address
+        last_by_address = self._last
+        last = last_by_address.get(address)
+        if last is not None:
+            last_by_address.move_to_end(address)
+            if (
+                last[0] == _service_data
+                and last[1] == _mfr_data
+                and last[2] == model
+            ):
+                return last[3] if self._return_previous else UNCHANGED
+        result = _parse_payloads(
+            device, advertisement_data, _service_data, _mfr_id, _mfr_data, model
+        )
+        last_by_address[address] = (_service_data, _mfr_data, model, result)
+        if self.maxsize is not None and len(last_by_address) > self.maxsize:
+            last_by_address.popitem(last=False)
+        return result
+
+    def __len__(self) -> int:
+        """Return the number of remembered addresses."""
+        return len(self._last)
+
+    def forget(self, address: str) -> None:
+        """Forget the last advertisement of an address."""
+        self._last.pop(address, None)
+
+    def clear(self) -> None:
+        """Forget all addresses."""
+        self._last.clear()
+
+
+_PARSE_CACHE: ParseCache = LRUParseCache()
+
+
+def get_parse_cache() -> ParseCache:
+    """Return the cache used for parsed advertisement data."""
+    return _PARSE_CACHE
+
+
+def set_parse_cache(cache: ParseCache) -> None:
+    """Replace the cache used for parsed advertisement data."""
+    global _PARSE_CACHE
+    _PARSE_CACHE = cache
+
+
+def _resolve_model(
     _service_data: bytes | None,
     _mfr_data: bytes | None,
     _mfr_id: int | None = None,
     _switchbot_model: SwitchbotModel | None = None,
-) -> dict[str, Any] | None:
-    """Parse advertisement data."""
-    _model = chr(_service_data[0] & 0b01111111) if _service_data else None
+) -> tuple[str | None, bool]:
+    """Return the model char and encryption flag of an advertisement."""
+    if _service_data:
+        _model, _isEncrypted = _MODEL_BYTE_TABLE[_service_data[0]]
+    else:
+        _model = None
+        _isEncrypted = False
 
     if _switchbot_model and _switchbot_model in _SWITCHBOT_MODEL_TO_CHAR:
         _model = _SWITCHBOT_MODEL_TO_CHAR[_switchbot_model]
 
-    if not _model and _mfr_id and _mfr_id in MODELS_BY_MANUFACTURER_DATA:
-        for model_chr, model_data in MODELS_BY_MANUFACTURER_DATA[_mfr_id]:
-            if model_data.get("manufacturer_data_length") == len(_mfr_data):
-                _model = model_chr
-                break
+    if not _model and _mfr_id:
+        _model = _MODEL_BY_MANUFACTURER_DATA_LENGTH.get((_mfr_id, len(_mfr_data)))
+
+    return _model, _isEncrypted
 
-    if not _model:
-        return None
 
-    _isEncrypted = bool(_service_data[0] & 0b10000000) if _service_data else False
+def _build_data(
+    _service_data: bytes | None,
+    _model: str,
+    _isEncrypted: bool,
+    type_data: SwitchbotSupportedType | None,
+    model_data: dict[str, Any] | None,
+) -> dict[str, Any]:
+    """Build the parsed advertisement data."""
     data = {
         "rawAdvData": _service_data,
         "data": {},
         "model": _model,
         "isEncrypted": _isEncrypted,
     }
+    if model_data:
+        if _USE_PARSED_RECORDS:
+            model_data = RECORDS_BY_PARSER[type_data["func"]].from_dict(model_data)
+        data.update(
+            {
+                "modelFriendlyName": type_data["modelFriendlyName"],
+                "modelName": type_data["modelName"],
+                "data": model_data,
+            }
+        )
+    return data
+
+
+def _parse_data(
+    _service_data: bytes | None,
+    _mfr_data: bytes | None,
+    _mfr_id: int | None = None,
+    _switchbot_model: SwitchbotModel | None = None,
+) -> dict[str, Any] | None:
+    """Parse advertisement data."""
+    _model, _isEncrypted = _resolve_model(
+        _service_data, _mfr_data, _mfr_id, _switchbot_model
+    )
+    if not _model:
+        return None
 
     type_data = SUPPORTED_TYPES.get(_model)
-    if type_data:
-        model_data = type_data["func"](_service_data, _mfr_data)
-        if model_data:
-            data.update(
-                {
-                    "modelFriendlyName": type_data["modelFriendlyName"],
-                    "modelName": type_data["modelName"],
-                    "data": model_data,
-                }
+    model_data = type_data["func"](_service_data, _mfr_data) if type_data else None
+    return _build_data(_service_data, _model, _isEncrypted, type_data, model_data)
+
+
+BULK_CHUNK_SIZE = 256
+
+AdvertisementRecord = tuple[
+    str,
+    bytes | Mapping[str, bytes] | None,
+    bytes | Mapping[int, bytes] | tuple[int, bytes] | None,
+    int,
+]
+
+
+def _get_record_service_data(
+    service_data: bytes | Mapping[str, bytes] | None,
+) -> bytes | None:
+    """Return the Switchbot service data of a recorded advertisement."""
+    if service_data is None or isinstance(service_data, (bytes, bytearray)):
+        return service_data
+    for uuid in SERVICE_DATA_ORDER:
+        if uuid in service_data:
+            return service_data[uuid]
+    return None
+
+
+def _get_record_manufacturer_data(
+    manufacturer_data: bytes | Mapping[int, bytes] | tuple[int, bytes] | None,
+) -> tuple[int | None, bytes | None]:
+    """Return the Switchbot manufacturer id and data of a recorded advertisement.
+
+    Plain bytes are read as a raw manufacturer specific data AD structure,
+    the little endian company identifier followed by the payload.
+    """
+    if manufacturer_data is None:
+        return None, None
+    if isinstance(manufacturer_data, (bytes, bytearray)):
+        if len(manufacturer_data) < 2:
+            return None, None
+        mfr_id = manufacturer_data[0] | (manufacturer_data[1] << 8)
+        if mfr_id not in MFR_DATA_ORDER:
+            return None, None
+        return mfr_id, bytes(manufacturer_data[2:])
+    if isinstance(manufacturer_data, tuple):
+        return manufacturer_data
+    for mfr_id in MFR_DATA_ORDER:
+        if mfr_id in manufacturer_data:
+            return mfr_id, manufacturer_data[mfr_id]
+    return None, None
+
+
+def parse_advertisements_bulk(
+    records: Iterable[AdvertisementRecord],
+    model: SwitchbotModel | None = None,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> Iterator[SwitchBotAdvertisement]:
+    """Parse recorded advertisements.
+
+    Each record is an (address, service_data, manufacturer_data, rssi)
+    tuple. The service data is either the Switchbot service data bytes or
+    a uuid to bytes mapping. The manufacturer data is either a manufacturer
+    id to bytes mapping, a (manufacturer id, bytes) tuple or the raw
+    manufacturer specific data including the company identifier.
+
+    Records are read in chunks of chunk_size, grouped by model and every
+    group is run through its parser in one loop. Advertisements are
+    yielded in input order, records that do not parse are skipped.
+    """
+    devices: dict[str, BLEDevice] = {}
+    for chunk in _chunked(records, chunk_size):
+        yield from _parse_chunk(chunk, model, devices)
+
+
+def _chunked(
+    records: Iterable[AdvertisementRecord], chunk_size: int
+) -> Iterator[list[AdvertisementRecord]]:
+    """Split records into lists of chunk_size."""
+    iterator = iter(records)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def _parse_chunk(
+    chunk: list[AdvertisementRecord],
+    model: SwitchbotModel | None,
+    devices: dict[str, BLEDevice],
+) -> Iterator[SwitchBotAdvertisement]:
+    """Parse a chunk of recorded advertisements."""
+    payloads: list[tuple[bytes | None, bytes | None, bool] | None] = []
+    groups: dict[str, list[int]] = {}
+    for idx, (_, service_data, manufacturer_data, _) in enumerate(chunk):
+        _service_data = _get_record_service_data(service_data)
+        _mfr_id, _mfr_data = _get_record_manufacturer_data(manufacturer_data)
+        if _mfr_data is None and _service_data is None:
+            payloads.append(None)
+            continue
+        _model, _isEncrypted = _resolve_model(
+            _service_data, _mfr_data, _mfr_id, model
+        )
+        if not _model:
+            payloads.append(None)
+            continue
+        payloads.append((_service_data, _mfr_data, _isEncrypted))
+        groups.setdefault(_model, []).append(idx)
+
+    results: list[dict[str, Any] | None] = [None] * len(chunk)
+    for _model, indexes in groups.items():
+        type_data = SUPPORTED_TYPES.get(_model)
+        func = type_data["func"] if type_data else None
+        for idx in indexes:
+            _service_data, _mfr_data, _isEncrypted = payloads[idx]
+            try:
+                model_data = func(_service_data, _mfr_data) if func else None
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.exception(
+                    "Failed to parse advertisement data: %s: %s", chunk[idx], err
+                )
+                continue
+            results[idx] = _build_data(
+                _service_data, _model, _isEncrypted, type_data, model_data
             )
 
-    return data
+    for (address, _, _, rssi), payload, data in zip(chunk, payloads, results):
+        if not data:
+            continue
+        if (device := devices.get(address)) is None:
+            device = devices[address] = BLEDevice(
+                address=address, name=None, details=None
+            )
+        yield SwitchBotAdvertisement(
+            address, data, device, rssi, bool(payload[0]), (*payload[:2], model)
+        )
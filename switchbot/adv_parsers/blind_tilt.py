@@ -1,6 +1,8 @@
 """Library to handle connection with Switchbot."""
 from __future__ import annotations
 
+from ..models import ParsedRecord, parsed_record
+
 
 def process_woblindtilt(
     data: bytes | None, mfr_data: bytes | None, reverse: bool = False
@@ -25,3 +27,15 @@ def process_woblindtilt(
         "lightLevel": _light_level,
         "sequence_number": device_data[0],
     }
+
+
+@parsed_record
+class WoBlindTiltRecord(ParsedRecord):
+    """Parsed woBlindTilt advertisement data."""
+
+    calibration: bool
+    battery: int | None
+    inMotion: bool
+    tilt: int
+    lightLevel: int
+    sequence_number: int
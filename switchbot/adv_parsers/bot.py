@@ -1,6 +1,8 @@
 """Library to handle connection with Switchbot."""
 from __future__ import annotations
 
+from ..models import ParsedRecord, parsed_record
+
 
 def process_wohand(data: bytes | None, mfr_data: bytes | None) -> dict[str, bool | int]:
     """Process woHand/Bot services data."""
@@ -21,3 +23,12 @@ def process_wohand(data: bytes | None, mfr_data: bytes | None) -> dict[str, bool
         "isOn": not bool(data[1] & 0b01000000) if _switch_mode else False,
         "battery": data[2] & 0b01111111,
     }
+
+
+@parsed_record
+class WoHandRecord(ParsedRecord):
+    """Parsed woHand/Bot advertisement data."""
+
+    switchMode: bool | None
+    isOn: bool | None
+    battery: int | None
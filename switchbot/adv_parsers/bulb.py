@@ -1,6 +1,8 @@
 """Bulb parser."""
 from __future__ import annotations
 
+from ..models import ParsedRecord, parsed_record
+
 
 def process_color_bulb(
     data: bytes | None, mfr_data: bytes | None
@@ -18,3 +20,17 @@ def process_color_bulb(
         "speed": mfr_data[9] & 0b01111111,
         "loop_index": mfr_data[10] & 0b11111110,
     }
+
+
+@parsed_record
+class WoBulbRecord(ParsedRecord):
+    """Parsed WoBulb advertisement data."""
+
+    sequence_number: int
+    isOn: bool
+    brightness: int
+    delay: bool
+    preset: bool
+    color_mode: int
+    speed: int
+    loop_index: int
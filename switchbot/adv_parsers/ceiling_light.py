@@ -3,6 +3,8 @@ from __future__ import annotations
 
 import logging
 
+from ..models import ParsedRecord, parsed_record
+
 _LOGGER = logging.getLogger(__name__)
 
 # Off d94b2d012b3c4864106124
@@ -23,3 +25,14 @@ def process_woceiling(data: bytes, mfr_data: bytes | None) -> dict[str, bool | i
         "cw": int(mfr_data[8:10].hex(), 16),
         "color_mode": 1,
     }
+
+
+@parsed_record
+class WoCeilingRecord(ParsedRecord):
+    """Parsed WoCeiling advertisement data."""
+
+    sequence_number: int
+    isOn: bool
+    brightness: int
+    cw: int
+    color_mode: int
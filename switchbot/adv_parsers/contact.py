@@ -1,6 +1,8 @@
 """Contact sensor parser."""
 from __future__ import annotations
 
+from ..models import ParsedRecord, parsed_record
+
 
 def process_wocontact(
     data: bytes | None, mfr_data: bytes | None
@@ -34,3 +36,16 @@ def process_wocontact(
         "is_light": is_light,
         "button_count": button_count,
     }
+
+
+@parsed_record
+class WoContactRecord(ParsedRecord):
+    """Parsed woContact Sensor advertisement data."""
+
+    tested: bool | None
+    motion_detected: bool
+    battery: int | None
+    contact_open: bool
+    contact_timeout: bool
+    is_light: bool
+    button_count: int
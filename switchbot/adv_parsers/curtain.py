@@ -1,6 +1,8 @@
 """Library to handle connection with Switchbot."""
 from __future__ import annotations
 
+from ..models import ParsedRecord, parsed_record
+
 
 def process_wocurtain(
     data: bytes | None, mfr_data: bytes | None, reverse: bool = True
@@ -31,3 +33,15 @@ def process_wocurtain(
         "lightLevel": _light_level,
         "deviceChain": _device_chain,
     }
+
+
+@parsed_record
+class WoCurtainRecord(ParsedRecord):
+    """Parsed woCurtain/Curtain advertisement data."""
+
+    calibration: bool | None
+    battery: int | None
+    inMotion: bool
+    position: int
+    lightLevel: int
+    deviceChain: int
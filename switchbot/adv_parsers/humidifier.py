@@ -3,6 +3,8 @@ from __future__ import annotations
 
 import logging
 
+from ..models import ParsedRecord, parsed_record
+
 _LOGGER = logging.getLogger(__name__)
 
 # mfr_data: 943cc68d3d2e
@@ -30,3 +32,12 @@ def process_wohumidifier(
         "level": data[4],
         "switchMode": True,
     }
+
+
+@parsed_record
+class WoHumiRecord(ParsedRecord):
+    """Parsed WoHumi advertisement data."""
+
+    isOn: bool | None
+    level: int | None
+    switchMode: bool
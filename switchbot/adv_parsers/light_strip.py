@@ -1,6 +1,8 @@
 """Light strip adv parser."""
 from __future__ import annotations
 
+from ..models import ParsedRecord, parsed_record
+
 
 def process_wostrip(
     data: bytes | None, mfr_data: bytes | None
@@ -18,3 +20,17 @@ def process_wostrip(
         "speed": mfr_data[9] & 0b01111111,
         "loop_index": mfr_data[10] & 0b11111110,
     }
+
+
+@parsed_record
+class WoStripRecord(ParsedRecord):
+    """Parsed WoStrip advertisement data."""
+
+    sequence_number: int
+    isOn: bool
+    brightness: int
+    delay: bool
+    preset: bool
+    color_mode: int
+    speed: int
+    loop_index: int
@@ -4,6 +4,7 @@ from __future__ import annotations
 import logging
 
 from ..const import LockStatus
+from ..models import ParsedRecord, parsed_record
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,3 +30,19 @@ def process_wolock(data: bytes | None, mfr_data: bytes | None) -> dict[str, bool
         "auto_lock_paused": bool(mfr_data[8] & 0b00000010),
         "night_latch": bool(mfr_data[9] & 0b00000001) if len(mfr_data) > 9 else False,
     }
+
+
+@parsed_record
+class WoLockRecord(ParsedRecord):
+    """Parsed woLock advertisement data."""
+
+    battery: int | None
+    calibration: bool
+    status: LockStatus
+    update_from_secondary_lock: bool
+    door_open: bool
+    double_lock_mode: bool
+    unclosed_alarm: bool
+    unlocked_alarm: bool
+    auto_lock_paused: bool
+    night_latch: bool
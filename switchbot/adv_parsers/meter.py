@@ -1,7 +1,9 @@
 """Meter parser."""
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, ClassVar
+
+from ..models import ParsedRecord, parsed_record
 
 
 def process_wosensorth(data: bytes | None, mfr_data: bytes | None) -> dict[str, Any]:
@@ -41,3 +43,25 @@ def process_wosensorth(data: bytes | None, mfr_data: bytes | None) -> dict[str,
     }
 
     return _wosensorth_data
+
+
+@parsed_record
+class WoSensorTHRecord(ParsedRecord):
+    """Parsed woSensorTH/Temp sensor advertisement data.
+
+    The nested "temp" key of the parser dict is computed on access.
+    """
+
+    derived_keys: ClassVar[tuple[str, ...]] = ("temp",)
+
+    temperature: float
+    fahrenheit: bool
+    humidity: int
+    battery: int | None
+
+    @property
+    def temp(self) -> dict[str, float]:
+        """Return the temperature in celsius and fahrenheit."""
+        _temp_f = (self.temperature * 9 / 5) + 32
+        _temp_f = (_temp_f * 10) / 10
+        return {"c": self.temperature, "f": _temp_f}
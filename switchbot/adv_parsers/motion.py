@@ -1,6 +1,8 @@
 """Motion sensor parser."""
 from __future__ import annotations
 
+from ..models import ParsedRecord, parsed_record
+
 
 def process_wopresence(
     data: bytes | None, mfr_data: bytes | None
@@ -39,3 +41,17 @@ def process_wopresence(
         "light_intensity": light_intensity,
         "is_light": is_light,
     }
+
+
+@parsed_record
+class WoPresenceRecord(ParsedRecord):
+    """Parsed WoPresence Sensor advertisement data."""
+
+    tested: bool | None
+    motion_detected: bool
+    battery: int | None
+    led: int | None
+    iot: int | None
+    sense_distance: int | None
+    light_intensity: int | None
+    is_light: bool | None
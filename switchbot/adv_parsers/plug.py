@@ -1,6 +1,8 @@
 """Library to handle connection with Switchbot."""
 from __future__ import annotations
 
+from ..models import ParsedRecord, parsed_record
+
 
 def process_woplugmini(
     data: bytes | None, mfr_data: bytes | None
@@ -14,3 +16,13 @@ def process_woplugmini(
         "wifi_rssi": -mfr_data[9],
         "power": (((mfr_data[10] << 8) + mfr_data[11]) & 0x7FFF) / 10,  # W
     }
+
+
+@parsed_record
+class WoPlugMiniRecord(ParsedRecord):
+    """Parsed plug mini advertisement data."""
+
+    switchMode: bool
+    isOn: bool
+    wifi_rssi: int
+    power: float
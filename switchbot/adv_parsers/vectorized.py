@@ -0,0 +1,90 @@
+"""Vectorized decoders for captured advertisement payloads.
+
+These decode many payloads at once for offline analysis and need
+numpy, which is an optional dependency (pip install PySwitchbot[numpy]).
+Payloads of the same length are stacked into a 2-D uint8 array, one
+row per advertisement, and the decoders return one column per field
+with the same values as the scalar parsers.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+
+def _as_payload_array(payloads: Any, min_length: int) -> np.ndarray:
+    """Return payloads as a 2-D uint8 array."""
+    array = np.asarray(payloads, dtype=np.uint8)
+    if array.ndim != 2:
+        raise ValueError(f"Expected a 2-D array of payloads, got {array.ndim}-D")
+    if array.shape[1] < min_length:
+        raise ValueError(
+            f"Payloads must be at least {min_length} bytes, got {array.shape[1]}"
+        )
+    return array
+
+
+def decode_wosensorth(
+    data: Any | None = None, mfr_data: Any | None = None
+) -> dict[str, np.ndarray | None]:
+    """Decode woSensorTH/Temp sensor payloads.
+
+    Takes the stacked service data and/or manufacturer data of the same
+    advertisements. Temperature and humidity are read from the
+    manufacturer data when given, like process_wosensorth. The battery
+    column is None without service data. Rows for which
+    process_wosensorth returns no data are False in the valid column.
+    """
+    if data is None and mfr_data is None:
+        raise ValueError("Either data or mfr_data is required")
+
+    # Only the battery byte is read from the service data when the
+    # manufacturer data carries temperature and humidity
+    service = (
+        _as_payload_array(data, 3 if mfr_data is not None else 6)
+        if data is not None
+        else None
+    )
+    if mfr_data is not None:
+        temp_data = _as_payload_array(mfr_data, 11)[:, 8:11]
+    else:
+        temp_data = service[:, 3:6]
+    if service is not None and len(service) != len(temp_data):
+        raise ValueError("data and mfr_data must have the same number of rows")
+
+    temp_decimal = (temp_data[:, 0] & 0b00001111).astype(np.int64)
+    temp_whole = (temp_data[:, 1] & 0b01111111).astype(np.int64)
+    temp_sign = np.where(temp_data[:, 1] & 0b10000000, 1, -1)
+    temp_c = temp_sign * (temp_whole + temp_decimal / 10)
+    temp_f = (temp_c * 9 / 5) + 32
+    temp_f = (temp_f * 10) / 10
+    humidity = (temp_data[:, 2] & 0b01111111).astype(np.int64)
+    battery = (
+        (service[:, 2] & 0b01111111).astype(np.int64) if service is not None else None
+    )
+
+    if battery is None:
+        valid = np.ones(len(temp_data), dtype=bool)
+    else:
+        valid = ~((temp_c == 0) & (humidity == 0) & (battery == 0))
+
+    return {
+        "temperature": temp_c,
+        "temperature_f": temp_f,
+        "fahrenheit": (temp_data[:, 2] & 0b10000000) != 0,
+        "humidity": humidity,
+        "battery": battery,
+        "valid": valid,
+    }
+
+
+def decode_woplugmini(mfr_data: Any) -> dict[str, np.ndarray]:
+    """Decode plug mini manufacturer data payloads."""
+    payloads = _as_payload_array(mfr_data, 12)
+    power_raw = (payloads[:, 10].astype(np.int64) << 8) + payloads[:, 11]
+    return {
+        "isOn": payloads[:, 7] == 0x80,
+        "wifi_rssi": -payloads[:, 9].astype(np.int64),
+        "power": (power_raw & 0x7FFF) / 10,
+    }
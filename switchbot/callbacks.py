@@ -0,0 +1,83 @@
+"""Batched delivery of device changes to subscribers."""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+from collections.abc import Awaitable, Iterable
+from typing import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds changes are collected before they are delivered
+DEFAULT_CALLBACK_WINDOW = 0.1
+
+BatchedCallbackType = Callable[[frozenset[str]], "Awaitable[None] | None"]
+
+
+class BatchedCallback:
+    """Deliver the changes of a device to a callback in batches.
+
+    Changes within the window are coalesced into one call with the
+    changed keys, an empty set when a change did not say which keys
+    changed. While a coroutine callback is still running, changes keep
+    collecting and are delivered once it returns, so a slow subscriber
+    gets fewer, larger batches instead of a growing backlog.
+    """
+
+    def __init__(
+        self,
+        callback: BatchedCallbackType,
+        window: float = DEFAULT_CALLBACK_WINDOW,
+    ) -> None:
+        """Batched callback constructor."""
+        self.callback = callback
+        self.window = window
+        self._loop = asyncio.get_event_loop()
+        self._pending: set[str] = set()
+        self._changed = False
+        self._timer: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def add(self, keys: Iterable[str]) -> None:
+        """Add a change, delivered at the end of the window."""
+        self._pending.update(keys)
+        self._changed = True
+        if self._timer is None and self._task is None:
+            self._timer = self._loop.call_later(self.window, self._deliver)
+
+    def cancel(self) -> None:
+        """Drop pending changes and stop delivering."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._pending.clear()
+        self._changed = False
+
+    def _deliver(self) -> None:
+        """Deliver the pending changes."""
+        self._timer = None
+        keys = frozenset(self._pending)
+        self._pending.clear()
+        self._changed = False
+        try:
+            result = self.callback(keys)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error in batched callback %s", self.callback)
+            return
+        if inspect.isawaitable(result):
+            self._task = asyncio.ensure_future(self._wait(result))
+
+    async def _wait(self, result: Awaitable[None]) -> None:
+        """Wait for a coroutine callback before delivering more changes."""
+        try:
+            await result
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error in batched callback %s", self.callback)
+        finally:
+            self._task = None
+            if self._changed:
+                self._timer = self._loop.call_later(self.window, self._deliver)
@@ -30,6 +30,10 @@ _LOGGER = logging.getLogger(__name__)
 class SwitchbotBaseCover(SwitchbotDevice):
     """Representation of a Switchbot Cover devices for both curtains and tilt blinds."""
 
+    # Covers are often sent bursts of commands, such as a scene moving
+    # them or a slider being dragged, one update after the burst will do
+    update_after_operation_delay = 1.0
+
     def __init__(self, reverse: bool, *args: Any, **kwargs: Any) -> None:
         """Switchbot Cover device constructor."""
 
@@ -45,9 +49,14 @@ class SwitchbotBaseCover(SwitchbotDevice):
         """Send multiple commands to device.
 
         Since we current have no way to tell which command the device
-        needs we send both.
+        needs we send both. With pipeline_commands they are sent back
+        to back over the connection.
         """
         final_result = False
+        if self._pipeline_commands:
+            for result in await self._send_commands(keys):
+                final_result |= self._check_command_result(result, 0, {1})
+            return final_result
         for key in keys:
             result = await self._send_command(key)
             final_result |= self._check_command_result(result, 0, {1})
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Mapping
 from typing import Any
 
 from switchbot.devices.device import (
@@ -47,7 +48,7 @@ class SwitchbotBlindTilt(SwitchbotBaseCover, SwitchbotSequenceDevice):
         super().__init__(self._reverse, *args, **kwargs)
 
     def _set_parsed_data(
-        self, advertisement: SwitchBotAdvertisement, data: dict[str, Any]
+        self, advertisement: SwitchBotAdvertisement, data: Mapping[str, Any]
     ) -> None:
         """Set data."""
         in_motion = data["inMotion"]
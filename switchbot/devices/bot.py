@@ -26,6 +26,9 @@ UP_KEY = f"{BOT_COMMAND_HEADER}04"
 class Switchbot(SwitchbotDeviceOverrideStateDuringConnection):
     """Representation of a Switchbot."""
 
+    # turn_on and turn_off set isOn when the command succeeded
+    skip_update_when_state_known = True
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         """Switchbot Bot/WoHand constructor."""
         super().__init__(*args, **kwargs)
@@ -36,6 +39,7 @@ class Switchbot(SwitchbotDeviceOverrideStateDuringConnection):
         """Turn device on."""
         result = await self._send_command(ON_KEY)
         ret = self._check_command_result(result, 0, {1, 5})
+        self._state_from_response = ret
         self._override_state({"isOn": True})
         _LOGGER.debug(
             "%s: Turn on result: %s -> %s",
@@ -51,6 +55,7 @@ class Switchbot(SwitchbotDeviceOverrideStateDuringConnection):
         """Turn device off."""
         result = await self._send_command(OFF_KEY)
         ret = self._check_command_result(result, 0, {1, 5})
+        self._state_from_response = ret
         self._override_state({"isOn": False})
         _LOGGER.debug(
             "%s: Turn off result: %s -> %s",
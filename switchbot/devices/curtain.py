@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Mapping
 from typing import Any
 
 from ..models import SwitchBotAdvertisement
@@ -53,7 +54,7 @@ class SwitchbotCurtain(SwitchbotBaseCover):
         self.ext_info_adv: dict[str, Any] = {}
 
     def _set_parsed_data(
-        self, advertisement: SwitchBotAdvertisement, data: dict[str, Any]
+        self, advertisement: SwitchBotAdvertisement, data: Mapping[str, Any]
     ) -> None:
         """Set data."""
         in_motion = data["inMotion"]
@@ -5,9 +5,12 @@ import asyncio
 import binascii
 import logging
 import time
-from dataclasses import replace
+from collections import deque
+from collections.abc import Mapping
+from contextvars import ContextVar
 from enum import Enum
-from typing import Any, Callable, TypeVar, cast
+from functools import partial
+from typing import Any, Callable, ClassVar, TypeVar, cast
 from uuid import UUID
 
 from bleak.backends.device import BLEDevice
@@ -21,9 +24,27 @@ from bleak_retry_connector import (
     establish_connection,
 )
 
+from ..callbacks import DEFAULT_CALLBACK_WINDOW, BatchedCallback, BatchedCallbackType
 from ..const import DEFAULT_RETRY_COUNT, DEFAULT_SCAN_TIMEOUT
-from ..discovery import GetSwitchbotDevices
-from ..models import SwitchBotAdvertisement
+from ..discovery import GetSwitchbotDevices, SwitchbotScanner
+from ..gatt_cache import CharacteristicHandles, get_gatt_handle_cache
+from ..metrics import DeviceMetrics
+from ..models import (
+    DeviceDataChanged,
+    FieldChange,
+    ParsedRecord,
+    SwitchBotAdvertisement,
+)
+from ..policies import (
+    DEFAULT_ERROR_ACTIONS,
+    DEFAULT_KEEP_ALIVE_DELAY,
+    AdaptiveTimeout,
+    KeepAlivePolicy,
+    RetryAction,
+    RetryPolicy,
+)
+from ..registry import AdapterSighting, AdapterSightings, get_ble_device_adapter
+from ..scheduler import ConnectionPriority, ConnectionSlot, get_connection_scheduler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,12 +59,18 @@ DEVICE_SET_EXTENDED_KEY = REQ_HEADER
 # Base key when encryption is set
 KEY_PASSWORD_PREFIX = "571"
 
-DBUS_ERROR_BACKOFF_TIME = 0.25
-
 # How long to hold the connection
 # to wait for additional commands for
-# disconnecting the device.
-DISCONNECT_DELAY = 8.5
+# disconnecting the device, until the
+# keep alive policy has seen enough commands.
+DISCONNECT_DELAY = DEFAULT_KEEP_ALIVE_DELAY
+
+# How long a prepared connection is held without commands
+PREPARE_WINDOW = 10.0
+
+# Connection attempts through an adapter before falling
+# back to the adapter with the next best RSSI.
+ADAPTER_FALLBACK_ATTEMPTS = 2
 
 
 class ColorMode(Enum):
@@ -64,6 +91,14 @@ class CharacteristicMissingError(Exception):
     """Raised when a characteristic is missing."""
 
 
+DEFAULT_RETRY_POLICY = RetryPolicy(
+    error_actions=(
+        (CharacteristicMissingError, RetryAction.RECONNECT),
+        *DEFAULT_ERROR_ACTIONS,
+    )
+)
+
+
 class SwitchbotOperationError(Exception):
     """Raised when an operation fails."""
 
@@ -86,28 +121,108 @@ WRITE_CHAR_UUID = _sb_uuid(comms_type="tx")
 WrapFuncType = TypeVar("WrapFuncType", bound=Callable[..., Any])
 
 
+# Ids of the devices the current task is running an operation on
+_OPERATING_DEVICES: ContextVar[frozenset[int]] = ContextVar(
+    "switchbot_operating_devices", default=frozenset()
+)
+
+
 def update_after_operation(func: WrapFuncType) -> WrapFuncType:
-    """Define a wrapper to update after an operation."""
+    """Define a wrapper to update after an operation.
+
+    An operation called from another operation of the same device
+    leaves the update to the outer operation.
+    """
 
     async def _async_update_after_operation_wrap(
         self: SwitchbotBaseDevice, *args: Any, **kwargs: Any
     ) -> None:
-        ret = await func(self, *args, **kwargs)
-        await self.update()
+        operating = _OPERATING_DEVICES.get()
+        if id(self) in operating:
+            return await func(self, *args, **kwargs)
+        token = _OPERATING_DEVICES.set(operating | {id(self)})
+        self._state_from_response = False
+        try:
+            ret = await func(self, *args, **kwargs)
+        finally:
+            _OPERATING_DEVICES.reset(token)
+        await self._update_after_operation()
         return ret
 
     return cast(WrapFuncType, _async_update_after_operation_wrap)
 
 
-def _merge_data(old_data: dict[str, Any], new_data: dict[str, Any]) -> dict[str, Any]:
-    """Merge data but only add None keys if they are missing."""
-    merged = old_data.copy()
+_MISSING = object()
+
+
+def _merge_data(
+    old_data: Mapping[str, Any], new_data: Mapping[str, Any]
+) -> Mapping[str, Any]:
+    """Merge data but only add None keys if they are missing.
+
+    The old data is returned as is when nothing changed, so the common
+    case of a device repeating its state allocates nothing.
+    """
+    if new_data is old_data:
+        return old_data
+    if (
+        old_data.__class__ is not dict
+        and isinstance(old_data, ParsedRecord)
+        and (merged_record := _merge_record(old_data, new_data)) is not None
+    ):
+        return merged_record
+    changes: dict[str, Any] | None = None
     for key, value in new_data.items():
-        if value is not None or key not in old_data:
-            merged[key] = value
+        if (old_value := old_data.get(key, _MISSING)) is _MISSING or (
+            value is not None and value != old_value
+        ):
+            if changes is None:
+                changes = {}
+            changes[key] = value
+    if changes is None:
+        return old_data
+    merged = dict(old_data)
+    merged.update(changes)
     return merged
 
 
+def _merge_record(
+    old_data: ParsedRecord, new_data: Mapping[str, Any]
+) -> ParsedRecord | None:
+    """Merge data into a parsed record, None when it has keys the record lacks.
+
+    The old record is returned as is when nothing changed.
+    """
+    fields = old_data.__match_args__
+    if new_data.__class__ is old_data.__class__:
+        get_new = new_data.__getattribute__
+    elif all(key in fields for key in new_data):
+        get_new = new_data.get
+    else:
+        return None
+    values = []
+    changed = False
+    for key in fields:
+        old_value = getattr(old_data, key)
+        if (value := get_new(key)) is None or value == old_value:
+            values.append(old_value)
+        else:
+            values.append(value)
+            changed = True
+    return old_data.__class__(*values) if changed else old_data
+
+
+def _diff_data(
+    old_data: Mapping[str, Any], new_data: Mapping[str, Any]
+) -> tuple[FieldChange, ...]:
+    """Return the keys with other values in new_data than in old_data."""
+    return tuple(
+        FieldChange(key, None if old is _MISSING else old, value)
+        for key, value in new_data.items()
+        if (old := old_data.get(key, _MISSING)) != value
+    )
+
+
 def _handle_timeout(fut: asyncio.Future[None]) -> None:
     """Handle a timeout."""
     if not fut.done():
@@ -117,6 +232,25 @@ def _handle_timeout(fut: asyncio.Future[None]) -> None:
 class SwitchbotBaseDevice:
     """Base Representation of a Switchbot Device."""
 
+    # Priority of this device type in the connection scheduler queues
+    _connection_priority: ClassVar[ConnectionPriority] = ConnectionPriority.NORMAL
+
+    # Send the commands of multi command operations back to back
+    # instead of waiting for each response before the next write.
+    pipeline_commands: ClassVar[bool] = False
+
+    # How failed commands of this device type are retried
+    retry_policy: ClassVar[RetryPolicy] = DEFAULT_RETRY_POLICY
+
+    # Seconds to wait for more operations before the update after an
+    # operation, which then runs in the background. None updates
+    # before the operation returns.
+    update_after_operation_delay: ClassVar[float | None] = None
+
+    # Skip the update after an operation that set the state from the
+    # command response
+    skip_update_when_state_known: ClassVar[bool] = False
+
     def __init__(
         self,
         device: BLEDevice,
@@ -131,6 +265,20 @@ class SwitchbotBaseDevice:
         self._override_adv_data: dict[str, Any] | None = None
         self._scan_timeout: int = kwargs.pop("scan_timeout", DEFAULT_SCAN_TIMEOUT)
         self._retry_count: int = kwargs.pop("retry_count", DEFAULT_RETRY_COUNT)
+        self._scanner: SwitchbotScanner | None = kwargs.pop("scanner", None)
+        self._pipeline_commands: bool = kwargs.pop(
+            "pipeline_commands", self.pipeline_commands
+        )
+        self._interfaces: list[int] | None = kwargs.pop("interfaces", None)
+        self._retry_policy: RetryPolicy = kwargs.pop("retry_policy", self.retry_policy)
+        self._keep_alive: KeepAlivePolicy = (
+            kwargs.pop("keep_alive", None) or KeepAlivePolicy()
+        )
+        self._response_timeout: AdaptiveTimeout = (
+            kwargs.pop("response_timeout", None) or AdaptiveTimeout()
+        )
+        self._sightings = AdapterSightings()
+        self._metrics = DeviceMetrics(device.address)
         self._connect_lock = asyncio.Lock()
         self._operation_lock = asyncio.Lock()
         if password is None or password == "":
@@ -140,23 +288,43 @@ class SwitchbotBaseDevice:
                 binascii.crc32(password.encode("ascii")) & 0xFFFFFFFF
             )
         self._client: BleakClientWithServiceCache | None = None
+        self._connection_slot: ConnectionSlot | None = None
         self._read_char: BleakGATTCharacteristic | None = None
         self._write_char: BleakGATTCharacteristic | None = None
         self._disconnect_timer: asyncio.TimerHandle | None = None
+        # Loop time until which a prepared connection is held
+        self._prepared_until = 0.0
         self._expected_disconnect = False
         self.loop = asyncio.get_event_loop()
         self._callbacks: list[Callable[[], None]] = []
-        self._notify_future: asyncio.Future[bytearray] | None = None
+        self._batched_callbacks: list[BatchedCallback] = []
+        self._change_callbacks: list[Callable[[DeviceDataChanged], None]] = []
+        # Responses are matched to the pending commands in order
+        self._notify_futures: deque[asyncio.Future[bytearray]] = deque()
         self._last_full_update: float = -PASSIVE_POLL_INTERVAL
+        # Last advertisement merged into the data, until data from
+        # elsewhere is merged after it
+        self._last_advertisement: SwitchBotAdvertisement | None = None
         self._timed_disconnect_task: asyncio.Task[None] | None = None
+        self._state_from_response = False
+        self._update_after_operation_timer: asyncio.TimerHandle | None = None
+        self._update_after_operation_task: asyncio.Task[None] | None = None
 
     def advertisement_changed(self, advertisement: SwitchBotAdvertisement) -> bool:
         """Check if the advertisement has changed."""
-        return bool(
-            not self._sb_adv_data
-            or ble_device_has_changed(self._sb_adv_data.device, advertisement.device)
-            or advertisement.data != self._sb_adv_data.data
-        )
+        if advertisement is self._sb_adv_data:
+            return False
+        if not self._sb_adv_data or ble_device_has_changed(
+            self._sb_adv_data.device, advertisement.device
+        ):
+            return True
+        # Merging the data of the last advertisement again changes
+        # nothing, and comparing raw payloads is cheap
+        if (
+            last := self._last_advertisement
+        ) is not None and advertisement.same_data(last):
+            return False
+        return not advertisement.same_data(self._sb_adv_data)
 
     def _commandkey(self, key: str) -> str:
         """Add password to key if set."""
@@ -168,10 +336,25 @@ class SwitchbotBaseDevice:
 
     async def _send_command(self, key: str, retry: int | None = None) -> bytes | None:
         """Send command to device and read response."""
+        return (await self._send_commands([key], retry))[0]
+
+    async def _send_commands(
+        self, keys: list[str], retry: int | None = None
+    ) -> list[bytes]:
+        """Send commands back to back to device and read their responses.
+
+        The commands are written without waiting for the previous
+        response and the responses are returned in the same order.
+        A failed attempt sends all of the commands again.
+        """
         if retry is None:
             retry = self._retry_count
-        command = bytearray.fromhex(self._commandkey(key))
-        _LOGGER.debug("%s: Scheduling command %s", self.name, command.hex())
+        commands = [bytearray.fromhex(self._commandkey(key)) for key in keys]
+        _LOGGER.debug(
+            "%s: Scheduling commands %s",
+            self.name,
+            [command.hex() for command in commands],
+        )
         max_attempts = retry + 1
         if self._operation_lock.locked():
             _LOGGER.debug(
@@ -179,49 +362,65 @@ class SwitchbotBaseDevice:
                 self.name,
                 self.rssi,
             )
-        async with self._operation_lock:
-            for attempt in range(max_attempts):
-                try:
-                    return await self._send_command_locked(key, command)
-                except BleakNotFoundError:
-                    _LOGGER.error(
-                        "%s: device not found, no longer in range, or poor RSSI: %s",
-                        self.name,
-                        self.rssi,
-                        exc_info=True,
-                    )
-                    raise
-                except CharacteristicMissingError as ex:
-                    if attempt == retry:
-                        _LOGGER.error(
-                            "%s: characteristic missing: %s; Stopping trying; RSSI: %s",
+        self._keep_alive.record_command()
+        metrics = self._metrics
+        metrics.commands += len(commands)
+        if (sighting := self._sightings.best()) is not None:
+            metrics.rssi.observe(sighting.rssi)
+        elif self._sb_adv_data:
+            metrics.rssi.observe(self._sb_adv_data.rssi)
+        policy = self._retry_policy
+        deadline = (
+            None if policy.deadline is None else time.monotonic() + policy.deadline
+        )
+        lock_requested = time.monotonic()
+        try:
+            async with self._operation_lock:
+                metrics.lock_wait_time.observe(time.monotonic() - lock_requested)
+                for attempt in range(max_attempts):
+                    try:
+                        return await self._send_commands_locked(keys, commands)
+                    except Exception as ex:
+                        if isinstance(ex, BleakDBusError):
+                            metrics.dbus_errors += 1
+                        action = policy.classify(ex)
+                        if action is RetryAction.ABORT:
+                            if isinstance(ex, BleakNotFoundError):
+                                _LOGGER.error(
+                                    "%s: device not found, no longer in range, or poor RSSI: %s",
+                                    self.name,
+                                    self.rssi,
+                                    exc_info=True,
+                                )
+                            raise
+                        delay = policy.delay(attempt)
+                        if attempt == retry or (
+                            deadline is not None and time.monotonic() + delay > deadline
+                        ):
+                            _LOGGER.error(
+                                "%s: communication failed: %s; Stopping trying; RSSI: %s",
+                                self.name,
+                                ex,
+                                self.rssi,
+                                exc_info=True,
+                            )
+                            raise
+                        _LOGGER.debug(
+                            "%s: communication failed: %s; %s in %.2fs; RSSI: %s",
                             self.name,
                             ex,
+                            action.value,
+                            delay,
                             self.rssi,
                             exc_info=True,
                         )
-                        raise
-
-                    _LOGGER.debug(
-                        "%s: characteristic missing: %s; RSSI: %s",
-                        self.name,
-                        ex,
-                        self.rssi,
-                        exc_info=True,
-                    )
-                except BLEAK_RETRY_EXCEPTIONS:
-                    if attempt == retry:
-                        _LOGGER.error(
-                            "%s: communication failed; Stopping trying; RSSI: %s",
-                            self.name,
-                            self.rssi,
-                            exc_info=True,
-                        )
-                        raise
-
-                    _LOGGER.debug(
-                        "%s: communication failed with:", self.name, exc_info=True
-                    )
+                        metrics.retries += 1
+                        if action is RetryAction.RECONNECT:
+                            await self._execute_forced_disconnect()
+                        await asyncio.sleep(delay)
+        finally:
+            # Other devices may reclaim the connection until the next operation
+            self._connection_idle()
 
         raise RuntimeError("Unreachable")
 
@@ -242,6 +441,26 @@ class SwitchbotBaseDevice:
         """Return parsed device data."""
         return self.data.get("data") or {}
 
+    @property
+    def metrics(self) -> DeviceMetrics:
+        """Return the latency and reliability metrics of the device."""
+        return self._metrics
+
+    @property
+    def keep_alive(self) -> KeepAlivePolicy:
+        """Return the keep alive policy with its connection counts."""
+        return self._keep_alive
+
+    @property
+    def disconnect_delay(self) -> float:
+        """Return how long an idle connection is held in seconds."""
+        return self._keep_alive.delay
+
+    @property
+    def response_timeout(self) -> float:
+        """Return the current response timeout in seconds."""
+        return self._response_timeout.timeout
+
     @property
     def rssi(self) -> int:
         """Return RSSI of device."""
@@ -264,6 +483,8 @@ class SwitchbotBaseDevice:
                 self.rssi,
             )
             self._reset_disconnect_timer()
+            self._keep_alive.record_connection(reused=True)
+            self._connection_idle()
             return
         async with self._connect_lock:
             # Check again while holding the lock
@@ -274,18 +495,22 @@ class SwitchbotBaseDevice:
                     self.rssi,
                 )
                 self._reset_disconnect_timer()
+                self._keep_alive.record_connection(reused=True)
+                self._connection_idle()
                 return
             _LOGGER.debug("%s: Connecting; RSSI: %s", self.name, self.rssi)
-            client: BleakClientWithServiceCache = await establish_connection(
-                BleakClientWithServiceCache,
-                self._device,
-                self.name,
-                self._disconnected,
-                use_services_cache=True,
-                ble_device_callback=lambda: self._device,
-            )
+            try:
+                client, slot = await self._establish_connection(
+                    self._connection_routes()
+                )
+            except Exception:
+                self._metrics.connect_failures += 1
+                raise
             _LOGGER.debug("%s: Connected; RSSI: %s", self.name, self.rssi)
             self._client = client
+            self._connection_slot = slot
+            slot.reclaim = partial(self._reclaim_connection, slot)
+            self._keep_alive.record_connection(reused=False)
 
             try:
                 self._resolve_characteristics(client.services)
@@ -309,31 +534,180 @@ class SwitchbotBaseDevice:
             )
             self._reset_disconnect_timer()
             await self._start_notify()
+        self._connection_idle()
+
+    async def prepare(self, window: float = PREPARE_WINDOW) -> None:
+        """Connect and subscribe to notifications ahead of a command.
+
+        The connection is held for at least window seconds, so a command
+        expected soon does not wait for the connection to be set up.
+        """
+        self._prepared_until = self.loop.time() + window
+        await self._ensure_connected()
+        self._reset_disconnect_timer()
+
+    def _connection_routes(self) -> list[AdapterSighting]:
+        """Return the adapters that recently heard the device, best RSSI first."""
+        if self._scanner and self._scanner.is_running:
+            if sightings := self._scanner.registry.get_sightings(self._device.address):
+                return sightings
+        return self._sightings.ordered()
+
+    async def _establish_connection(
+        self, routes: list[AdapterSighting]
+    ) -> tuple[BleakClientWithServiceCache, ConnectionSlot]:
+        """Connect through the adapter with the best RSSI.
+
+        If the connection fails, fall back to the adapter with the next
+        best RSSI. Every attempt holds a connection slot of the adapter
+        it goes through, the slot of the connected adapter is returned.
+        """
+        if not routes:
+            return await self._connect_through(
+                self._interface, self._device, lambda: self._device
+            )
+        last_route = routes[-1]
+        for route in routes:
+            _LOGGER.debug(
+                "%s: Connecting via %s; RSSI: %s", self.name, route.adapter, route.rssi
+            )
+            # The last adapter gets the default number of attempts
+            kwargs = (
+                {} if route is last_route else {"max_attempts": ADAPTER_FALLBACK_ATTEMPTS}
+            )
+            try:
+                return await self._connect_through(
+                    route.adapter,
+                    route.device,
+                    lambda route=route: route.device,
+                    **kwargs,
+                )
+            except (BleakNotFoundError, *BLEAK_RETRY_EXCEPTIONS) as ex:
+                if route is last_route:
+                    raise
+                _LOGGER.debug(
+                    "%s: Connecting via %s failed, trying next adapter: %s",
+                    self.name,
+                    route.adapter,
+                    ex,
+                )
+        raise RuntimeError("Unreachable")
+
+    async def _connect_through(
+        self,
+        adapter: str,
+        device: BLEDevice,
+        ble_device_callback: Callable[[], BLEDevice],
+        **kwargs: Any,
+    ) -> tuple[BleakClientWithServiceCache, ConnectionSlot]:
+        """Connect once a connection slot of the adapter is free."""
+        slot = await get_connection_scheduler().acquire(
+            adapter, self._connection_priority
+        )
+        # Time spent waiting for the slot is in the scheduler statistics
+        connect_started = time.monotonic()
+        try:
+            client = await establish_connection(
+                BleakClientWithServiceCache,
+                device,
+                self.name,
+                self._disconnected,
+                use_services_cache=True,
+                ble_device_callback=ble_device_callback,
+                **kwargs,
+            )
+        except BaseException:
+            slot.release()
+            raise
+        self._metrics.record_connect(adapter, time.monotonic() - connect_started)
+        return client, slot
 
     def _resolve_characteristics(self, services: BleakGATTServiceCollection) -> None:
-        """Resolve characteristics."""
+        """Resolve characteristics.
+
+        Handles from the GATT handle cache are looked up directly and
+        only checked against the expected UUIDs, a mismatch falls back
+        to the lookup by UUID.
+        """
+        cache = get_gatt_handle_cache()
+        address = self._device.address
+        firmware = self._get_adv_value("firmware")
+        if cache is not None and (handles := cache.get(address, firmware)):
+            read_char = services.get_characteristic(handles.read)
+            write_char = services.get_characteristic(handles.write)
+            if (
+                read_char is not None
+                and write_char is not None
+                and read_char.uuid == str(READ_CHAR_UUID)
+                and write_char.uuid == str(WRITE_CHAR_UUID)
+            ):
+                self._read_char = read_char
+                self._write_char = write_char
+                return
+            _LOGGER.debug("%s: Cached characteristic handles are stale", self.name)
+            cache.remove(address)
         self._read_char = services.get_characteristic(READ_CHAR_UUID)
         if not self._read_char:
             raise CharacteristicMissingError(READ_CHAR_UUID)
         self._write_char = services.get_characteristic(WRITE_CHAR_UUID)
         if not self._write_char:
             raise CharacteristicMissingError(WRITE_CHAR_UUID)
+        if cache is not None:
+            cache.set(
+                address,
+                firmware,
+                CharacteristicHandles(self._read_char.handle, self._write_char.handle),
+            )
 
     def _reset_disconnect_timer(self):
         """Reset disconnect timer."""
         self._cancel_disconnect_timer()
         self._expected_disconnect = False
         self._disconnect_timer = self.loop.call_later(
-            DISCONNECT_DELAY, self._disconnect_from_timer
+            max(self._keep_alive.delay, self._prepared_until - self.loop.time()),
+            self._disconnect_from_timer,
         )
 
+    def _release_connection_slot(self) -> None:
+        """Return the connection slot to the scheduler."""
+        if self._connection_slot is not None:
+            self._connection_slot.release()
+            self._connection_slot = None
+
+    def _connection_idle(self) -> None:
+        """Let the scheduler reclaim the connection slot while no operation runs."""
+        if self._connection_slot is not None and not self._operation_lock.locked():
+            self._connection_slot.idle()
+
+    def _reclaim_connection(self, slot: ConnectionSlot) -> bool:
+        """Disconnect for a device waiting for the slot, unless busy."""
+        if self._operation_lock.locked():
+            return False
+        _LOGGER.debug(
+            "%s: Disconnecting idle connection for a waiting device", self.name
+        )
+        self._timed_disconnect_task = asyncio.create_task(self._execute_reclaim(slot))
+        return True
+
+    async def _execute_reclaim(self, slot: ConnectionSlot) -> None:
+        """Disconnect the connection of the slot unless an operation started."""
+        async with self._connect_lock:
+            if slot is not self._connection_slot or self._operation_lock.locked():
+                # The operation hands the slot back when it is done
+                return
+            self._cancel_disconnect_timer()
+            await self._execute_disconnect_with_lock()
+
     def _disconnected(self, client: BleakClientWithServiceCache) -> None:
         """Disconnected callback."""
+        if client is self._client or self._client is None:
+            self._release_connection_slot()
         if self._expected_disconnect:
             _LOGGER.debug(
                 "%s: Disconnected from device; RSSI: %s", self.name, self.rssi
             )
             return
+        self._metrics.unexpected_disconnects += 1
         _LOGGER.warning(
             "%s: Device unexpectedly disconnected; RSSI: %s",
             self.name,
@@ -376,7 +750,7 @@ class SwitchbotBaseDevice:
         _LOGGER.debug(
             "%s: Executing timed disconnect after timeout of %s",
             self.name,
-            DISCONNECT_DELAY,
+            self._keep_alive.delay,
         )
         await self._execute_disconnect()
 
@@ -398,6 +772,7 @@ class SwitchbotBaseDevice:
         self._client = None
         self._read_char = None
         self._write_char = None
+        self._release_connection_slot()
         if not client:
             _LOGGER.debug("%s: Already disconnected", self.name)
             return
@@ -414,76 +789,100 @@ class SwitchbotBaseDevice:
         else:
             _LOGGER.debug("%s: Disconnect completed successfully", self.name)
 
-    async def _send_command_locked(self, key: str, command: bytes) -> bytes:
-        """Send command to device and read response."""
+    async def _send_commands_locked(
+        self, keys: list[str], commands: list[bytes]
+    ) -> list[bytes]:
+        """Send commands to device and read responses."""
         await self._ensure_connected()
-        try:
-            return await self._execute_command_locked(key, command)
-        except BleakDBusError as ex:
-            # Disconnect so we can reset state and try again
-            await asyncio.sleep(DBUS_ERROR_BACKOFF_TIME)
-            _LOGGER.debug(
-                "%s: RSSI: %s; Backing off %ss; Disconnecting due to error: %s",
-                self.name,
-                self.rssi,
-                DBUS_ERROR_BACKOFF_TIME,
-                ex,
-            )
-            await self._execute_forced_disconnect()
-            raise
-        except BLEAK_RETRY_EXCEPTIONS as ex:
-            # Disconnect so we can reset state and try again
-            _LOGGER.debug(
-                "%s: RSSI: %s; Disconnecting due to error: %s", self.name, self.rssi, ex
-            )
-            await self._execute_forced_disconnect()
-            raise
+        return await self._execute_commands_locked(keys, commands)
 
     def _notification_handler(self, _sender: int, data: bytearray) -> None:
         """Handle notification responses."""
-        if self._notify_future and not self._notify_future.done():
-            self._notify_future.set_result(data)
-            return
+        while self._notify_futures:
+            notify_future = self._notify_futures.popleft()
+            if not notify_future.done():
+                notify_future.set_result(data)
+                return
         _LOGGER.debug("%s: Received unsolicited notification: %s", self.name, data)
 
     async def _start_notify(self) -> None:
         """Start notification."""
         _LOGGER.debug("%s: Subscribe to notifications; RSSI: %s", self.name, self.rssi)
-        await self._client.start_notify(self._read_char, self._notification_handler)
+        client = self._client
+        await client.start_notify(
+            self._read_char, partial(self._connection_notification_handler, client)
+        )
 
-    async def _execute_command_locked(self, key: str, command: bytes) -> bytes:
-        """Execute command and read response."""
+    def _connection_notification_handler(
+        self, client: BleakClientWithServiceCache, sender: int, data: bytearray
+    ) -> None:
+        """Handle a notification unless its connection was replaced."""
+        if client is not self._client:
+            _LOGGER.debug(
+                "%s: Dropping notification of a previous connection: %s",
+                self.name,
+                data,
+            )
+            return
+        self._notification_handler(sender, data)
+
+    async def _execute_commands_locked(
+        self, keys: list[str], commands: list[bytes]
+    ) -> list[bytes]:
+        """Execute commands and read their responses."""
         assert self._client is not None
         assert self._read_char is not None
         assert self._write_char is not None
-        self._notify_future = self.loop.create_future()
         client = self._client
-
-        _LOGGER.debug("%s: Sending command: %s", self.name, key)
-        await client.write_gatt_char(self._write_char, command, False)
-
-        timeout = 5
-        timeout_handle = self.loop.call_at(
-            self.loop.time() + timeout, _handle_timeout, self._notify_future
-        )
-        timeout_expired = False
+        timeout = self._response_timeout.timeout
+        pending: list[
+            tuple[asyncio.Future[bytearray], asyncio.TimerHandle, float]
+        ] = []
+        notify_msgs: list[bytes] = []
         try:
-            notify_msg = await self._notify_future
-        except asyncio.TimeoutError:
-            timeout_expired = True
-            raise
+            for key, command in zip(keys, commands):
+                notify_future: asyncio.Future[bytearray] = self.loop.create_future()
+                self._notify_futures.append(notify_future)
+                _LOGGER.debug("%s: Sending command: %s", self.name, key)
+                await client.write_gatt_char(self._write_char, command, False)
+                sent_at = self.loop.time()
+                timeout_handle = self.loop.call_at(
+                    sent_at + timeout, _handle_timeout, notify_future
+                )
+                pending.append((notify_future, timeout_handle, sent_at))
+
+            for notify_future, _, sent_at in pending:
+                try:
+                    notify_msgs.append(await notify_future)
+                except asyncio.TimeoutError:
+                    _LOGGER.debug(
+                        "%s: No response within %ss; RSSI: %s",
+                        self.name,
+                        timeout,
+                        self.rssi,
+                    )
+                    self._response_timeout.record_timeout(timeout)
+                    self._metrics.timeouts += 1
+                    raise
+                latency = self.loop.time() - sent_at
+                self._response_timeout.record(latency)
+                self._metrics.command_time.observe(latency)
         finally:
-            if not timeout_expired:
+            for notify_future, timeout_handle, _ in pending:
                 timeout_handle.cancel()
-            self._notify_future = None
+                notify_future.cancel()
+            # Drop the futures of commands that were not answered
+            self._notify_futures.clear()
 
-        _LOGGER.debug("%s: Notification received: %s", self.name, notify_msg.hex())
-
-        if notify_msg == b"\x07":
-            _LOGGER.error("Password required")
-        elif notify_msg == b"\t":
-            _LOGGER.error("Password incorrect")
-        return notify_msg
+        for notify_msg in notify_msgs:
+            _LOGGER.debug(
+                "%s: Notification received: %s", self.name, notify_msg.hex()
+            )
+            if notify_msg == b"\x07":
+                _LOGGER.error("Password required")
+            elif notify_msg == b"\t":
+                _LOGGER.error("Password incorrect")
+        return notify_msgs
 
     def get_address(self) -> str:
         """Return address of device."""
@@ -519,11 +918,24 @@ class SwitchbotBaseDevice:
         # Only accept advertisements if the data is not missing
         # if we already have an advertisement with data
         self._device = advertisement.device
+        if adapter := get_ble_device_adapter(advertisement.device):
+            self._sightings.update(adapter, advertisement.rssi, advertisement.device)
 
     async def get_device_data(
         self, retry: int | None = None, interface: int | None = None
     ) -> SwitchBotAdvertisement | None:
         """Find switchbot devices and their advertisement data."""
+        if self._scanner and self._scanner.is_running:
+            address = self._device.address
+            if advertisement := (
+                self._scanner.get_advertisement(address)
+                or await self._scanner.wait_for_advertisement(
+                    address, self._scan_timeout
+                )
+            ):
+                self._replace_advertisement_data(advertisement)
+            return self._sb_adv_data
+
         if retry is None:
             retry = self._retry_count
 
@@ -532,15 +944,29 @@ class SwitchbotBaseDevice:
         else:
             _interface = int(self._interface.replace("hci", ""))
 
-        _data = await GetSwitchbotDevices(interface=_interface).discover(
-            retry=retry, scan_timeout=self._scan_timeout
+        discovery = GetSwitchbotDevices(
+            interface=_interface, interfaces=None if interface else self._interfaces
+        )
+        _data = await discovery.discover(
+            retry=retry,
+            scan_timeout=self._scan_timeout,
+            addresses=(self._device.address,),
         )
 
         if self._device.address in _data:
-            self._sb_adv_data = _data[self._device.address]
+            self._replace_advertisement_data(_data[self._device.address])
+        for sighting in discovery.registry.get_sightings(self._device.address):
+            self._sightings.update(sighting.adapter, sighting.rssi, sighting.device)
 
         return self._sb_adv_data
 
+    def _replace_advertisement_data(
+        self, advertisement: SwitchBotAdvertisement
+    ) -> None:
+        """Replace the data with that of an advertisement, without merging."""
+        self._sb_adv_data = advertisement
+        self._last_advertisement = advertisement
+
     async def _get_basic_info(self) -> bytes | None:
         """Return basic info of device."""
         _data = await self._send_command(
@@ -558,6 +984,8 @@ class SwitchbotBaseDevice:
         _LOGGER.debug("%s: Fire callbacks", self.name)
         for callback in self._callbacks:
             callback()
+        for batched_callback in self._batched_callbacks:
+            batched_callback.add(())
 
     def subscribe(self, callback: Callable[[], None]) -> Callable[[], None]:
         """Subscribe to device notifications."""
@@ -569,6 +997,38 @@ class SwitchbotBaseDevice:
 
         return _unsub
 
+    def subscribe_changes(
+        self, callback: Callable[[DeviceDataChanged], None]
+    ) -> Callable[[], None]:
+        """Subscribe to the old and new values of changed device data."""
+        self._change_callbacks.append(callback)
+
+        def _unsub() -> None:
+            """Unsubscribe from device changes."""
+            self._change_callbacks.remove(callback)
+
+        return _unsub
+
+    def subscribe_batched(
+        self,
+        callback: BatchedCallbackType,
+        window: float = DEFAULT_CALLBACK_WINDOW,
+    ) -> Callable[[], None]:
+        """Subscribe to batches of the keys of changed device data.
+
+        The callback is called at most once per window with the keys
+        changed since the last call, and may be a coroutine function.
+        """
+        batched_callback = BatchedCallback(callback, window)
+        self._batched_callbacks.append(batched_callback)
+
+        def _unsub() -> None:
+            """Unsubscribe from device changes."""
+            self._batched_callbacks.remove(batched_callback)
+            batched_callback.cancel()
+
+        return _unsub
+
     async def update(self, interface: int | None = None) -> None:
         """Update position, battery percent and light level of device."""
         if info := await self.get_basic_info():
@@ -576,6 +1036,39 @@ class SwitchbotBaseDevice:
             self._update_parsed_data(info)
             self._fire_callbacks()
 
+    async def _update_after_operation(self) -> None:
+        """Update after an operation, or schedule a debounced update."""
+        if self._state_from_response and self.skip_update_when_state_known:
+            _LOGGER.debug("%s: State known from response, skip update", self.name)
+            return
+        if (delay := self.update_after_operation_delay) is None:
+            await self.update()
+            return
+        if self._update_after_operation_timer:
+            self._update_after_operation_timer.cancel()
+        self._update_after_operation_timer = self.loop.call_later(
+            delay, self._start_update_after_operation
+        )
+
+    def _start_update_after_operation(self) -> None:
+        """Start the debounced update after operations."""
+        self._update_after_operation_timer = None
+        self._update_after_operation_task = asyncio.create_task(
+            self._async_update_after_operation(self._update_after_operation_task)
+        )
+
+    async def _async_update_after_operation(
+        self, previous: asyncio.Task[None] | None
+    ) -> None:
+        """Run the debounced update after operations."""
+        if previous is not None and not previous.done():
+            # Operations during an update are followed by one more update
+            await asyncio.wait((previous,))
+        try:
+            await self.update()
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.warning("%s: Update after operation failed: %s", self.name, ex)
+
     async def get_basic_info(self) -> dict[str, Any] | None:
         """Get device basic settings."""
         if not (_data := await self._get_basic_info()):
@@ -606,17 +1099,34 @@ class SwitchbotBaseDevice:
             return
         old_data = self._sb_adv_data.data.get("data") or {}
         merged_data = _merge_data(old_data, new_data)
-        if merged_data == old_data:
+        if merged_data is old_data:
             return False
+        self._last_advertisement = None
         self._set_parsed_data(self._sb_adv_data, merged_data)
+        if self._change_callbacks or self._batched_callbacks:
+            self._emit_changes(_diff_data(old_data, merged_data))
         return True
 
+    def _emit_changes(self, changes: tuple[FieldChange, ...]) -> None:
+        """Hand the changed keys to the change and batched subscribers."""
+        if self._change_callbacks:
+            event = DeviceDataChanged(self._device.address, changes)
+            for callback in self._change_callbacks:
+                try:
+                    callback(event)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("%s: Error in change callback", self.name)
+        if self._batched_callbacks:
+            keys = [change.key for change in changes]
+            for batched_callback in self._batched_callbacks:
+                batched_callback.add(keys)
+
     def _set_parsed_data(
-        self, advertisement: SwitchBotAdvertisement, data: dict[str, Any]
+        self, advertisement: SwitchBotAdvertisement, data: Mapping[str, Any]
     ) -> None:
         """Set data."""
-        self._sb_adv_data = replace(
-            advertisement, data=self._sb_adv_data.data | {"data": data}
+        self._sb_adv_data = advertisement.with_data(
+            self._sb_adv_data.data | {"data": data}
         )
 
     def _set_advertisement_data(self, advertisement: SwitchBotAdvertisement) -> None:
@@ -628,8 +1138,13 @@ class SwitchbotBaseDevice:
             self._last_full_update = time.monotonic()
         if not self._sb_adv_data:
             self._sb_adv_data = advertisement
-        elif new_data:
+        elif new_data and not (
+            # Merging the data of the last advertisement again changes nothing
+            (last := self._last_advertisement) is not None
+            and advertisement.same_payload(last)
+        ):
             self._update_parsed_data(new_data)
+        self._last_advertisement = advertisement
         self._override_adv_data = None
 
     def switch_mode(self) -> bool | None:
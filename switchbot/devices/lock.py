@@ -20,7 +20,8 @@ from ..const import (
     SwitchbotAccountConnectionError,
     SwitchbotAuthenticationError,
 )
-from .device import SwitchbotDevice, SwitchbotOperationError
+from ..scheduler import ConnectionPriority
+from .device import PREPARE_WINDOW, SwitchbotDevice, SwitchbotOperationError
 
 COMMAND_HEADER = "57"
 COMMAND_GET_CK_IV = f"{COMMAND_HEADER}0f2103"
@@ -46,6 +47,8 @@ COMMAND_RESULT_EXPECTED_VALUES = {1, 6}
 class SwitchbotLock(SwitchbotDevice):
     """Representation of a Switchbot Lock."""
 
+    _connection_priority = ConnectionPriority.HIGH
+
     def __init__(
         self,
         device: BLEDevice,
@@ -319,6 +322,14 @@ class SwitchbotLock(SwitchbotDevice):
         result = await super()._send_command(encrypted, retry)
         return result[:1] + self._decrypt(result[4:])
 
+    async def prepare(self, window: float = PREPARE_WINDOW) -> None:
+        """Connect and fetch the encryption IV ahead of a command."""
+        await super().prepare(window)
+        if not await self._ensure_encryption_initialized():
+            raise SwitchbotOperationError(
+                f"{self.name}: Failed to initialize encryption"
+            )
+
     async def _ensure_encryption_initialized(self) -> bool:
         if self._iv is not None:
             return True
@@ -4,6 +4,9 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from collections.abc import Iterable
+from contextlib import AsyncExitStack
+from functools import partial
 
 import bleak
 from bleak.backends.device import BLEDevice
@@ -12,125 +15,381 @@ from bleak.backends.scanner import AdvertisementData
 from .adv_parser import parse_advertisement_data
 from .const import DEFAULT_RETRY_COUNT, DEFAULT_RETRY_TIMEOUT, DEFAULT_SCAN_TIMEOUT
 from .models import SwitchBotAdvertisement
+from .registry import SwitchbotDeviceRegistry
 
 _LOGGER = logging.getLogger(__name__)
 CONNECT_LOCK = asyncio.Lock()
+_ADAPTER_LOCKS: dict[str, asyncio.Lock] = {"hci0": CONNECT_LOCK}
+
+
+def get_adapter_lock(adapter: str) -> asyncio.Lock:
+    """Return the lock serializing scans on an adapter."""
+    if (lock := _ADAPTER_LOCKS.get(adapter)) is None:
+        lock = _ADAPTER_LOCKS[adapter] = asyncio.Lock()
+    return lock
+
+
+def _adapter_names(interface: int, interfaces: Iterable[int] | None) -> list[str]:
+    """Return the adapter names to scan on."""
+    if interfaces is None:
+        return [f"hci{interface}"]
+    return [f"hci{idx}" for idx in sorted(set(interfaces))]
+
+
+async def _start_scanners(scanners: list[bleak.BleakScanner]) -> None:
+    """Start scanners, stopping them again if any of them fails to start."""
+    try:
+        results = await asyncio.gather(
+            *(scanner.start() for scanner in scanners), return_exceptions=True
+        )
+    except asyncio.CancelledError:
+        await _stop_scanners(scanners)
+        raise
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        await _stop_scanners(
+            [
+                scanner
+                for scanner, result in zip(scanners, results)
+                if not isinstance(result, BaseException)
+            ]
+        )
+        raise errors[0]
+
+
+async def _stop_scanners(scanners: list[bleak.BleakScanner]) -> None:
+    """Stop scanners, logging the ones that fail to stop."""
+    results = await asyncio.gather(
+        *(scanner.stop() for scanner in scanners), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            _LOGGER.warning("Failed to stop scanning: %s", result)
+
+
+class _DiscoveryTarget:
+    """Devices a discovery waits for before it stops scanning."""
+
+    def __init__(
+        self,
+        addresses: Iterable[str] | None,
+        models: Iterable[str] | None,
+        count: int | None,
+    ) -> None:
+        """Discovery target constructor."""
+        self._pending_addresses = {address.upper() for address in addresses or ()}
+        self._models = frozenset(models or ())
+        self._pending_models = set(self._models) if count is None else set()
+        self._count = count
+        self._matched: set[str] = set()
+
+    def _matches_models(self, advertisement: SwitchBotAdvertisement) -> bool:
+        """Return if the advertisement is of one of the target models."""
+        return (
+            advertisement.data.get("model") in self._models
+            or advertisement.data.get("modelName") in self._models
+        )
+
+    def update(self, advertisement: SwitchBotAdvertisement) -> bool:
+        """Record an advertisement and return if the target is complete."""
+        self._pending_addresses.discard(advertisement.address.upper())
+        if not self._models or self._matches_models(advertisement):
+            self._matched.add(advertisement.address)
+            self._pending_models.discard(advertisement.data.get("model"))
+            self._pending_models.discard(advertisement.data.get("modelName"))
+        return (
+            not self._pending_addresses
+            and not self._pending_models
+            and (self._count is None or len(self._matched) >= self._count)
+        )
 
 
 class GetSwitchbotDevices:
-    """Scan for all Switchbot devices and return by type."""
+    """Scan for all Switchbot devices and return by type.
 
-    def __init__(self, interface: int = 0) -> None:
+    Pass interfaces to scan several adapters at once. Advertisements of
+    a device heard by more than one adapter are merged in the registry.
+    """
+
+    def __init__(
+        self, interface: int = 0, interfaces: Iterable[int] | None = None
+    ) -> None:
         """Get switchbot devices class constructor."""
-        self._interface = f"hci{interface}"
-        self._adv_data: dict[str, SwitchBotAdvertisement] = {}
+        self._adapters = _adapter_names(interface, interfaces)
+        self._interface = self._adapters[0]
+        self._registry = SwitchbotDeviceRegistry()
+        self._target: _DiscoveryTarget | None = None
+        self._target_found: asyncio.Event | None = None
+        # Scans stopped early only saw part of the devices
+        self._full_scan_done = False
 
     def detection_callback(
         self,
         device: BLEDevice,
         advertisement_data: AdvertisementData,
+        adapter: str | None = None,
     ) -> None:
         """Callback for device detection."""
         discovery = parse_advertisement_data(device, advertisement_data)
         if discovery:
-            self._adv_data[discovery.address] = discovery
+            self._registry.update(discovery, adapter or self._interface)
+            if self._target and self._target.update(discovery):
+                self._target_found.set()
 
     async def discover(
-        self, retry: int = DEFAULT_RETRY_COUNT, scan_timeout: int = DEFAULT_SCAN_TIMEOUT
+        self,
+        retry: int = DEFAULT_RETRY_COUNT,
+        scan_timeout: int = DEFAULT_SCAN_TIMEOUT,
+        *,
+        addresses: Iterable[str] | None = None,
+        models: Iterable[str] | None = None,
+        count: int | None = None,
     ) -> dict:
-        """Find switchbot devices and their advertisement data."""
+        """Find switchbot devices and their advertisement data.
 
-        devices = None
-        devices = bleak.BleakScanner(
-            # TODO: Find new UUIDs to filter on. For example, see
-            # https://github.com/OpenWonderLabs/SwitchBotAPI-BLE/blob/4ad138bb09f0fbbfa41b152ca327a78c1d0b6ba9/devicetypes/meter.md
-            adapter=self._interface,
+        When addresses, models (model chars or SwitchbotModel names) or a
+        count of devices are given, scanning stops as soon as all of the
+        addresses and models or count matching devices have been seen.
+        scan_timeout is then only an upper bound.
+        """
+        has_target = addresses is not None or models is not None or count is not None
+        self._target = (
+            _DiscoveryTarget(addresses, models, count) if has_target else None
         )
-        devices.register_detection_callback(self.detection_callback)
+        self._target_found = asyncio.Event()
 
-        async with CONNECT_LOCK:
-            await devices.start()
-            await asyncio.sleep(scan_timeout)
-            await devices.stop()
+        devices = None
+        devices = [
+            bleak.BleakScanner(
+                # TODO: Find new UUIDs to filter on. For example, see
+                # https://github.com/OpenWonderLabs/SwitchBotAPI-BLE/blob/4ad138bb09f0fbbfa41b152ca327a78c1d0b6ba9/devicetypes/meter.md
+                detection_callback=partial(self.detection_callback, adapter=adapter),
+                adapter=adapter,
+            )
+            for adapter in self._adapters
+        ]
+
+        try:
+            # Adapters are locked in sorted order so overlapping
+            # discoveries cannot deadlock
+            async with AsyncExitStack() as stack:
+                for adapter in self._adapters:
+                    await stack.enter_async_context(get_adapter_lock(adapter))
+                await _start_scanners(devices)
+                try:
+                    await asyncio.wait_for(self._target_found.wait(), scan_timeout)
+                except asyncio.TimeoutError:
+                    self._full_scan_done = True
+                finally:
+                    await _stop_scanners(devices)
+        finally:
+            self._target = None
 
         if devices is None:
             if retry < 1:
                 _LOGGER.error(
                     "Scanning for Switchbot devices failed. Stop trying", exc_info=True
                 )
-                return self._adv_data
+                return self._registry.as_dict()
 
             _LOGGER.warning(
                 "Error scanning for Switchbot devices. Retrying (remaining: %d)",
                 retry,
             )
             await asyncio.sleep(DEFAULT_RETRY_TIMEOUT)
-            return await self.discover(retry - 1, scan_timeout)
+            return await self.discover(
+                retry - 1, scan_timeout, addresses=addresses, models=models, count=count
+            )
+
+        return self._registry.as_dict()
+
+    @property
+    def registry(self) -> SwitchbotDeviceRegistry:
+        """Return the registry of discovered devices."""
+        return self._registry
+
+    async def _get_devices_by_models(
+        self,
+        models: tuple[str, ...],
+        count: int | None = None,
+    ) -> dict:
+        """Get switchbot devices by type.
 
-        return self._adv_data
+        With a count, discovery stops once that many of the devices
+        have been seen. Devices seen by an earlier scan are reused
+        unless that scan stopped early without enough of them.
+        """
+        if not self._full_scan_done:
+            if count is None:
+                await self.discover()
+            elif len(self._registry.get_by_models(models)) < count:
+                await self.discover(models=models, count=count)
+
+        return self._registry.get_by_models(models)
 
     async def _get_devices_by_model(
         self,
         model: str,
+        count: int | None = None,
     ) -> dict:
         """Get switchbot devices by type."""
-        if not self._adv_data:
-            await self.discover()
-
-        return {
-            address: adv
-            for address, adv in self._adv_data.items()
-            if adv.data.get("model") == model
-        }
+        return await self._get_devices_by_models((model,), count)
 
-    async def get_blind_tilts(self) -> dict[str, SwitchBotAdvertisement]:
+    async def get_blind_tilts(
+        self, count: int | None = None
+    ) -> dict[str, SwitchBotAdvertisement]:
         """Return all WoBlindTilt/BlindTilts devices with services data."""
-        regular_blinds = await self._get_devices_by_model("x")
-        pairing_blinds = await self._get_devices_by_model("X")
-        return {**regular_blinds, **pairing_blinds}
+        return await self._get_devices_by_models(("x", "X"), count)
 
-    async def get_curtains(self) -> dict[str, SwitchBotAdvertisement]:
+    async def get_curtains(
+        self, count: int | None = None
+    ) -> dict[str, SwitchBotAdvertisement]:
         """Return all WoCurtain/Curtains devices with services data."""
-        regular_curtains = await self._get_devices_by_model("c")
-        pairing_curtains = await self._get_devices_by_model("C")
-        regular_curtains3 = await self._get_devices_by_model("{")
-        pairing_curtains3 = await self._get_devices_by_model("[")
-        return {
-            **regular_curtains,
-            **pairing_curtains,
-            **regular_curtains3,
-            **pairing_curtains3,
-        }
-
-    async def get_bots(self) -> dict[str, SwitchBotAdvertisement]:
+        return await self._get_devices_by_models(("c", "C", "{", "["), count)
+
+    async def get_bots(
+        self, count: int | None = None
+    ) -> dict[str, SwitchBotAdvertisement]:
         """Return all WoHand/Bot devices with services data."""
-        return await self._get_devices_by_model("H")
+        return await self._get_devices_by_model("H", count)
 
-    async def get_tempsensors(self) -> dict[str, SwitchBotAdvertisement]:
+    async def get_tempsensors(
+        self, count: int | None = None
+    ) -> dict[str, SwitchBotAdvertisement]:
         """Return all WoSensorTH/Temp sensor devices with services data."""
-        base_meters = await self._get_devices_by_model("T")
-        plus_meters = await self._get_devices_by_model("i")
-        io_meters = await self._get_devices_by_model("w")
-        return {**base_meters, **plus_meters, **io_meters}
+        return await self._get_devices_by_models(("T", "i", "w"), count)
 
-    async def get_contactsensors(self) -> dict[str, SwitchBotAdvertisement]:
+    async def get_contactsensors(
+        self, count: int | None = None
+    ) -> dict[str, SwitchBotAdvertisement]:
         """Return all WoContact/Contact sensor devices with services data."""
-        return await self._get_devices_by_model("d")
+        return await self._get_devices_by_model("d", count)
 
-    async def get_locks(self) -> dict[str, SwitchBotAdvertisement]:
+    async def get_locks(
+        self, count: int | None = None
+    ) -> dict[str, SwitchBotAdvertisement]:
         """Return all WoLock/Locks devices with services data."""
-        return await self._get_devices_by_model("o")
+        return await self._get_devices_by_model("o", count)
 
     async def get_device_data(
         self, address: str
     ) -> dict[str, SwitchBotAdvertisement] | None:
         """Return data for specific device."""
-        if not self._adv_data:
-            await self.discover()
-
-        return {
-            device: adv
-            for device, adv in self._adv_data.items()
-            # MacOS uses UUIDs instead of MAC addresses
-            if adv.data.get("address") == address
-        }
+        # MacOS uses UUIDs instead of MAC addresses
+        if address not in self._registry:
+            await self.discover(addresses=(address,))
+
+        if (adv := self._registry.get(address)) is None:
+            return {}
+        return {adv.address: adv}
+
+
+class SwitchbotScanner:
+    """Long running scanner shared by many consumers.
+
+    Keeps scanning until stopped and maintains the latest advertisement
+    of every Switchbot device, so callers can take a snapshot or wait
+    for the next advertisement of an address without starting a scan
+    of their own. Pass interfaces to scan several adapters at once.
+    """
+
+    def __init__(
+        self, interface: int = 0, interfaces: Iterable[int] | None = None
+    ) -> None:
+        """Switchbot scanner constructor."""
+        self._adapters = _adapter_names(interface, interfaces)
+        self._interface = self._adapters[0]
+        self._scanners: list[bleak.BleakScanner] | None = None
+        self._registry = SwitchbotDeviceRegistry()
+        self._waiters: dict[str, list[asyncio.Future[SwitchBotAdvertisement]]] = {}
+        # Serializes start and stop so concurrent calls start one scan
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def registry(self) -> SwitchbotDeviceRegistry:
+        """Return the registry of devices seen."""
+        return self._registry
+
+    @property
+    def is_running(self) -> bool:
+        """Return if the scanner is running."""
+        return self._scanners is not None
+
+    async def start(self) -> None:
+        """Start scanning."""
+        async with self._start_lock:
+            if self._scanners is not None:
+                return
+            scanners = [
+                bleak.BleakScanner(
+                    detection_callback=partial(
+                        self.detection_callback, adapter=adapter
+                    ),
+                    adapter=adapter,
+                )
+                for adapter in self._adapters
+            ]
+            await _start_scanners(scanners)
+            self._scanners = scanners
+
+    async def stop(self) -> None:
+        """Stop scanning."""
+        async with self._start_lock:
+            if self._scanners is None:
+                return
+            scanners = self._scanners
+            self._scanners = None
+            await _stop_scanners(scanners)
+
+    async def __aenter__(self) -> SwitchbotScanner:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.stop()
+
+    def detection_callback(
+        self,
+        device: BLEDevice,
+        advertisement_data: AdvertisementData,
+        adapter: str | None = None,
+    ) -> None:
+        """Callback for device detection."""
+        discovery = parse_advertisement_data(device, advertisement_data)
+        if not discovery:
+            return
+        discovery = self._registry.update(discovery, adapter or self._interface)
+        if waiters := self._waiters.pop(discovery.address, None):
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(discovery)
+
+    def snapshot(self) -> dict[str, SwitchBotAdvertisement]:
+        """Return the latest advertisement of every device seen."""
+        return self._registry.as_dict()
+
+    def get_advertisement(self, address: str) -> SwitchBotAdvertisement | None:
+        """Return the latest advertisement of a device."""
+        return self._registry.get(address)
+
+    async def wait_for_advertisement(
+        self, address: str, timeout: float = DEFAULT_SCAN_TIMEOUT
+    ) -> SwitchBotAdvertisement | None:
+        """Wait for the next advertisement of a device.
+
+        Returns None if none arrives within timeout seconds.
+        """
+        waiter: asyncio.Future[
+            SwitchBotAdvertisement
+        ] = asyncio.get_running_loop().create_future()
+        waiters = self._waiters.setdefault(address, [])
+        waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if waiter in waiters:
+                waiters.remove(waiter)
+                if not waiters and self._waiters.get(address) is waiters:
+                    del self._waiters[address]
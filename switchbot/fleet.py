@@ -0,0 +1,146 @@
+"""Run operations on many devices concurrently."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .devices.device import SwitchbotBaseDevice
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bound for a whole run of the fleet controller
+DEFAULT_FLEET_DEADLINE = 60.0
+
+
+@dataclass(frozen=True)
+class FleetCommand:
+    """An operation to run on a device, such as close or set_position."""
+
+    device: SwitchbotBaseDevice
+    operation: str
+    args: tuple[Any, ...] = ()
+    kwargs: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class FleetResult:
+    """Outcome of a fleet command."""
+
+    command: FleetCommand
+    result: Any = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Return if the operation completed without error."""
+        return self.error is None
+
+
+class FleetController:
+    """Run operations on many devices concurrently.
+
+    Commands of the same device run in order over one connection, while
+    the devices run concurrently. The connection scheduler keeps the
+    number of connections of each adapter in bounds. A device that does
+    not finish before device_deadline, or the whole run not finishing
+    before deadline, fails the remaining commands with a timeout instead
+    of delaying the other devices.
+    """
+
+    def __init__(
+        self,
+        deadline: float | None = DEFAULT_FLEET_DEADLINE,
+        device_deadline: float | None = None,
+    ) -> None:
+        """Fleet controller constructor."""
+        self.deadline = deadline
+        self.device_deadline = device_deadline
+
+    async def run(
+        self,
+        commands: Iterable[
+            FleetCommand
+            | tuple[SwitchbotBaseDevice, str]
+            | tuple[SwitchbotBaseDevice, str, tuple[Any, ...]]
+        ],
+    ) -> list[FleetResult]:
+        """Run the commands and return their results in the same order."""
+        fleet_commands = [
+            command if isinstance(command, FleetCommand) else FleetCommand(*command)
+            for command in commands
+        ]
+        for command in fleet_commands:
+            if not callable(getattr(command.device, command.operation, None)):
+                raise ValueError(
+                    f"{command.device.name}: Unknown operation {command.operation}"
+                )
+        results: list[FleetResult | None] = [None] * len(fleet_commands)
+
+        # Group the commands of each device to connect once per device
+        groups: dict[str, list[int]] = {}
+        for idx, command in enumerate(fleet_commands):
+            groups.setdefault(command.device.get_address(), []).append(idx)
+
+        tasks = [
+            asyncio.create_task(self._run_device(fleet_commands, indexes, results))
+            for indexes in groups.values()
+        ]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self.deadline)
+            for task in pending:
+                task.cancel()
+            if pending:
+                _LOGGER.debug(
+                    "Fleet deadline of %ss reached with %s devices pending",
+                    self.deadline,
+                    len(pending),
+                )
+                await asyncio.wait(pending)
+
+        return [
+            result
+            if result is not None
+            else FleetResult(command, error=asyncio.TimeoutError())
+            for command, result in zip(fleet_commands, results)
+        ]
+
+    async def _run_device(
+        self,
+        commands: list[FleetCommand],
+        indexes: list[int],
+        results: list[FleetResult | None],
+    ) -> None:
+        """Run the commands of one device in order."""
+        deadline = (
+            None
+            if self.device_deadline is None
+            else time.monotonic() + self.device_deadline
+        )
+        for idx in indexes:
+            command = commands[idx]
+            operation = getattr(command.device, command.operation)
+            try:
+                if deadline is None:
+                    result = await operation(*command.args, **command.kwargs)
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError
+                    result = await asyncio.wait_for(
+                        operation(*command.args, **command.kwargs), remaining
+                    )
+            except Exception as ex:  # pylint: disable=broad-except
+                _LOGGER.debug(
+                    "%s: Fleet operation %s failed: %s",
+                    command.device.name,
+                    command.operation,
+                    ex,
+                )
+                results[idx] = FleetResult(command, error=ex)
+            else:
+                results[idx] = FleetResult(command, result)
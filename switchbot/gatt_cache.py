@@ -0,0 +1,154 @@
+"""Persistent cache of resolved GATT characteristic handles."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CharacteristicHandles:
+    """Handles of the characteristics used to talk to a device."""
+
+    read: int
+    write: int
+
+
+class GattHandleCache:
+    """Characteristic handles of devices stored in a JSON file.
+
+    Entries are keyed by address. The firmware they were resolved with
+    is kept as a hint: an entry of other firmware is a miss, but an
+    unknown firmware, as before the first connection after a restart,
+    is not. Callers check the handles they get against the expected
+    UUIDs anyway.
+
+    The file is read when the cache is installed with
+    set_gatt_handle_cache, and written whenever an entry changes, in an
+    executor when an event loop is running.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """GATT handle cache constructor."""
+        self.path = os.fspath(path)
+        self._entries: dict[str, dict[str, Any]] | None = None
+        self._dirty = False
+        self._save_task: asyncio.Task[None] | None = None
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        """Return the entries, reading the file on first use."""
+        if self._entries is None:
+            try:
+                with open(self.path, encoding="utf-8") as file:
+                    entries = json.load(file)
+            except FileNotFoundError:
+                entries = {}
+            except (OSError, ValueError) as ex:
+                _LOGGER.warning("Ignoring unreadable GATT cache %s: %s", self.path, ex)
+                entries = {}
+            self._entries = entries if isinstance(entries, dict) else {}
+        return self._entries
+
+    def _save(self) -> None:
+        """Write the entries, in the background when a loop is running."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(json.dumps(self._entries))
+            return
+        self._dirty = True
+        if self._save_task is None:
+            self._save_task = loop.create_task(self._async_save())
+
+    async def _async_save(self) -> None:
+        """Write the entries until no change is left unwritten."""
+        loop = asyncio.get_running_loop()
+        try:
+            while self._dirty:
+                self._dirty = False
+                await loop.run_in_executor(
+                    None, self._write, json.dumps(self._entries)
+                )
+        finally:
+            self._save_task = None
+
+    def _write(self, contents: str) -> None:
+        """Write the file atomically."""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                file.write(contents)
+            os.replace(tmp_path, self.path)
+        except OSError as ex:
+            _LOGGER.warning("Failed to write GATT cache %s: %s", self.path, ex)
+
+    async def async_flush(self) -> None:
+        """Wait for changes being written in the background."""
+        if self._save_task is not None:
+            await asyncio.shield(self._save_task)
+
+    def get(
+        self, address: str, firmware: Any = None
+    ) -> CharacteristicHandles | None:
+        """Return the handles of a device, None if unknown or of other firmware."""
+        entry = self._load().get(address.upper())
+        if entry is None or (
+            firmware is not None
+            and (stored := entry.get("firmware")) is not None
+            and stored != firmware
+        ):
+            return None
+        try:
+            return CharacteristicHandles(int(entry["read"]), int(entry["write"]))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def set(
+        self, address: str, firmware: Any, handles: CharacteristicHandles
+    ) -> None:
+        """Store the handles of a device, keeping a known firmware if None."""
+        entries = self._load()
+        if firmware is None and (old_entry := entries.get(address.upper())):
+            firmware = old_entry.get("firmware")
+        entry = {"firmware": firmware, "read": handles.read, "write": handles.write}
+        if entries.get(address.upper()) == entry:
+            return
+        entries[address.upper()] = entry
+        self._save()
+
+    def remove(self, address: str) -> None:
+        """Forget the handles of a device."""
+        if self._load().pop(address.upper(), None) is not None:
+            self._save()
+
+    def clear(self) -> None:
+        """Forget all handles."""
+        self._entries = {}
+        self._save()
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+
+_GATT_HANDLE_CACHE: GattHandleCache | None = None
+
+
+def get_gatt_handle_cache() -> GattHandleCache | None:
+    """Return the GATT handle cache shared by all devices, if any."""
+    return _GATT_HANDLE_CACHE
+
+
+def set_gatt_handle_cache(cache: GattHandleCache | None) -> None:
+    """Set the GATT handle cache shared by all devices, None disables it.
+
+    The file of the cache is read here, so connecting does not wait on it.
+    """
+    global _GATT_HANDLE_CACHE
+    if cache is not None:
+        cache._load()
+    _GATT_HANDLE_CACHE = cache
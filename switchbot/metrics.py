@@ -0,0 +1,158 @@
+"""Latency and reliability metrics of devices."""
+from __future__ import annotations
+
+import bisect
+from collections.abc import Iterable
+
+# Upper bounds of the latency buckets in seconds
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Upper bounds of the RSSI buckets in dBm
+DEFAULT_RSSI_BUCKETS = (-90.0, -80.0, -70.0, -60.0, -50.0)
+
+_COUNTERS = (
+    ("connects", "Connections established"),
+    ("connect_failures", "Connection attempts that failed"),
+    ("commands", "Commands requested, not counting retries"),
+    ("retries", "Command attempts that were retried"),
+    ("timeouts", "Commands without a response in time"),
+    ("dbus_errors", "Command attempts that failed with a D-Bus error"),
+    ("unexpected_disconnects", "Disconnects not initiated by the library"),
+)
+
+_HISTOGRAMS = (
+    ("connect_time", "seconds", "Time to establish a connection"),
+    ("command_time", "seconds", "Time from writing a command to its response"),
+    ("lock_wait_time", "seconds", "Time commands waited for the operation lock"),
+    ("rssi", "dbm", "RSSI when commands were sent"),
+)
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket upper bounds."""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        """Histogram constructor."""
+        self.buckets = tuple(sorted(buckets))
+        # One count per bucket and one for values above the last bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add a value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of the values, None without values."""
+        return self.sum / self.count if self.count else None
+
+    def cumulative_counts(self) -> list[int]:
+        """Return the number of values up to each bucket, then of all values."""
+        counts = []
+        total = 0
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+
+class DeviceMetrics:
+    """Counters and histograms of the command path of a device.
+
+    Updating them is a few integer operations, so they are always on.
+    Connections are also counted per adapter to find the adapters that
+    slow down the fleet.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        latency_buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+        rssi_buckets: Iterable[float] = DEFAULT_RSSI_BUCKETS,
+    ) -> None:
+        """Device metrics constructor."""
+        self.address = address
+        self.connects = 0
+        self.connect_failures = 0
+        self.commands = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.dbus_errors = 0
+        self.unexpected_disconnects = 0
+        self.connects_by_adapter: dict[str, int] = {}
+        self.connect_time = Histogram(latency_buckets)
+        self.command_time = Histogram(latency_buckets)
+        self.lock_wait_time = Histogram(latency_buckets)
+        self.rssi = Histogram(rssi_buckets)
+
+    def record_connect(self, adapter: str, duration: float) -> None:
+        """Record an established connection."""
+        self.connects += 1
+        self.connects_by_adapter[adapter] = self.connects_by_adapter.get(adapter, 0) + 1
+        self.connect_time.observe(duration)
+
+    def as_prometheus(self) -> str:
+        """Return the metrics in the Prometheus text format."""
+        return format_prometheus((self,))
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    """Return Prometheus labels."""
+    escaped = (
+        key
+        + '="'
+        + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        + '"'
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    """Return a bucket bound the way Prometheus clients do."""
+    return repr(float(bound))
+
+
+def format_prometheus(
+    metrics: Iterable[DeviceMetrics], prefix: str = "switchbot"
+) -> str:
+    """Return the metrics of many devices in the Prometheus text format."""
+    metrics = list(metrics)
+    lines: list[str] = []
+    for attr, help_text in _COUNTERS:
+        name = f"{prefix}_{attr}_total"
+        lines.append(f"# HELP {name} {help_text}.")
+        lines.append(f"# TYPE {name} counter")
+        for device in metrics:
+            labels = _format_labels({"address": device.address})
+            lines.append(f"{name}{labels} {getattr(device, attr)}")
+
+    name = f"{prefix}_adapter_connects_total"
+    lines.append(f"# HELP {name} Connections established per adapter.")
+    lines.append(f"# TYPE {name} counter")
+    for device in metrics:
+        for adapter, count in sorted(device.connects_by_adapter.items()):
+            labels = _format_labels({"address": device.address, "adapter": adapter})
+            lines.append(f"{name}{labels} {count}")
+
+    for attr, unit, help_text in _HISTOGRAMS:
+        name = f"{prefix}_{attr.removesuffix('_time')}_{unit}"
+        lines.append(f"# HELP {name} {help_text}.")
+        lines.append(f"# TYPE {name} histogram")
+        for device in metrics:
+            histogram: Histogram = getattr(device, attr)
+            counts = histogram.cumulative_counts()
+            for bound, count in zip((*histogram.buckets, "+Inf"), counts):
+                le = bound if isinstance(bound, str) else _format_bound(bound)
+                labels = _format_labels({"address": device.address, "le": le})
+                lines.append(f"{name}_bucket{labels} {count}")
+            labels = _format_labels({"address": device.address})
+            lines.append(f"{name}_sum{labels} {histogram.sum}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+    return "\n".join(lines) + "\n"
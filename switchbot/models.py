@@ -1,18 +1,143 @@
 """Library to handle connection with Switchbot."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, TypeVar
 
 from bleak.backends.device import BLEDevice
 
+_RecordT = TypeVar("_RecordT", bound="ParsedRecord")
 
-@dataclass
+
+@dataclass(frozen=True, slots=True, eq=False)
 class SwitchBotAdvertisement:
-    """Switchbot advertisement."""
+    """Switchbot advertisement.
+
+    Advertisements created by the parser carry the raw payload they were
+    parsed from, and its hash. Two advertisements with the same raw
+    payload have the same data, so comparing them needs no walk of the
+    nested data dicts.
+    """
 
     address: str
     data: dict[str, Any]
     device: BLEDevice
     rssi: int
     active: bool = False
+    raw_payload: tuple[Any, ...] | None = field(default=None, repr=False)
+    payload_hash: int | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.raw_payload is not None:
+            object.__setattr__(self, "payload_hash", hash(self.raw_payload))
+
+    def same_payload(self, other: SwitchBotAdvertisement) -> bool:
+        """Return if both advertisements are known to have the same data.
+
+        Unlike same_data this never compares the data itself, so it is
+        cheap but False for advertisements without a raw payload.
+        """
+        return self.data is other.data or (
+            self.payload_hash is not None
+            and self.payload_hash == other.payload_hash
+            and self.raw_payload == other.raw_payload
+        )
+
+    def same_data(self, other: SwitchBotAdvertisement) -> bool:
+        """Return if the data of both advertisements is equal."""
+        return self.same_payload(other) or self.data == other.data
+
+    def with_data(self, data: dict[str, Any]) -> SwitchBotAdvertisement:
+        """Return a copy with other data, no longer tied to the raw payload."""
+        return self.__class__(self.address, data, self.device, self.rssi, self.active)
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.address == other.address
+            and self.rssi == other.rssi
+            and self.active == other.active
+            and self.device == other.device
+            and self.same_data(other)
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class FieldChange:
+    """A key of the device data that changed, None when it was missing."""
+
+    key: str
+    old: Any
+    new: Any
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceDataChanged:
+    """The keys of the data of a device changed by one update."""
+
+    address: str
+    changes: tuple[FieldChange, ...]
+
+    @property
+    def keys(self) -> frozenset[str]:
+        """Return the changed keys."""
+        return frozenset(change.key for change in self.changes)
+
+    def get(self, key: str) -> FieldChange | None:
+        """Return the change of a key, None if it did not change."""
+        for change in self.changes:
+            if change.key == key:
+                return change
+        return None
+
+
+def parsed_record(cls: type[_RecordT]) -> type[_RecordT]:
+    """Turn a ParsedRecord subclass into a slotted, frozen dataclass."""
+    return dataclass(frozen=True, slots=True, eq=False)(cls)
+
+
+class ParsedRecord(Mapping[str, Any]):
+    """Immutable parsed advertisement data.
+
+    Subclasses are declared with the parsed_record decorator and list
+    the keys returned by their parser as fields. The record is also a
+    read-only mapping so it can be used where the parser dict was.
+    """
+
+    __slots__ = ()
+
+    # Keys of the mapping view computed from the fields
+    derived_keys: ClassVar[tuple[str, ...]] = ()
+
+    @classmethod
+    def from_dict(cls: type[_RecordT], data: Mapping[str, Any]) -> _RecordT:
+        """Create a record from the dict returned by a parser."""
+        return cls(*(data[key] for key in cls.__match_args__))
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__match_args__ or key in self.derived_keys:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.__match_args__
+        yield from self.derived_keys
+
+    def __len__(self) -> int:
+        return len(self.__match_args__) + len(self.derived_keys)
+
+    def __bool__(self) -> bool:
+        # Records always have keys, skip counting them
+        return True
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is self.__class__:
+            return all(
+                getattr(self, key) == getattr(other, key)
+                for key in self.__match_args__
+            )
+        return super().__eq__(other)
@@ -0,0 +1,182 @@
+"""Caches for parsed advertisement data."""
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Any
+
+MISSING: Any = object()
+
+DEFAULT_PARSE_CACHE_SIZE = 128
+
+# Addresses kept by the per address cache, bounded for devices that
+# rotate random addresses
+DEFAULT_PER_ADDRESS_CACHE_SIZE = 1024
+
+
+@dataclass
+class ParseCacheStats:
+    """Parse cache statistics."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the ratio of lookups that were served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ParseCache(ABC):
+    """Base class for parse caches."""
+
+    def __init__(self) -> None:
+        """Parse cache constructor."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def stats(self) -> ParseCacheStats:
+        """Return a snapshot of the cache statistics."""
+        return ParseCacheStats(self.hits, self.misses, self.evictions)
+
+    @abstractmethod
+    def get(self, address: str, key: Hashable) -> Any:
+        """Return the cached value or MISSING."""
+
+    @abstractmethod
+    def set(self, address: str, key: Hashable, value: Any) -> None:
+        """Store a value."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+
+
+class LRUParseCache(ParseCache):
+    """Least recently used cache shared by all addresses."""
+
+    def __init__(self, maxsize: int = DEFAULT_PARSE_CACHE_SIZE) -> None:
+        """LRU parse cache constructor."""
+        super().__init__()
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, address: str, key: Hashable) -> Any:
+        """Return the cached value or MISSING."""
+        data = self._data
+        if (value := data.get(key, MISSING)) is MISSING:
+            self.misses += 1
+            return MISSING
+        data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, address: str, key: Hashable, value: Any) -> None:
+        """Store a value."""
+        data = self._data
+        if key in data:
+            data.move_to_end(key)
+        data[key] = value
+        while len(data) > self.maxsize:
+            data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._data)
+
+
+class TTLParseCache(LRUParseCache):
+    """LRU cache whose entries expire after a fixed time."""
+
+    def __init__(
+        self, ttl: float, maxsize: int = DEFAULT_PARSE_CACHE_SIZE
+    ) -> None:
+        """TTL parse cache constructor."""
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self._expires: dict[Hashable, float] = {}
+
+    def get(self, address: str, key: Hashable) -> Any:
+        """Return the cached value or MISSING."""
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            del self._data[key]
+            del self._expires[key]
+            self.evictions += 1
+        return super().get(address, key)
+
+    def set(self, address: str, key: Hashable, value: Any) -> None:
+        """Store a value."""
+        self._expires[key] = time.monotonic() + self.ttl
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            evicted, _ = self._data.popitem(last=False)
+            del self._expires[evicted]
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        super().clear()
+        self._expires.clear()
+
+
+class PerAddressParseCache(ParseCache):
+    """Cache holding the last parsed value of every address.
+
+    Devices that rotate a sequence number or counter only ever hit
+    their own most recent entry, so one slot per address avoids
+    them evicting each other.
+    """
+
+    def __init__(
+        self, maxsize: int | None = DEFAULT_PER_ADDRESS_CACHE_SIZE
+    ) -> None:
+        """Per address parse cache constructor."""
+        super().__init__()
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[Hashable, Any]] = OrderedDict()
+
+    def get(self, address: str, key: Hashable) -> Any:
+        """Return the cached value or MISSING."""
+        slot = self._data.get(address)
+        if slot is None or slot[0] != key:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        return slot[1]
+
+    def set(self, address: str, key: Hashable, value: Any) -> None:
+        """Store a value."""
+        if address in self._data:
+            self.evictions += 1
+            self._data.move_to_end(address)
+        self._data[address] = (key, value)
+        if self.maxsize is not None:
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._data)
@@ -0,0 +1,233 @@
+"""Policies tuning how devices talk to the hardware."""
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import time
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+from enum import Enum
+from typing import cast
+
+from bleak.exc import BleakDBusError
+from bleak_retry_connector import BLEAK_RETRY_EXCEPTIONS, BleakNotFoundError
+
+DEFAULT_RESPONSE_TIMEOUT_FLOOR = 1.0
+DEFAULT_RESPONSE_TIMEOUT_CEILING = 5.0
+DEFAULT_RESPONSE_TIMEOUT_MARGIN = 0.5
+DEFAULT_RESPONSE_TIMEOUT_PERCENTILE = 0.99
+DEFAULT_RESPONSE_TIMEOUT_MIN_SAMPLES = 20
+DEFAULT_RESPONSE_TIMEOUT_WINDOW = 100
+
+DEFAULT_RETRY_BASE_DELAY = 0.25
+DEFAULT_RETRY_MAX_DELAY = 4.0
+
+DEFAULT_KEEP_ALIVE_DELAY = 8.5
+DEFAULT_KEEP_ALIVE_MIN_DELAY = 2.0
+DEFAULT_KEEP_ALIVE_MAX_DELAY = 30.0
+DEFAULT_KEEP_ALIVE_MARGIN = 1.5
+DEFAULT_KEEP_ALIVE_PERCENTILE = 0.75
+DEFAULT_KEEP_ALIVE_MIN_SAMPLES = 3
+DEFAULT_KEEP_ALIVE_WINDOW = 20
+
+
+def _percentile(samples: Iterable[float], percentile: float) -> float:
+    """Return the nearest rank percentile of non empty samples."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, math.ceil(percentile * len(ordered)) - 1)
+    return ordered[max(index, 0)]
+
+
+class AdaptiveTimeout:
+    """Response timeout derived from the observed response latency.
+
+    The timeout is a high percentile of the recent latencies plus a
+    margin, kept between a floor and a ceiling. Until enough samples
+    have been recorded the ceiling is used.
+    """
+
+    def __init__(
+        self,
+        floor: float = DEFAULT_RESPONSE_TIMEOUT_FLOOR,
+        ceiling: float = DEFAULT_RESPONSE_TIMEOUT_CEILING,
+        margin: float = DEFAULT_RESPONSE_TIMEOUT_MARGIN,
+        percentile: float = DEFAULT_RESPONSE_TIMEOUT_PERCENTILE,
+        min_samples: int = DEFAULT_RESPONSE_TIMEOUT_MIN_SAMPLES,
+        window: int = DEFAULT_RESPONSE_TIMEOUT_WINDOW,
+    ) -> None:
+        """Adaptive timeout constructor."""
+        if floor > ceiling:
+            raise ValueError("floor must not be greater than ceiling")
+        self.floor = floor
+        self.ceiling = ceiling
+        self.margin = margin
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+        self._timeout: float | None = None
+
+    def record(self, latency: float) -> None:
+        """Record the latency of a response in seconds."""
+        self._samples.append(latency)
+        self._timeout = None
+
+    def record_timeout(self, timeout: float) -> None:
+        """Record a response that did not arrive within timeout seconds.
+
+        The timeout is recorded as a latency so the computed timeout
+        grows when responses keep getting lost.
+        """
+        self.record(timeout)
+
+    @property
+    def samples(self) -> int:
+        """Return the number of latencies the timeout is computed from."""
+        return len(self._samples)
+
+    @property
+    def latency(self) -> float | None:
+        """Return the percentile of the recorded latencies."""
+        if not self._samples:
+            return None
+        return _percentile(self._samples, self.percentile)
+
+    @property
+    def timeout(self) -> float:
+        """Return the response timeout in seconds."""
+        if self._timeout is None:
+            if len(self._samples) < self.min_samples:
+                self._timeout = self.ceiling
+            else:
+                self._timeout = min(
+                    self.ceiling,
+                    max(self.floor, cast(float, self.latency) + self.margin),
+                )
+        return self._timeout
+
+
+class RetryAction(Enum):
+    """What to do after a failed command attempt."""
+
+    # Send the command again over the same connection
+    RESEND = "resend"
+    # Disconnect, then connect again and send the command
+    RECONNECT = "reconnect"
+    # Give up and raise the error
+    ABORT = "abort"
+
+
+DEFAULT_ERROR_ACTIONS: tuple[tuple[type[BaseException], RetryAction], ...] = (
+    (BleakNotFoundError, RetryAction.ABORT),
+    # Notifications carry no id, so a late response could be taken for
+    # the response to a resent command, only a new connection is safe
+    (asyncio.TimeoutError, RetryAction.RECONNECT),
+    (BleakDBusError, RetryAction.RECONNECT),
+    *((exc, RetryAction.RECONNECT) for exc in BLEAK_RETRY_EXCEPTIONS),
+)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How failed commands are retried.
+
+    Attempts are spaced by an exponential backoff with jitter so that
+    devices failing together do not retry in lockstep. Errors are
+    classified by the first matching entry of error_actions, errors
+    matching no entry abort. No retry is started once deadline seconds
+    have passed since the first attempt.
+    """
+
+    base_delay: float = DEFAULT_RETRY_BASE_DELAY
+    max_delay: float = DEFAULT_RETRY_MAX_DELAY
+    multiplier: float = 2.0
+    # Fraction of the delay that is randomized
+    jitter: float = 0.5
+    deadline: float | None = None
+    error_actions: tuple[
+        tuple[type[BaseException], RetryAction], ...
+    ] = DEFAULT_ERROR_ACTIONS
+
+    def classify(self, exc: BaseException) -> RetryAction:
+        """Return what to do after an attempt failed with exc."""
+        for exc_type, action in self.error_actions:
+            if isinstance(exc, exc_type):
+                return action
+        return RetryAction.ABORT
+
+    def delay(self, attempt: int) -> float:
+        """Return the delay before the retry following attempt (0 based)."""
+        delay = min(self.max_delay, self.base_delay * self.multiplier**attempt)
+        return delay * (1 - self.jitter * random.random())
+
+
+class KeepAlivePolicy:
+    """Idle disconnect delay derived from the time between commands.
+
+    When commands usually follow each other within a short gap, the
+    connection is held a little longer than that gap so the next
+    command finds it open. When they are too far apart for that to
+    pay off within max_delay, the connection is dropped after
+    min_delay. Until enough gaps have been recorded default_delay is
+    used. The policy also counts connections and the commands that
+    reused an open connection.
+    """
+
+    def __init__(
+        self,
+        min_delay: float = DEFAULT_KEEP_ALIVE_MIN_DELAY,
+        max_delay: float = DEFAULT_KEEP_ALIVE_MAX_DELAY,
+        default_delay: float = DEFAULT_KEEP_ALIVE_DELAY,
+        margin: float = DEFAULT_KEEP_ALIVE_MARGIN,
+        percentile: float = DEFAULT_KEEP_ALIVE_PERCENTILE,
+        min_samples: int = DEFAULT_KEEP_ALIVE_MIN_SAMPLES,
+        window: int = DEFAULT_KEEP_ALIVE_WINDOW,
+    ) -> None:
+        """Keep alive policy constructor."""
+        if min_delay > max_delay:
+            raise ValueError("min_delay must not be greater than max_delay")
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay
+        self.margin = margin
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.connections = 0
+        self.reused = 0
+        self._gaps: deque[float] = deque(maxlen=window)
+        self._last_command: float | None = None
+        self._delay: float | None = None
+
+    def record_command(self) -> None:
+        """Record that a command is about to be sent."""
+        now = time.monotonic()
+        # Gaps shorter than min_delay are commands of the same operation,
+        # which the connection is always held for.
+        if (
+            self._last_command is not None
+            and (gap := now - self._last_command) >= self.min_delay
+        ):
+            self._gaps.append(gap)
+            self._delay = None
+        self._last_command = now
+
+    def record_connection(self, reused: bool) -> None:
+        """Record a new connection, or a command that found one open."""
+        if reused:
+            self.reused += 1
+        else:
+            self.connections += 1
+
+    @property
+    def delay(self) -> float:
+        """Return how long to hold an idle connection in seconds."""
+        if self._delay is None:
+            if len(self._gaps) < self.min_samples:
+                self._delay = self.default_delay
+            else:
+                delay = _percentile(self._gaps, self.percentile) * self.margin
+                if delay > self.max_delay:
+                    delay = self.min_delay
+                self._delay = max(self.min_delay, delay)
+        return self._delay
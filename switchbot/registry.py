@@ -0,0 +1,227 @@
+"""Registry of discovered Switchbot devices."""
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+from typing import cast
+
+from bleak.backends.device import BLEDevice
+
+from .const import SwitchbotModel
+from .models import SwitchBotAdvertisement
+
+# Seconds after which an adapter that stopped hearing a device is ignored
+ADAPTER_SIGHTING_MAX_AGE = 60.0
+
+
+@dataclass(slots=True)
+class AdapterSighting:
+    """Latest advertisement of a device heard by one adapter."""
+
+    adapter: str
+    rssi: int
+    device: BLEDevice
+    last_seen: float
+
+
+def get_ble_device_adapter(device: BLEDevice) -> str | None:
+    """Return the adapter that reported a BLEDevice, if the backend tells."""
+    details = device.details
+    if not isinstance(details, dict):
+        return None
+    if isinstance(source := details.get("source"), str):
+        return source
+    # BlueZ object paths look like /org/bluez/hci0/dev_AA_BB_CC_DD_EE_FF
+    if isinstance(path := details.get("path"), str):
+        parts = path.split("/")
+        if len(parts) > 3 and parts[3].startswith("hci"):
+            return parts[3]
+    return None
+
+
+class AdapterSightings:
+    """Latest sighting of one device by every adapter that hears it."""
+
+    __slots__ = ("max_age", "_sightings")
+
+    def __init__(self, max_age: float = ADAPTER_SIGHTING_MAX_AGE) -> None:
+        """Adapter sightings constructor."""
+        self.max_age = max_age
+        self._sightings: dict[str, AdapterSighting] = {}
+
+    def update(self, adapter: str, rssi: int, device: BLEDevice) -> None:
+        """Record that an adapter heard the device."""
+        now = time.monotonic()
+        if (sighting := self._sightings.get(adapter)) is None:
+            self._sightings[adapter] = AdapterSighting(adapter, rssi, device, now)
+        else:
+            sighting.rssi = rssi
+            sighting.device = device
+            sighting.last_seen = now
+
+    def best(self) -> AdapterSighting | None:
+        """Return the recent sighting with the best RSSI."""
+        now = time.monotonic()
+        return max(
+            (
+                sighting
+                for sighting in self._sightings.values()
+                if now - sighting.last_seen <= self.max_age
+            ),
+            key=lambda sighting: sighting.rssi,
+            default=None,
+        )
+
+    def ordered(self) -> list[AdapterSighting]:
+        """Return the recent sightings, best RSSI first."""
+        now = time.monotonic()
+        return sorted(
+            (
+                sighting
+                for sighting in self._sightings.values()
+                if now - sighting.last_seen <= self.max_age
+            ),
+            key=lambda sighting: sighting.rssi,
+            reverse=True,
+        )
+
+    def __len__(self) -> int:
+        return len(self._sightings)
+
+
+class SwitchbotDeviceRegistry:
+    """Latest advertisement of every device, indexed by address and model.
+
+    The indexes are updated as advertisements arrive, so lookups only
+    touch the devices they return. When devices are heard by several
+    adapters, the registry keeps the freshest payload with the RSSI and
+    BLEDevice of the adapter that hears the device best, and the latest
+    sighting of every adapter.
+    """
+
+    def __init__(self, sighting_max_age: float = ADAPTER_SIGHTING_MAX_AGE) -> None:
+        """Device registry constructor."""
+        self.sighting_max_age = sighting_max_age
+        self._sightings: dict[str, AdapterSightings] = {}
+        self._by_address: dict[str, SwitchBotAdvertisement] = {}
+        self._folded_addresses: dict[str, str] = {}
+        self._by_model: dict[str, dict[str, SwitchBotAdvertisement]] = {}
+        self._by_model_name: dict[
+            SwitchbotModel, dict[str, SwitchBotAdvertisement]
+        ] = {}
+
+    def update(
+        self, advertisement: SwitchBotAdvertisement, adapter: str | None = None
+    ) -> SwitchBotAdvertisement:
+        """Store the latest advertisement of a device heard by an adapter.
+
+        Returns the merged advertisement stored for the device.
+        """
+        address = advertisement.address
+        if adapter is not None:
+            advertisement = self._merge_sighting(advertisement, adapter)
+        data = advertisement.data
+        model = data.get("model")
+        model_name = data.get("modelName")
+        if (previous := self._by_address.get(address)) is not None:
+            if (previous_model := previous.data.get("model")) != model:
+                self._remove_from_index(self._by_model, previous_model, address)
+            if (previous_name := previous.data.get("modelName")) != model_name:
+                self._remove_from_index(self._by_model_name, previous_name, address)
+        else:
+            self._folded_addresses[address.upper()] = address
+        self._by_address[address] = advertisement
+        self._by_model.setdefault(model, {})[address] = advertisement
+        self._by_model_name.setdefault(model_name, {})[address] = advertisement
+        return advertisement
+
+    def _merge_sighting(
+        self, advertisement: SwitchBotAdvertisement, adapter: str
+    ) -> SwitchBotAdvertisement:
+        """Record the sighting and return the advertisement of the best adapter."""
+        if (sightings := self._sightings.get(advertisement.address)) is None:
+            sightings = self._sightings[advertisement.address] = AdapterSightings(
+                self.sighting_max_age
+            )
+        sightings.update(adapter, advertisement.rssi, advertisement.device)
+        if len(sightings) == 1:
+            return advertisement
+        best = cast(AdapterSighting, sightings.best())
+        if best.adapter == adapter or best.rssi <= advertisement.rssi:
+            return advertisement
+        return replace(advertisement, device=best.device, rssi=best.rssi)
+
+    @staticmethod
+    def _remove_from_index(index: dict, key: object, address: str) -> None:
+        """Remove an address from one entry of an index."""
+        if (entries := index.get(key)) is not None:
+            entries.pop(address, None)
+            if not entries:
+                del index[key]
+
+    def remove(self, address: str) -> None:
+        """Forget a device."""
+        address = self._folded_addresses.pop(address.upper(), address)
+        self._sightings.pop(address, None)
+        if (previous := self._by_address.pop(address, None)) is not None:
+            self._remove_from_index(
+                self._by_model, previous.data.get("model"), address
+            )
+            self._remove_from_index(
+                self._by_model_name, previous.data.get("modelName"), address
+            )
+
+    def clear(self) -> None:
+        """Forget all devices."""
+        self._by_address.clear()
+        self._folded_addresses.clear()
+        self._sightings.clear()
+        self._by_model.clear()
+        self._by_model_name.clear()
+
+    def get(self, address: str) -> SwitchBotAdvertisement | None:
+        """Return the latest advertisement of an address.
+
+        Addresses are matched case insensitively.
+        """
+        if (advertisement := self._by_address.get(address)) is not None:
+            return advertisement
+        if (folded := self._folded_addresses.get(address.upper())) is None:
+            return None
+        return self._by_address.get(folded)
+
+    def get_sightings(self, address: str) -> list[AdapterSighting]:
+        """Return the recent sightings of a device, best RSSI first."""
+        address = self._folded_addresses.get(address.upper(), address)
+        if (sightings := self._sightings.get(address)) is None:
+            return []
+        return sightings.ordered()
+
+    def get_adapters(self, address: str) -> list[str]:
+        """Return the adapters that recently heard a device, best RSSI first."""
+        return [sighting.adapter for sighting in self.get_sightings(address)]
+
+    def get_by_models(self, models: Iterable[str]) -> dict[str, SwitchBotAdvertisement]:
+        """Return the devices of any of the given model chars."""
+        result: dict[str, SwitchBotAdvertisement] = {}
+        for model in models:
+            if (entries := self._by_model.get(model)) is not None:
+                result.update(entries)
+        return result
+
+    def get_by_model_name(
+        self, model_name: SwitchbotModel
+    ) -> dict[str, SwitchBotAdvertisement]:
+        """Return the devices of a model."""
+        return dict(self._by_model_name.get(model_name, {}))
+
+    def as_dict(self) -> dict[str, SwitchBotAdvertisement]:
+        """Return the latest advertisement of every device by address."""
+        return dict(self._by_address)
+
+    def __contains__(self, address: object) -> bool:
+        return isinstance(address, str) and self.get(address) is not None
+
+    def __len__(self) -> int:
+        return len(self._by_address)
@@ -0,0 +1,239 @@
+"""Process wide scheduling of BLE connections."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+# BlueZ adapters become unreliable past a handful of connections
+DEFAULT_SLOTS_PER_ADAPTER = 3
+
+
+class ConnectionPriority(IntEnum):
+    """Priority of a connection request, lower is served first."""
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+@dataclass
+class ConnectionSchedulerStats:
+    """Connection scheduler statistics of one adapter."""
+
+    slots: int
+    active: int = 0
+    queued: int = 0
+    granted: int = 0
+    waited: int = 0
+    reclaimed: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        """Return the mean time a granted request waited in the queue."""
+        return self.total_wait / self.granted if self.granted else 0.0
+
+
+@dataclass
+class _AdapterQueue:
+    """Slots and waiting requests of one adapter."""
+
+    stats: ConnectionSchedulerStats
+    waiters: list[tuple[int, int, asyncio.Future[None]]] = field(default_factory=list)
+    # Granted slots in the order they were granted, oldest first
+    held: dict[ConnectionSlot, None] = field(default_factory=dict)
+
+
+class ConnectionSlot:
+    """A connection slot on an adapter, held until released.
+
+    The holder can set a reclaim callback for when its connection is
+    idle. While requests are waiting for the adapter, the scheduler calls
+    it to ask the holder to disconnect, the callback returns False when
+    the connection is busy after all.
+    """
+
+    __slots__ = ("adapter", "reclaim", "_scheduler", "_released", "_reclaiming")
+
+    def __init__(self, scheduler: ConnectionScheduler, adapter: str) -> None:
+        """Connection slot constructor."""
+        self.adapter = adapter
+        self.reclaim: Callable[[], bool] | None = None
+        self._scheduler = scheduler
+        self._released = False
+        self._reclaiming = False
+
+    def idle(self) -> None:
+        """Tell the scheduler the connection is idle and can be reclaimed."""
+        if self._released:
+            return
+        self._reclaiming = False
+        self._scheduler._reclaim(self.adapter)
+
+    def release(self) -> None:
+        """Release the slot, does nothing when already released."""
+        if self._released:
+            return
+        self._released = True
+        self._scheduler._release(self)
+
+    async def __aenter__(self) -> ConnectionSlot:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.release()
+
+
+class ConnectionScheduler:
+    """Limit the number of concurrent connections of every adapter.
+
+    Requests beyond the slots of an adapter wait in a queue served by
+    priority, and in arrival order within a priority. Idle connections
+    are reclaimed for waiting requests, so connections only kept open
+    for reuse do not hold up other devices.
+    """
+
+    def __init__(self, slots_per_adapter: int = DEFAULT_SLOTS_PER_ADAPTER) -> None:
+        """Connection scheduler constructor."""
+        self.slots_per_adapter = slots_per_adapter
+        self._adapters: dict[str, _AdapterQueue] = {}
+        self._sequence = itertools.count()
+
+    def _get_queue(self, adapter: str) -> _AdapterQueue:
+        """Return the queue of an adapter."""
+        if (queue := self._adapters.get(adapter)) is None:
+            queue = self._adapters[adapter] = _AdapterQueue(
+                ConnectionSchedulerStats(self.slots_per_adapter)
+            )
+        return queue
+
+    def set_slots(self, adapter: str, slots: int) -> None:
+        """Set the number of concurrent connections of an adapter."""
+        queue = self._get_queue(adapter)
+        queue.stats.slots = slots
+        self._wake(queue)
+
+    def get_stats(self, adapter: str) -> ConnectionSchedulerStats:
+        """Return a snapshot of the statistics of an adapter."""
+        stats = self._get_queue(adapter).stats
+        return ConnectionSchedulerStats(
+            stats.slots,
+            stats.active,
+            stats.queued,
+            stats.granted,
+            stats.waited,
+            stats.reclaimed,
+            stats.total_wait,
+            stats.max_wait,
+        )
+
+    async def acquire(
+        self, adapter: str, priority: int = ConnectionPriority.NORMAL
+    ) -> ConnectionSlot:
+        """Wait for a connection slot on an adapter."""
+        queue = self._get_queue(adapter)
+        stats = queue.stats
+        if stats.active < stats.slots and not stats.queued:
+            stats.active += 1
+            stats.granted += 1
+            return self._grant(queue, adapter)
+
+        start = time.monotonic()
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(queue.waiters, (priority, next(self._sequence), waiter))
+        stats.queued += 1
+        _LOGGER.debug(
+            "%s: Waiting for a connection slot (%s active, %s queued)",
+            adapter,
+            stats.active,
+            stats.queued,
+        )
+        self._reclaim(adapter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted while we were being cancelled
+                stats.active -= 1
+                self._wake(queue)
+            else:
+                stats.queued -= 1
+            raise
+
+        wait = time.monotonic() - start
+        stats.waited += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        return self._grant(queue, adapter)
+
+    def _grant(self, queue: _AdapterQueue, adapter: str) -> ConnectionSlot:
+        """Return a new slot that counts as held."""
+        slot = ConnectionSlot(self, adapter)
+        queue.held[slot] = None
+        return slot
+
+    def _release(self, slot: ConnectionSlot) -> None:
+        """Return a slot and hand it to the next waiting request."""
+        queue = self._adapters[slot.adapter]
+        del queue.held[slot]
+        queue.stats.active -= 1
+        if slot._reclaiming:
+            queue.stats.reclaimed += 1
+        self._wake(queue)
+
+    def _reclaim(self, adapter: str) -> None:
+        """Ask idle holders to disconnect for the waiting requests."""
+        queue = self._adapters[adapter]
+        stats = queue.stats
+        reclaiming = sum(slot._reclaiming for slot in queue.held)
+        for slot in list(queue.held):
+            if reclaiming >= stats.queued:
+                return
+            if slot._reclaiming or slot.reclaim is None:
+                continue
+            slot._reclaiming = True
+            try:
+                reclaimed = slot.reclaim()
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("%s: Error reclaiming a connection slot", adapter)
+                reclaimed = False
+            if not reclaimed:
+                slot._reclaiming = False
+            elif not slot._released:
+                reclaiming += 1
+
+    def _wake(self, queue: _AdapterQueue) -> None:
+        """Grant free slots to waiting requests."""
+        stats = queue.stats
+        waiters = queue.waiters
+        while waiters and stats.active < stats.slots:
+            _, _, waiter = heapq.heappop(waiters)
+            if waiter.done():
+                continue
+            stats.queued -= 1
+            stats.active += 1
+            stats.granted += 1
+            waiter.set_result(None)
+
+
+_CONNECTION_SCHEDULER = ConnectionScheduler()
+
+
+def get_connection_scheduler() -> ConnectionScheduler:
+    """Return the connection scheduler shared by all devices."""
+    return _CONNECTION_SCHEDULER
+
+
+def set_connection_scheduler(scheduler: ConnectionScheduler) -> None:
+    """Replace the connection scheduler shared by all devices."""
+    global _CONNECTION_SCHEDULER
+    _CONNECTION_SCHEDULER = scheduler
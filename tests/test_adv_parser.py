@@ -1,12 +1,29 @@
 from __future__ import annotations
 
+import dataclasses
+import random
+import warnings
 from typing import Any
 
+import pytest
 from bleak.backends.device import BLEDevice
 from bleak.backends.scanner import AdvertisementData
 
 from switchbot import LockStatus, SwitchbotModel
-from switchbot.adv_parser import parse_advertisement_data
+from switchbot.adv_parser import (
+    _MODEL_BY_MANUFACTURER_DATA_LENGTH,
+    _MODEL_BYTE_TABLE,
+    RECORDS_BY_PARSER,
+    SUPPORTED_TYPES,
+    UNCHANGED,
+    AdvertisementDeduplicator,
+    _parse_data,
+    parse_advertisement_data,
+    parse_advertisements_bulk,
+    set_parsed_records,
+)
+from switchbot.devices.curtain import SwitchbotCurtain
+from switchbot.models import ParsedRecord
 from switchbot.models import SwitchBotAdvertisement
 
 ADVERTISEMENT_DATA_DEFAULTS = {
@@ -1461,3 +1478,276 @@ def test_parsing_lock_passive_old_firmware():
         rssi=-67,
         active=False,
     )
+
+
+def test_model_byte_table_known_bytes():
+    """Test the precompiled model byte table for known model bytes."""
+    assert len(_MODEL_BYTE_TABLE) == 256
+    assert _MODEL_BYTE_TABLE[0x63] == ("c", False)
+    assert _MODEL_BYTE_TABLE[0xE3] == ("c", True)
+    assert _MODEL_BYTE_TABLE[0x48] == ("H", False)
+    assert _MODEL_BYTE_TABLE[0xEF] == ("o", True)
+    assert _MODEL_BYTE_TABLE[0x77] == ("w", False)
+    assert _MODEL_BYTE_TABLE[0x80] == ("\x00", True)
+
+
+@pytest.mark.parametrize(
+    ("mfr_id", "mfr_data", "expected"),
+    [
+        (
+            741,
+            b"\xac\xa2\x1a\x8a\xec\xd0",
+            {
+                "rawAdvData": None,
+                "data": {"isOn": None, "level": None, "switchMode": True},
+                "model": "e",
+                "isEncrypted": False,
+                "modelFriendlyName": "Humidifier",
+                "modelName": SwitchbotModel.HUMIDIFIER,
+            },
+        ),
+        (
+            2409,
+            b"\xc0!\x9a\xe8\xbcIj\x1c\x00f\x01\x02\x03\x04\x05\x06",
+            {
+                "rawAdvData": None,
+                "data": {
+                    "sequence_number": 106,
+                    "isOn": False,
+                    "brightness": 28,
+                    "delay": False,
+                    "preset": False,
+                    "color_mode": 0,
+                    "speed": 102,
+                    "loop_index": 0,
+                },
+                "model": "r",
+                "isEncrypted": False,
+                "modelFriendlyName": "Light Strip",
+                "modelName": SwitchbotModel.LIGHT_STRIP,
+            },
+        ),
+        (2409, b"\xc0!\x9a\xe8\xbcIj\x1c\x00f\x01", None),
+    ],
+)
+def test_parse_manufacturer_data_only(mfr_id, mfr_data, expected):
+    """Test models found by manufacturer data length parse as before the index."""
+    assert _parse_data(None, mfr_data, mfr_id) == expected
+
+
+def test_manufacturer_data_length_index():
+    """Test the (manufacturer id, length) index only has models with a length."""
+    assert _MODEL_BY_MANUFACTURER_DATA_LENGTH == {(2409, 16): "r", (741, 6): "e"}
+
+
+def test_deduplicator_skips_unchanged_advertisements():
+    """Test repeated advertisements from an address are not parsed again."""
+    ble_device = generate_ble_device("aa:bb:cc:dd:ee:ff", "any")
+    adv_data = generate_advertisement_data(
+        manufacturer_data={2409: b"\xe7\xabF\xac\x8f\x92|\x0f\x00\x11\x04"},
+        service_data={"0000fd3d-0000-1000-8000-00805f9b34fb": b"c\xc0X\x00\x11\x04"},
+        rssi=-80,
+    )
+    deduplicator = AdvertisementDeduplicator()
+    first = deduplicator.parse(ble_device, adv_data)
+    assert first == parse_advertisement_data(ble_device, adv_data)
+    assert deduplicator.parse(ble_device, adv_data) is UNCHANGED
+
+    changed_adv_data = generate_advertisement_data(
+        manufacturer_data={2409: b"\xe7\xabF\xac\x8f\x92|\x0f\x00\x11\x04"},
+        service_data={"0000fd3d-0000-1000-8000-00805f9b34fb": b"c\xc0W\x00\x11\x04"},
+        rssi=-80,
+    )
+    changed = deduplicator.parse(ble_device, changed_adv_data)
+    assert changed.data["data"]["battery"] == 87
+
+    deduplicator.forget("aa:bb:cc:dd:ee:ff")
+    assert deduplicator.parse(ble_device, changed_adv_data) == changed
+
+
+def test_deduplicator_return_previous():
+    """Test the previous result object is returned for repeated advertisements."""
+    ble_device = generate_ble_device("aa:bb:cc:dd:ee:ff", "any")
+    adv_data = generate_advertisement_data(
+        service_data={"0000fd3d-0000-1000-8000-00805f9b34fb": b"T\x00\xe4\x06\x985"},
+    )
+    deduplicator = AdvertisementDeduplicator(return_previous=True)
+    first = deduplicator.parse(ble_device, adv_data)
+    assert first is not None
+    assert deduplicator.parse(ble_device, adv_data) is first
+
+
+def test_deduplicator_forgets_least_recently_seen_addresses():
+    """Test the deduplicator only remembers maxsize addresses."""
+    adv_data = generate_advertisement_data(
+        service_data={"0000fd3d-0000-1000-8000-00805f9b34fb": b"T\x00\xe4\x06\x985"},
+    )
+    devices = [
+        generate_ble_device(f"aa:bb:cc:dd:ee:0{idx}", "any") for idx in range(3)
+    ]
+    deduplicator = AdvertisementDeduplicator(maxsize=2)
+    deduplicator.parse(devices[0], adv_data)
+    deduplicator.parse(devices[1], adv_data)
+    assert deduplicator.parse(devices[0], adv_data) is UNCHANGED
+    deduplicator.parse(devices[2], adv_data)
+    assert len(deduplicator) == 2
+    assert deduplicator.parse(devices[0], adv_data) is UNCHANGED
+    assert deduplicator.parse(devices[1], adv_data) is not UNCHANGED
+
+
+def test_parse_advertisements_bulk_does_not_warn():
+    """Test bulk parsing builds BLEDevices without deprecated arguments."""
+    records = [("aa:bb:cc:dd:ee:09", b"T\x00\xe4\x06\x985", None, -70)]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        results = list(parse_advertisements_bulk(records))
+    assert results[0].rssi == -70
+
+
+def test_parse_advertisements_bulk_matches_single_parser():
+    """Test bulk parsing gives the same results in input order."""
+    records = [
+        (
+            "aa:bb:cc:dd:ee:01",
+            {"0000fd3d-0000-1000-8000-00805f9b34fb": b"c\xc0X\x00\x11\x04"},
+            {2409: b"\xe7\xabF\xac\x8f\x92|\x0f\x00\x11\x04"},
+            -80,
+        ),
+        ("aa:bb:cc:dd:ee:02", b"T\x00\xe4\x06\x985", None, -70),
+        ("aa:bb:cc:dd:ee:03", None, {2403: b"\x00\x01"}, -60),
+        (
+            "aa:bb:cc:dd:ee:04",
+            b"c\xc0S\x00\x11\x04",
+            (2409, b"\xc1\xc7'}U\xab%\x0f\x00\x11\x04"),
+            -50,
+        ),
+        (
+            "aa:bb:cc:dd:ee:05",
+            None,
+            b"\xe5\x02\xac\xa2\x1a\x8a\xec\xd0",
+            -40,
+        ),
+        ("aa:bb:cc:dd:ee:06", b"w\x00\xe4", None, -30),
+    ]
+    expected = [
+        parse_advertisement_data(
+            generate_ble_device(address, None, rssi=rssi),
+            generate_advertisement_data(
+                service_data={"0000fd3d-0000-1000-8000-00805f9b34fb": service_data}
+                if isinstance(service_data, bytes)
+                else service_data or {},
+                manufacturer_data={741: manufacturer_data[2:]}
+                if isinstance(manufacturer_data, bytes)
+                else dict([manufacturer_data])
+                if isinstance(manufacturer_data, tuple)
+                else manufacturer_data or {},
+                rssi=rssi,
+            ),
+        )
+        for address, service_data, manufacturer_data, rssi in records
+    ]
+    results = list(parse_advertisements_bulk(records, chunk_size=4))
+    assert len(results) == 5
+    assert [result.address for result in results] == [
+        "aa:bb:cc:dd:ee:01",
+        "aa:bb:cc:dd:ee:02",
+        "aa:bb:cc:dd:ee:04",
+        "aa:bb:cc:dd:ee:05",
+        "aa:bb:cc:dd:ee:06",
+    ]
+    for result, single in zip(results, [adv for adv in expected if adv]):
+        assert result.data == single.data
+        assert result.rssi == single.rssi
+        assert result.active == single.active
+
+
+@pytest.fixture
+def parsed_records():
+    """Enable parsed records for the test."""
+    set_parsed_records(True)
+    yield
+    set_parsed_records(False)
+
+
+@pytest.mark.parametrize("model_chr", sorted(SUPPORTED_TYPES))
+def test_parsed_records_match_parser_dicts(model_chr):
+    """Test every record has the same keys and values as its parser dict."""
+    type_data = SUPPORTED_TYPES[model_chr]
+    record_cls = RECORDS_BY_PARSER[type_data["func"]]
+    rng = random.Random(model_chr)
+    for _ in range(50):
+        service_data = bytes([ord(model_chr)]) + rng.randbytes(7)
+        mfr_data = rng.randbytes(16)
+        try:
+            parsed = type_data["func"](service_data, mfr_data)
+        except ValueError:  # Random lock status out of range
+            continue
+        record = record_cls.from_dict(parsed)
+        assert sorted(record) == sorted(parsed)
+        assert record == parsed
+        assert parsed == record
+        assert dict(record) == parsed
+
+
+def test_parse_advertisement_data_with_parsed_records(parsed_records):
+    """Test parsed records are used as the data of advertisements."""
+    ble_device = generate_ble_device("aa:bb:cc:dd:ee:ff", "any")
+    adv_data = generate_advertisement_data(
+        manufacturer_data={2409: b"\xe7\xabF\xac\x8f\x92|\x0f\x00\x11\x04"},
+        service_data={"0000fd3d-0000-1000-8000-00805f9b34fb": b"c\xc0X\x00\x11\x04"},
+        rssi=-80,
+    )
+    result = parse_advertisement_data(ble_device, adv_data)
+    assert isinstance(result.data["data"], ParsedRecord)
+    assert result.data["data"] == {
+        "calibration": True,
+        "battery": 88,
+        "inMotion": False,
+        "position": 100,
+        "lightLevel": 1,
+        "deviceChain": 1,
+    }
+    with pytest.raises((AttributeError, TypeError)):
+        result.data["data"].battery = 50
+
+    curtain_device = SwitchbotCurtain(ble_device)
+    curtain_device.update_from_advertisement(result)
+    assert curtain_device.get_position() == 100
+    curtain_device._update_parsed_data({"position": 50})
+    assert curtain_device.get_position() == 50
+    assert curtain_device.get_battery_percent() == 88
+
+
+def test_advertisement_is_frozen_and_compares_by_payload():
+    """Test advertisements parsed from the same payload compare by hash."""
+    ble_device = generate_ble_device("aa:bb:cc:dd:ee:ff", "any")
+    adv_data = generate_advertisement_data(
+        service_data={"0000fd3d-0000-1000-8000-00805f9b34fb": b"T\x00\xe4\x06\x985"},
+        rssi=-60,
+    )
+    first = parse_advertisement_data(ble_device, adv_data)
+    second = parse_advertisement_data(ble_device, adv_data)
+    assert first.payload_hash is not None
+    assert first.payload_hash == second.payload_hash
+    assert not hasattr(first, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.rssi = -50
+
+    # Same payload, different but equal data objects
+    copied = dataclasses.replace(second, data=dict(second.data))
+    assert copied.same_data(first)
+    assert copied == first
+
+    # Manually built advertisements have no payload and compare by data
+    manual = SwitchBotAdvertisement(
+        first.address, dict(first.data), ble_device, first.rssi, first.active
+    )
+    assert manual.payload_hash is None
+    assert manual == first
+    assert not manual.same_payload(first)
+    assert copied.same_payload(first)
+
+    changed = first.with_data(first.data | {"data": {"battery": 1}})
+    assert changed.raw_payload is None
+    assert not changed.same_data(first)
+    assert changed != first
@@ -61,6 +61,19 @@ async def test_send_multiple_commands():
     assert base_cover_device._send_command.await_count == 2
 
 
+@pytest.mark.asyncio
+async def test_send_multiple_commands_pipelined():
+    ble_device = generate_ble_device("aa:bb:cc:dd:ee:ff", "any")
+    base_cover_device = base_cover.SwitchbotBaseCover(
+        False, ble_device, pipeline_commands=True
+    )
+    base_cover_device._send_command = AsyncMock()
+    base_cover_device._send_commands = AsyncMock(return_value=[b"\x00", b"\x01"])
+    assert await base_cover_device._send_multiple_commands(blind_tilt.OPEN_KEYS)
+    base_cover_device._send_commands.assert_awaited_once_with(blind_tilt.OPEN_KEYS)
+    base_cover_device._send_command.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_stop():
     base_cover_device = create_device_for_command_testing()
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from switchbot import BatchedCallback, FieldChange, SwitchBotAdvertisement
+from switchbot.devices.device import SwitchbotDevice
+
+from .test_adv_parser import generate_ble_device
+
+ADDRESS = "AA:BB:CC:DD:EE:FF"
+
+
+def make_device() -> SwitchbotDevice:
+    ble_device = generate_ble_device(ADDRESS, "any")
+    device = SwitchbotDevice(ble_device)
+    device.update_from_advertisement(
+        SwitchBotAdvertisement(
+            ADDRESS, {"data": {"isOn": False, "battery": 90}}, ble_device, -70
+        )
+    )
+    return device
+
+
+@pytest.mark.asyncio
+async def test_batched_subscriber_gets_changed_keys_once_per_window():
+    device = make_device()
+    batches = []
+    unsub = device.subscribe_batched(batches.append, window=0.01)
+
+    device._update_parsed_data({"isOn": True})
+    device._update_parsed_data({"isOn": False, "battery": 90})
+    device._update_parsed_data({"battery": 80})
+    # Nothing changed
+    device._update_parsed_data({"battery": 80})
+    await asyncio.sleep(0.05)
+    assert batches == [frozenset({"isOn", "battery"})]
+
+    # Changes without keys are delivered too
+    device._fire_callbacks()
+    await asyncio.sleep(0.05)
+    assert batches[1] == frozenset()
+
+    unsub()
+    device._update_parsed_data({"battery": 70})
+    await asyncio.sleep(0.05)
+    assert len(batches) == 2
+
+
+@pytest.mark.asyncio
+async def test_batched_callback_waits_for_slow_subscriber():
+    batches = []
+    release = asyncio.Event()
+
+    async def _slow(keys):
+        batches.append(keys)
+        await release.wait()
+
+    batched = BatchedCallback(_slow, window=0.001)
+    batched.add(["a"])
+    await asyncio.sleep(0.01)
+    for key in "bcd":
+        batched.add([key])
+        await asyncio.sleep(0.01)
+    # The subscriber is busy, the changes are held back and coalesced
+    assert batches == [frozenset("a")]
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert batches == [frozenset("a"), frozenset("bcd")]
+    batched.cancel()
+
+
+@pytest.mark.asyncio
+async def test_batched_callback_survives_subscriber_errors():
+    calls = []
+
+    def _failing(keys):
+        calls.append(keys)
+        raise ValueError("bad subscriber")
+
+    batched = BatchedCallback(_failing, window=0.001)
+    batched.add(["a"])
+    await asyncio.sleep(0.01)
+    batched.add(["b"])
+    await asyncio.sleep(0.01)
+    assert calls == [frozenset("a"), frozenset("b")]
+
+
+def test_change_subscriber_gets_old_and_new_values():
+    device = make_device()
+    events = []
+    unsub = device.subscribe_changes(events.append)
+
+    assert device._update_parsed_data({"isOn": True, "battery": 90, "firmware": 1.5})
+    assert len(events) == 1
+    event = events[0]
+    assert event.address == ADDRESS
+    assert event.keys == {"isOn", "firmware"}
+    assert event.get("isOn") == FieldChange("isOn", False, True)
+    assert event.get("firmware") == FieldChange("firmware", None, 1.5)
+    assert event.get("battery") is None
+    # Subscribers see the new data
+    assert device.parsed_data["isOn"] is True
+
+    assert not device._update_parsed_data({"isOn": True})
+    assert len(events) == 1
+
+    unsub()
+    device._update_parsed_data({"isOn": False})
+    assert len(events) == 1
+
+
+def test_change_subscriber_errors_do_not_stop_updates():
+    device = make_device()
+    events = []
+
+    def _failing(event):
+        raise ValueError("bad subscriber")
+
+    device.subscribe_changes(_failing)
+    device.subscribe_changes(events.append)
+    assert device._update_parsed_data({"isOn": True})
+    assert device.parsed_data["isOn"] is True
+    assert [event.keys for event in events] == [{"isOn"}]
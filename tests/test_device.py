@@ -0,0 +1,495 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bleak.exc import BleakError
+
+from switchbot import (
+    AdaptiveTimeout,
+    ConnectionScheduler,
+    KeepAlivePolicy,
+    RetryAction,
+    RetryPolicy,
+    SwitchBotAdvertisement,
+    get_connection_scheduler,
+    set_connection_scheduler,
+)
+from switchbot.adv_parsers.meter import WoSensorTHRecord
+from switchbot.devices.bot import Switchbot
+from switchbot.devices.curtain import SwitchbotCurtain
+from switchbot.devices.device import (
+    SwitchbotDevice,
+    SwitchbotOperationError,
+    update_after_operation,
+)
+from switchbot.devices.lock import SwitchbotLock
+from switchbot.registry import get_ble_device_adapter
+
+from .test_adv_parser import generate_ble_device
+
+ADDRESS = "AA:BB:CC:DD:EE:FF"
+
+
+def make_adapter_advertisement(adapter: str, rssi: int) -> SwitchBotAdvertisement:
+    """Return an advertisement heard through an adapter."""
+    ble_device = generate_ble_device(
+        ADDRESS,
+        "any",
+        {"path": f"/org/bluez/{adapter}/dev_AA_BB_CC_DD_EE_FF"},
+    )
+    return SwitchBotAdvertisement(
+        address=ADDRESS,
+        data={"data": {"position": 50}, "model": "c"},
+        device=ble_device,
+        rssi=rssi,
+    )
+
+
+@pytest.fixture(autouse=True)
+def connection_scheduler():
+    """Give every test its own connection scheduler."""
+    original = get_connection_scheduler()
+    set_connection_scheduler(ConnectionScheduler())
+    yield
+    set_connection_scheduler(original)
+
+
+def make_curtain(**kwargs) -> SwitchbotCurtain:
+    """Return a curtain that has received an advertisement."""
+    ble_device = generate_ble_device(ADDRESS, "any")
+    curtain = SwitchbotCurtain(ble_device, **kwargs)
+    curtain.update_from_advertisement(
+        SwitchBotAdvertisement(ADDRESS, {"data": {}, "model": "c"}, ble_device, -70)
+    )
+    return curtain
+
+
+def test_get_ble_device_adapter():
+    assert get_ble_device_adapter(make_adapter_advertisement("hci2", -70).device) == (
+        "hci2"
+    )
+    assert get_ble_device_adapter(generate_ble_device(ADDRESS, "any", {})) is None
+    assert (
+        get_ble_device_adapter(generate_ble_device(ADDRESS, "any", {"source": "hci1"}))
+        == "hci1"
+    )
+
+
+@pytest.mark.asyncio
+async def test_connect_falls_back_to_next_best_adapter():
+    far = make_adapter_advertisement("hci0", -90)
+    near = make_adapter_advertisement("hci1", -60)
+    curtain = SwitchbotCurtain(far.device)
+    curtain.update_from_advertisement(far)
+    curtain.update_from_advertisement(near)
+
+    client = MagicMock()
+    client.start_notify = AsyncMock()
+    with patch(
+        "switchbot.devices.device.establish_connection",
+        side_effect=[BleakError("no slot"), client],
+    ) as establish:
+        await curtain._ensure_connected()
+
+    devices = [call.args[1] for call in establish.call_args_list]
+    assert devices == [near.device, far.device]
+    assert establish.call_args_list[0].kwargs["max_attempts"] == 2
+    assert "max_attempts" not in establish.call_args_list[1].kwargs
+    assert curtain._client is client
+    # The slot is held on the adapter that connected
+    scheduler = get_connection_scheduler()
+    assert curtain._connection_slot.adapter == "hci0"
+    assert scheduler.get_stats("hci0").active == 1
+    assert scheduler.get_stats("hci1").active == 0
+    assert scheduler.get_stats("hci1").granted == 1
+    curtain._cancel_disconnect_timer()
+
+
+@pytest.mark.asyncio
+async def test_connect_without_adapter_sightings():
+    ble_device = generate_ble_device(ADDRESS, "any")
+    curtain = SwitchbotCurtain(ble_device)
+    curtain.update_from_advertisement(
+        SwitchBotAdvertisement(ADDRESS, {"data": {}, "model": "c"}, ble_device, -70)
+    )
+    client = MagicMock()
+    client.start_notify = AsyncMock()
+    with patch(
+        "switchbot.devices.device.establish_connection", return_value=client
+    ) as establish:
+        await curtain._ensure_connected()
+    assert establish.call_args.args[1] is ble_device
+    curtain._cancel_disconnect_timer()
+
+
+@pytest.mark.asyncio
+async def test_pipelined_commands_match_responses_in_order():
+    curtain = make_curtain()
+    events = []
+
+    async def _write_gatt_char(char, command, response):
+        events.append(f"write {command.hex()}")
+        loop = asyncio.get_running_loop()
+        loop.call_soon(curtain._notification_handler, 0, bytearray(command[-1:]))
+
+    client = MagicMock()
+    client.start_notify = AsyncMock()
+    client.write_gatt_char = AsyncMock(side_effect=_write_gatt_char)
+    with patch("switchbot.devices.device.establish_connection", return_value=client):
+        results = await curtain._send_commands(["570f01", "570f02", "570f03"])
+
+    assert results == [b"\x01", b"\x02", b"\x03"]
+    assert events == ["write 570f01", "write 570f02", "write 570f03"]
+    assert not curtain._notify_futures
+    curtain._cancel_disconnect_timer()
+
+
+@pytest.mark.asyncio
+async def test_response_timeout_adapts_to_latency():
+    curtain = make_curtain(
+        response_timeout=AdaptiveTimeout(
+            floor=0.01, ceiling=0.05, margin=0.0, min_samples=1
+        )
+    )
+    assert curtain.response_timeout == 0.05
+
+    client = MagicMock()
+    client.start_notify = AsyncMock()
+    client.disconnect = AsyncMock()
+    client.write_gatt_char = AsyncMock()
+    with patch(
+        "switchbot.devices.device.establish_connection", return_value=client
+    ), pytest.raises(asyncio.TimeoutError):
+        await curtain._send_commands(["570f01"], retry=0)
+    assert curtain._response_timeout.samples == 1
+    assert curtain.response_timeout == 0.05
+    assert not curtain._notify_futures
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_reconnects_or_resends():
+    curtain = make_curtain(retry_policy=RetryPolicy(base_delay=0.0, jitter=0.0))
+    curtain._ensure_connected = AsyncMock()
+    curtain._execute_forced_disconnect = AsyncMock()
+    curtain._execute_commands_locked = AsyncMock(
+        side_effect=[asyncio.TimeoutError, BleakError("dbus"), [b"\x01"]]
+    )
+    assert await curtain._send_command("570f01", retry=2) == b"\x01"
+    assert curtain._execute_commands_locked.await_count == 3
+    assert curtain._execute_forced_disconnect.await_count == 2
+
+    curtain._retry_policy = RetryPolicy(
+        base_delay=0.0,
+        jitter=0.0,
+        error_actions=((asyncio.TimeoutError, RetryAction.RESEND),),
+    )
+    curtain._execute_forced_disconnect.reset_mock()
+    curtain._execute_commands_locked = AsyncMock(
+        side_effect=[asyncio.TimeoutError, [b"\x01"]]
+    )
+    assert await curtain._send_command("570f01", retry=2) == b"\x01"
+    curtain._execute_forced_disconnect.assert_not_awaited()
+
+    curtain._execute_commands_locked = AsyncMock(side_effect=ValueError)
+    with pytest.raises(ValueError):
+        await curtain._send_command("570f01", retry=2)
+    curtain._execute_commands_locked.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_late_response_after_timeout_is_not_taken_for_retry():
+    curtain = make_curtain(
+        response_timeout=AdaptiveTimeout(floor=0.01, ceiling=0.01),
+        retry_policy=RetryPolicy(base_delay=0.0, jitter=0.0),
+    )
+    clients = []
+
+    def _make_client(*args, **kwargs):
+        client = MagicMock()
+        client.start_notify = AsyncMock()
+        client.disconnect = AsyncMock()
+        client.write_gatt_char = AsyncMock(side_effect=_write_gatt_char)
+        clients.append(client)
+        return client
+
+    async def _write_gatt_char(char, command, response):
+        if len(clients) == 1:
+            # The device is too slow to answer the first attempt
+            return
+        loop = asyncio.get_running_loop()
+        late_handler = clients[0].start_notify.call_args.args[1]
+        handler = clients[1].start_notify.call_args.args[1]
+        loop.call_soon(late_handler, 0, bytearray(b"\x05late"))
+        loop.call_later(0.001, handler, 0, bytearray(b"\x01"))
+
+    with patch(
+        "switchbot.devices.device.establish_connection", side_effect=_make_client
+    ):
+        assert await curtain._send_command("570f01", retry=1) == b"\x01"
+    assert len(clients) == 2
+    clients[0].disconnect.assert_awaited_once()
+    curtain._cancel_disconnect_timer()
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_deadline_stops_retrying():
+    curtain = make_curtain(
+        retry_policy=RetryPolicy(base_delay=10.0, jitter=0.0, deadline=1.0)
+    )
+    curtain._ensure_connected = AsyncMock()
+    curtain._execute_commands_locked = AsyncMock(side_effect=asyncio.TimeoutError)
+    with pytest.raises(asyncio.TimeoutError):
+        await curtain._send_command("570f01", retry=5)
+    curtain._execute_commands_locked.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_keep_alive_counts_connections_and_sets_timer():
+    curtain = make_curtain(keep_alive=KeepAlivePolicy(default_delay=3.0))
+    client = MagicMock()
+    client.start_notify = AsyncMock()
+    client.is_connected = True
+    with patch("switchbot.devices.device.establish_connection", return_value=client):
+        await curtain._ensure_connected()
+        await curtain._ensure_connected()
+    assert (curtain.keep_alive.connections, curtain.keep_alive.reused) == (1, 1)
+    assert curtain.disconnect_delay == 3.0
+    assert curtain._disconnect_timer.when() - curtain.loop.time() <= 3.0
+    curtain._cancel_disconnect_timer()
+
+
+def test_parsed_records_are_kept_through_merges():
+    ble_device = generate_ble_device(ADDRESS, "any")
+    device = SwitchbotDevice(ble_device)
+
+    def _advertisement(temperature: float, battery: int | None):
+        record = WoSensorTHRecord(temperature, False, 50, battery)
+        return SwitchBotAdvertisement(
+            ADDRESS, {"data": record, "model": "T"}, ble_device, -70
+        )
+
+    device.update_from_advertisement(_advertisement(21.5, 80))
+    first = device.parsed_data
+    device.update_from_advertisement(_advertisement(21.5, None))
+    assert device.parsed_data is first
+
+    device.update_from_advertisement(_advertisement(22.0, None))
+    assert isinstance(device.parsed_data, WoSensorTHRecord)
+    assert device.parsed_data.temperature == 22.0
+    assert device.parsed_data.battery == 80
+    assert device.parsed_data["temp"]["c"] == 22.0
+
+    # Keys the record does not have fall back to a dict
+    device._update_parsed_data({"firmware": 1.5})
+    assert device.parsed_data == {
+        "temperature": 22.0,
+        "fahrenheit": False,
+        "humidity": 50,
+        "battery": 80,
+        "temp": {"c": 22.0, "f": 71.6},
+        "firmware": 1.5,
+    }
+
+
+def test_merge_copies_device_data_only_on_change():
+    ble_device = generate_ble_device(ADDRESS, "any")
+    device = SwitchbotDevice(ble_device)
+    parsed = SwitchBotAdvertisement(
+        ADDRESS, {"data": {"temp": 21, "battery": 80}, "model": "T"}, ble_device, -70
+    )
+    device.update_from_advertisement(parsed)
+    first = device.data
+
+    # Unchanged values and missing readings keep the data as is
+    assert not device._update_parsed_data({"temp": 21, "battery": None})
+    assert device.data is first
+
+    # Changes never touch data handed out before
+    assert device._update_parsed_data({"temp": 22})
+    second = device.data
+    assert second is not first
+    assert device._update_parsed_data({"temp": 23, "humidity": None})
+    assert device.parsed_data == {"temp": 23, "battery": 80, "humidity": None}
+    assert device.data["model"] == "T"
+    assert first == {"data": {"temp": 21, "battery": 80}, "model": "T"}
+    assert second == {"data": {"temp": 22, "battery": 80}, "model": "T"}
+    assert parsed.data is first
+
+    # A repeated payload is not merged again
+    repeated = SwitchBotAdvertisement(
+        ADDRESS, {"data": {"temp": 30}}, ble_device, -70, raw_payload=(b"a",)
+    )
+    device.update_from_advertisement(repeated)
+    device._update_parsed_data({"temp": 24})
+    device.update_from_advertisement(repeated)
+    assert device.parsed_data["temp"] == 30
+    with patch("switchbot.devices.device._merge_data") as merge_data:
+        device.update_from_advertisement(
+            SwitchBotAdvertisement(
+                ADDRESS, {"data": {"temp": 30}}, ble_device, -70, raw_payload=(b"a",)
+            )
+        )
+    merge_data.assert_not_called()
+
+
+def test_advertisement_changed_uses_last_merged_payload():
+    ble_device = generate_ble_device(ADDRESS, "any")
+    curtain = SwitchbotCurtain(ble_device)
+
+    def _advertisement(payload: bytes, data: dict) -> SwitchBotAdvertisement:
+        return SwitchBotAdvertisement(
+            ADDRESS,
+            {"data": data, "model": "c"},
+            ble_device,
+            -70,
+            raw_payload=(payload,),
+        )
+
+    curtain.update_from_advertisement(
+        _advertisement(b"a", {"position": 50, "battery": 90, "inMotion": False})
+    )
+    moved = _advertisement(b"b", {"position": 30, "battery": None, "inMotion": False})
+    assert curtain.advertisement_changed(moved)
+    curtain.update_from_advertisement(moved)
+    assert curtain.get_battery_percent() == 90
+
+    repeated = _advertisement(
+        b"b", {"position": 30, "battery": None, "inMotion": False}
+    )
+    assert not curtain.advertisement_changed(repeated)
+
+    # Data merged from elsewhere is not described by the payload
+    curtain._update_parsed_data({"position": 10})
+    assert curtain.advertisement_changed(repeated)
+
+
+@pytest.mark.asyncio
+async def test_get_device_data_resets_last_merged_payload():
+    ble_device = generate_ble_device(ADDRESS, "any")
+    scanner = MagicMock(is_running=True)
+    bot = Switchbot(ble_device, scanner=scanner)
+
+    def _advertisement(payload: bytes, is_on: bool) -> SwitchBotAdvertisement:
+        return SwitchBotAdvertisement(
+            ADDRESS,
+            {"data": {"isOn": is_on, "switchMode": True}, "model": "H"},
+            ble_device,
+            -70,
+            raw_payload=(payload,),
+        )
+
+    bot.update_from_advertisement(_advertisement(b"on", True))
+    bot.update_from_advertisement(_advertisement(b"off", False))
+    scanner.get_advertisement.return_value = _advertisement(b"on", True)
+    await bot.get_device_data()
+    assert bot.is_on()
+
+    off_again = _advertisement(b"off", False)
+    assert bot.advertisement_changed(off_again)
+    bot.update_from_advertisement(off_again)
+    assert not bot.is_on()
+
+
+@pytest.mark.asyncio
+async def test_prepare_holds_connection_for_window():
+    curtain = make_curtain(keep_alive=KeepAlivePolicy(default_delay=3.0))
+    client = MagicMock()
+    client.start_notify = AsyncMock()
+    client.is_connected = True
+    with patch(
+        "switchbot.devices.device.establish_connection", return_value=client
+    ) as establish:
+        await curtain.prepare(window=30.0)
+        client.start_notify.assert_awaited_once()
+        # A command within the window does not shorten it
+        await curtain._ensure_connected()
+    establish.assert_called_once()
+    remaining = curtain._disconnect_timer.when() - curtain.loop.time()
+    assert 29.0 < remaining <= 30.0
+
+    # Once the window is over the keep alive delay applies again
+    curtain._prepared_until = 0.0
+    await curtain._ensure_connected()
+    remaining = curtain._disconnect_timer.when() - curtain.loop.time()
+    assert remaining <= 3.0
+    curtain._cancel_disconnect_timer()
+
+
+@pytest.mark.asyncio
+async def test_lock_prepare_initializes_encryption():
+    lock = SwitchbotLock(generate_ble_device(ADDRESS, "any"), "ff", "00" * 16)
+    lock._ensure_connected = AsyncMock()
+    lock._send_command = AsyncMock(return_value=b"\x01\x00\x00\x00" + b"\x0a" * 16)
+    await lock.prepare()
+    lock._send_command.assert_awaited_once_with("570f2103ff", encrypt=False)
+    assert lock._iv == b"\x0a" * 16
+    # The IV is reused by the next command
+    await lock.prepare()
+    lock._send_command.assert_awaited_once()
+    lock._cancel_disconnect_timer()
+
+    lock._iv = None
+    lock._send_command = AsyncMock(return_value=b"\x00")
+    with pytest.raises(SwitchbotOperationError):
+        await lock.prepare()
+    lock._cancel_disconnect_timer()
+
+
+class _OperationsDevice(SwitchbotDevice):
+    """Device with nested operations."""
+
+    @update_after_operation
+    async def inner(self) -> bool:
+        return True
+
+    @update_after_operation
+    async def outer(self) -> bool:
+        return await self.inner() and await self.inner()
+
+
+@pytest.mark.asyncio
+async def test_update_after_operation_skips_nested_operations():
+    device = _OperationsDevice(generate_ble_device(ADDRESS, "any"))
+    device.update = AsyncMock()
+    assert await device.outer()
+    device.update.assert_awaited_once()
+
+    # Concurrent operations are not nested
+    device.update.reset_mock()
+    await asyncio.gather(device.inner(), device.inner())
+    assert device.update.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_update_after_operation_debounces_bursts():
+    class _DebouncedDevice(_OperationsDevice):
+        update_after_operation_delay = 0.01
+
+    device = _DebouncedDevice(generate_ble_device(ADDRESS, "any"))
+    device.update = AsyncMock()
+    for _ in range(3):
+        assert await device.inner()
+    device.update.assert_not_awaited()
+    await asyncio.sleep(0.05)
+    device.update.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_bot_skips_update_when_state_known():
+    bot = Switchbot(generate_ble_device(ADDRESS, "any"))
+    bot.update_from_advertisement(
+        SwitchBotAdvertisement(ADDRESS, {"data": {}, "model": "H"}, bot._device, -70)
+    )
+    bot.update = AsyncMock()
+    bot._send_command = AsyncMock(return_value=b"\x01")
+    assert await bot.turn_on()
+    assert bot.is_on()
+    bot.update.assert_not_awaited()
+    assert await bot.press()
+    bot.update.assert_awaited_once()
+
+    # A failed command says nothing about the state
+    bot.update.reset_mock()
+    bot._send_command = AsyncMock(return_value=b"\x07")
+    assert not await bot.turn_off()
+    bot.update.assert_awaited_once()
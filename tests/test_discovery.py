@@ -0,0 +1,300 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bleak.exc import BleakError
+
+from switchbot import (
+    GetSwitchbotDevices,
+    SwitchbotDeviceRegistry,
+    SwitchbotModel,
+    SwitchbotScanner,
+    parse_advertisement_data,
+)
+from switchbot.devices.curtain import SwitchbotCurtain
+from switchbot.discovery import get_adapter_lock
+
+from .test_adv_parser import generate_advertisement_data, generate_ble_device
+
+CURTAIN_ADDRESS = "aa:bb:cc:dd:ee:ff"
+
+
+def make_curtain_advertisement(battery: int = 88):
+    """Return a curtain BLEDevice and its advertisement data."""
+    return generate_ble_device(CURTAIN_ADDRESS, "any"), generate_advertisement_data(
+        manufacturer_data={2409: b"\xe7\xabF\xac\x8f\x92|\x0f\x00\x11\x04"},
+        service_data={
+            "0000fd3d-0000-1000-8000-00805f9b34fb": bytes([0x63, 0xC0, battery])
+            + b"\x00\x11\x04"
+        },
+        rssi=-80,
+    )
+
+
+@pytest.fixture
+def mock_bleak_scanner():
+    """Patch the bleak scanner used for discovery."""
+    with patch("switchbot.discovery.bleak.BleakScanner") as scanner_cls:
+        scanner = MagicMock()
+        scanner.start = AsyncMock()
+        scanner.stop = AsyncMock()
+        scanner_cls.return_value = scanner
+        yield scanner_cls
+
+
+@pytest.fixture
+def short_scan_timeout():
+    """Shorten the default scan timeout of discover."""
+    retry, _ = GetSwitchbotDevices.discover.__defaults__
+    with patch.object(GetSwitchbotDevices.discover, "__defaults__", (retry, 0.01)):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_scanner_keeps_latest_advertisements(mock_bleak_scanner):
+    scanner = SwitchbotScanner()
+    async with scanner:
+        assert scanner.is_running
+        mock_bleak_scanner.assert_called_once()
+        scanner.detection_callback(*make_curtain_advertisement(88))
+        scanner.detection_callback(*make_curtain_advertisement(87))
+        scanner.detection_callback(
+            generate_ble_device("11:22:33:44:55:66", "other"),
+            generate_advertisement_data(),
+        )
+        snapshot = scanner.snapshot()
+    assert not scanner.is_running
+    assert list(snapshot) == [CURTAIN_ADDRESS]
+    assert snapshot[CURTAIN_ADDRESS].data["data"]["battery"] == 87
+    assert scanner.get_advertisement(CURTAIN_ADDRESS) is snapshot[CURTAIN_ADDRESS]
+
+
+@pytest.mark.asyncio
+async def test_scanner_wait_for_advertisement(mock_bleak_scanner):
+    scanner = SwitchbotScanner()
+    await scanner.start()
+    waiters = [
+        asyncio.create_task(scanner.wait_for_advertisement(CURTAIN_ADDRESS))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    scanner.detection_callback(*make_curtain_advertisement())
+    results = await asyncio.gather(*waiters)
+    assert all(result is results[0] for result in results)
+    assert results[0].address == CURTAIN_ADDRESS
+    assert await scanner.wait_for_advertisement(CURTAIN_ADDRESS, 0.01) is None
+    assert not scanner._waiters
+    await scanner.stop()
+
+
+@pytest.mark.asyncio
+async def test_device_data_from_shared_scanner(mock_bleak_scanner):
+    scanner = SwitchbotScanner()
+    await scanner.start()
+    scanner.detection_callback(*make_curtain_advertisement())
+    curtain = SwitchbotCurtain(generate_ble_device(CURTAIN_ADDRESS, "any"), scanner=scanner)
+    with patch("switchbot.devices.device.GetSwitchbotDevices") as discovery:
+        advertisement = await curtain.get_device_data()
+    discovery.assert_not_called()
+    assert advertisement is scanner.get_advertisement(CURTAIN_ADDRESS)
+    mock_bleak_scanner.assert_called_once()
+    await scanner.stop()
+
+
+@pytest.mark.asyncio
+async def test_scanner_concurrent_start_starts_once(mock_bleak_scanner):
+    scanner = SwitchbotScanner()
+    await asyncio.gather(scanner.start(), scanner.start())
+    mock_bleak_scanner.assert_called_once()
+    mock_bleak_scanner.return_value.start.assert_awaited_once()
+    await asyncio.gather(scanner.stop(), scanner.stop())
+    mock_bleak_scanner.return_value.stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_scanner_stops_started_adapters_when_one_fails():
+    scanners = {}
+
+    def _make_scanner(detection_callback, adapter):
+        scanner = scanners[adapter] = MagicMock()
+        scanner.start = AsyncMock(
+            side_effect=BleakError("busy") if adapter == "hci1" else None
+        )
+        scanner.stop = AsyncMock()
+        return scanner
+
+    with patch("switchbot.discovery.bleak.BleakScanner", side_effect=_make_scanner):
+        scanner = SwitchbotScanner(interfaces=[0, 1])
+        with pytest.raises(BleakError):
+            await scanner.start()
+        assert not scanner.is_running
+        scanners["hci0"].stop.assert_awaited_once()
+        scanners["hci1"].stop.assert_not_awaited()
+
+        discovery = GetSwitchbotDevices(interfaces=[0, 1])
+        with pytest.raises(BleakError):
+            await discovery.discover(scan_timeout=0.01)
+        scanners["hci0"].stop.assert_awaited_once()
+        assert not get_adapter_lock("hci0").locked()
+
+
+@pytest.mark.asyncio
+async def test_discover_stops_scanning_when_cancelled(mock_bleak_scanner):
+    task = asyncio.create_task(GetSwitchbotDevices().discover(scan_timeout=30))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    mock_bleak_scanner.return_value.stop.assert_awaited_once()
+    assert not get_adapter_lock("hci0").locked()
+
+
+def feed_on_start(mock_bleak_scanner, *advertisements):
+    """Make the mocked scanner report advertisements once started."""
+
+    async def _start():
+        callback = mock_bleak_scanner.call_args.kwargs["detection_callback"]
+        for advertisement in advertisements:
+            callback(*advertisement)
+
+    mock_bleak_scanner.return_value.start.side_effect = _start
+
+
+@pytest.mark.asyncio
+async def test_discover_returns_when_address_seen(mock_bleak_scanner):
+    feed_on_start(mock_bleak_scanner, make_curtain_advertisement())
+    discovery = GetSwitchbotDevices()
+    data = await asyncio.wait_for(
+        discovery.discover(scan_timeout=30, addresses=[CURTAIN_ADDRESS]), 1
+    )
+    assert list(data) == [CURTAIN_ADDRESS]
+    mock_bleak_scanner.return_value.stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_discover_returns_when_models_seen(mock_bleak_scanner):
+    feed_on_start(mock_bleak_scanner, make_curtain_advertisement())
+    discovery = GetSwitchbotDevices()
+    curtains = await asyncio.wait_for(discovery.get_curtains(count=1), 1)
+    assert list(curtains) == [CURTAIN_ADDRESS]
+
+    feed_on_start(mock_bleak_scanner, make_curtain_advertisement())
+    data = await asyncio.wait_for(
+        GetSwitchbotDevices().discover(scan_timeout=30, models=[SwitchbotModel.CURTAIN]), 1
+    )
+    assert list(data) == [CURTAIN_ADDRESS]
+
+
+@pytest.mark.asyncio
+async def test_discover_waits_for_scan_timeout_without_match(mock_bleak_scanner):
+    feed_on_start(mock_bleak_scanner, make_curtain_advertisement())
+    discovery = GetSwitchbotDevices()
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(
+            discovery.discover(scan_timeout=30, addresses=["11:22:33:44:55:66"]),
+            0.05,
+        )
+    data = await discovery.discover(scan_timeout=0.01, models=["o"], count=1)
+    assert list(data) == [CURTAIN_ADDRESS]
+
+
+@pytest.mark.asyncio
+async def test_get_devices_scans_again_after_early_exit(
+    mock_bleak_scanner, short_scan_timeout
+):
+    feed_on_start(mock_bleak_scanner, make_curtain_advertisement())
+    start = mock_bleak_scanner.return_value.start
+    discovery = GetSwitchbotDevices()
+    await asyncio.wait_for(discovery.discover(addresses=[CURTAIN_ADDRESS]), 1)
+    assert start.await_count == 1
+
+    # Enough curtains were seen by the early exit scan
+    assert list(await discovery.get_curtains(count=1)) == [CURTAIN_ADDRESS]
+    assert start.await_count == 1
+
+    # The registry only holds what the early exit scan saw
+    assert await discovery.get_locks() == {}
+    assert start.await_count == 2
+
+    # A full scan saw every device
+    assert await discovery.get_locks() == {}
+    assert await discovery.get_bots(count=1) == {}
+    assert start.await_count == 2
+
+
+def test_registry_indexes_by_model_and_address():
+    registry = SwitchbotDeviceRegistry()
+    curtain = parse_advertisement_data(*make_curtain_advertisement())
+    registry.update(curtain)
+    assert registry.get(CURTAIN_ADDRESS) is curtain
+    assert registry.get(CURTAIN_ADDRESS.upper()) is curtain
+    assert CURTAIN_ADDRESS in registry
+    assert registry.get_by_models(("c", "{")) == {CURTAIN_ADDRESS: curtain}
+    assert registry.get_by_model_name(SwitchbotModel.CURTAIN) == {
+        CURTAIN_ADDRESS: curtain
+    }
+
+    bot = curtain.with_data({"model": "H", "modelName": SwitchbotModel.BOT})
+    registry.update(bot)
+    assert registry.get_by_models(("c",)) == {}
+    assert registry.get_by_model_name(SwitchbotModel.CURTAIN) == {}
+    assert registry.get_by_models(("H",)) == {CURTAIN_ADDRESS: bot}
+    assert len(registry) == 1
+
+    registry.remove(CURTAIN_ADDRESS)
+    assert not registry
+    assert registry.get_by_models(("H",)) == {}
+
+
+@pytest.mark.asyncio
+async def test_get_device_data_by_address(mock_bleak_scanner, short_scan_timeout):
+    feed_on_start(mock_bleak_scanner, make_curtain_advertisement())
+    discovery = GetSwitchbotDevices()
+    data = await asyncio.wait_for(discovery.get_device_data(CURTAIN_ADDRESS), 1)
+    assert list(data) == [CURTAIN_ADDRESS]
+    assert await discovery.get_device_data(CURTAIN_ADDRESS) == data
+    mock_bleak_scanner.assert_called_once()
+    # The address lookup stopped early, listing devices needs a full scan
+    assert await discovery.get_curtains() == data
+    assert await discovery.get_bots() == {}
+    assert mock_bleak_scanner.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_discover_merges_multiple_adapters():
+    ble_device, adv_data = make_curtain_advertisement()
+    nearby_adv_data = generate_advertisement_data(
+        manufacturer_data=adv_data.manufacturer_data,
+        service_data=adv_data.service_data,
+        rssi=-50,
+    )
+    heard_by = {"hci1": adv_data, "hci2": nearby_adv_data}
+
+    def _make_scanner(detection_callback, adapter):
+        async def _start():
+            detection_callback(ble_device, heard_by[adapter])
+
+        scanner = MagicMock()
+        scanner.start = AsyncMock(side_effect=_start)
+        scanner.stop = AsyncMock()
+        return scanner
+
+    discovery = GetSwitchbotDevices(interfaces=[2, 1])
+    with patch(
+        "switchbot.discovery.bleak.BleakScanner", side_effect=_make_scanner
+    ) as scanner_cls:
+        # Scans of other adapters do not hold these adapters back
+        async with get_adapter_lock("hci0"):
+            data = await asyncio.wait_for(
+                discovery.discover(scan_timeout=30, addresses=[CURTAIN_ADDRESS]), 1
+            )
+
+    assert [call.kwargs["adapter"] for call in scanner_cls.call_args_list] == [
+        "hci1",
+        "hci2",
+    ]
+    assert data[CURTAIN_ADDRESS].rssi == -50
+    assert data[CURTAIN_ADDRESS].data["data"]["battery"] == 88
+    assert discovery.registry.get_adapters(CURTAIN_ADDRESS) == ["hci2", "hci1"]
+    sightings = discovery.registry.get_sightings(CURTAIN_ADDRESS)
+    assert [sighting.rssi for sighting in sightings] == [-50, -80]
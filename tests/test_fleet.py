@@ -0,0 +1,153 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from switchbot import (
+    ConnectionScheduler,
+    FleetCommand,
+    FleetController,
+    SwitchBotAdvertisement,
+    get_connection_scheduler,
+    set_connection_scheduler,
+)
+from switchbot.devices.curtain import SwitchbotCurtain
+
+from .test_adv_parser import generate_ble_device
+
+
+async def _hang():
+    await asyncio.sleep(10)
+
+
+def make_curtain(address: str) -> SwitchbotCurtain:
+    return SwitchbotCurtain(generate_ble_device(address, "any"))
+
+
+@pytest.mark.asyncio
+async def test_fleet_runs_devices_concurrently_and_commands_in_order():
+    first = make_curtain("AA:BB:CC:DD:EE:01")
+    second = make_curtain("AA:BB:CC:DD:EE:02")
+    events = []
+    running = set()
+    overlapped = asyncio.Event()
+
+    def _operation(device, name):
+        async def _run(*args):
+            events.append((device.get_address(), name, args))
+            running.add(device.get_address())
+            if len(running) == 2:
+                overlapped.set()
+            await asyncio.wait_for(overlapped.wait(), 1)
+            return name
+
+        return AsyncMock(side_effect=_run)
+
+    for device in (first, second):
+        device.close = _operation(device, "close")
+        device.set_position = _operation(device, "set_position")
+
+    results = await FleetController().run(
+        [
+            (first, "close"),
+            (second, "close"),
+            FleetCommand(first, "set_position", (50,)),
+        ]
+    )
+    assert [result.result for result in results] == [
+        "close",
+        "close",
+        "set_position",
+    ]
+    assert all(result.ok for result in results)
+    first_events = [event for event in events if event[0] == "AA:BB:CC:DD:EE:01"]
+    assert first_events == [
+        ("AA:BB:CC:DD:EE:01", "close", ()),
+        ("AA:BB:CC:DD:EE:01", "set_position", (50,)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fleet_returns_partial_results():
+    fast = make_curtain("AA:BB:CC:DD:EE:01")
+    failing = make_curtain("AA:BB:CC:DD:EE:02")
+    slow = make_curtain("AA:BB:CC:DD:EE:03")
+    fast.close = AsyncMock(return_value=True)
+    failing.close = AsyncMock(side_effect=ValueError("bad"))
+    slow.close = AsyncMock(side_effect=_hang)
+    slow.open = AsyncMock(return_value=True)
+
+    results = await FleetController(deadline=5.0, device_deadline=0.01).run(
+        [(fast, "close"), (failing, "close"), (slow, "close"), (slow, "open")]
+    )
+    assert results[0].ok and results[0].result is True
+    assert isinstance(results[1].error, ValueError)
+    assert isinstance(results[2].error, asyncio.TimeoutError)
+    assert isinstance(results[3].error, asyncio.TimeoutError)
+    slow.open.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_fleet_deadline_bounds_the_run():
+    slow = make_curtain("AA:BB:CC:DD:EE:01")
+    slow.close = AsyncMock(side_effect=_hang)
+    results = await asyncio.wait_for(
+        FleetController(deadline=0.01).run([(slow, "close")]), 1
+    )
+    assert isinstance(results[0].error, asyncio.TimeoutError)
+
+
+@pytest.mark.asyncio
+async def test_fleet_rejects_unknown_operations():
+    with pytest.raises(ValueError):
+        await FleetController().run([(make_curtain("AA:BB:CC:DD:EE:01"), "fly")])
+
+
+@pytest.mark.asyncio
+async def test_fleet_runs_more_devices_than_connection_slots():
+    original = get_connection_scheduler()
+    scheduler = ConnectionScheduler(slots_per_adapter=3)
+    set_connection_scheduler(scheduler)
+    curtains = []
+    for idx in range(6):
+        address = f"AA:BB:CC:DD:EE:0{idx}"
+        curtain = make_curtain(address)
+        curtain.update_from_advertisement(
+            SwitchBotAdvertisement(
+                address,
+                {"data": {"position": 50, "inMotion": False}, "model": "c"},
+                generate_ble_device(address, "any"),
+                -70,
+            )
+        )
+        curtains.append(curtain)
+
+    def _client(*args, **kwargs):
+        client = MagicMock()
+        client.start_notify = AsyncMock()
+        client.disconnect = AsyncMock()
+
+        async def _write_gatt_char(char, command, response):
+            for curtain in curtains:
+                if curtain._client is client:
+                    asyncio.get_running_loop().call_soon(
+                        curtain._notification_handler, 0, bytearray(b"\x01" * 16)
+                    )
+
+        client.write_gatt_char = AsyncMock(side_effect=_write_gatt_char)
+        return client
+
+    try:
+        with patch(
+            "switchbot.devices.device.establish_connection", side_effect=_client
+        ):
+            results = await FleetController(deadline=2).run(
+                [(curtain, "stop") for curtain in curtains]
+            )
+        assert [result.error for result in results] == [None] * 6
+        assert [result.result for result in results] == [True] * 6
+        assert scheduler.get_stats("hci0").reclaimed == 3
+    finally:
+        for curtain in curtains:
+            curtain._cancel_disconnect_timer()
+        set_connection_scheduler(original)
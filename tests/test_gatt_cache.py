@@ -0,0 +1,150 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from switchbot import (
+    CharacteristicHandles,
+    GattHandleCache,
+    SwitchBotAdvertisement,
+    get_gatt_handle_cache,
+    set_gatt_handle_cache,
+)
+from switchbot.devices.device import (
+    READ_CHAR_UUID,
+    WRITE_CHAR_UUID,
+    CharacteristicMissingError,
+    SwitchbotDevice,
+)
+
+from .test_adv_parser import generate_ble_device
+
+ADDRESS = "aa:bb:cc:dd:ee:ff"
+
+
+@pytest.fixture
+def gatt_cache(tmp_path):
+    """Install a GATT handle cache for the test."""
+    original = get_gatt_handle_cache()
+    cache = GattHandleCache(tmp_path / "gatt.json")
+    set_gatt_handle_cache(cache)
+    yield cache
+    set_gatt_handle_cache(original)
+
+
+def make_services(handles: dict[int, str]) -> MagicMock:
+    """Return services with characteristics of the given handles and UUIDs."""
+    characteristics = {}
+    for handle, uuid in handles.items():
+        characteristic = MagicMock(handle=handle, uuid=uuid)
+        characteristics[handle] = characteristics[uuid] = characteristic
+
+    services = MagicMock()
+    services.get_characteristic.side_effect = lambda specifier: characteristics.get(
+        specifier if isinstance(specifier, int) else str(specifier)
+    )
+    return services
+
+
+def make_device(firmware: float = 1.0) -> SwitchbotDevice:
+    ble_device = generate_ble_device(ADDRESS, "any")
+    device = SwitchbotDevice(ble_device)
+    device.update_from_advertisement(
+        SwitchBotAdvertisement(
+            ADDRESS, {"data": {"firmware": firmware}}, ble_device, -70
+        )
+    )
+    return device
+
+
+def test_gatt_handle_cache_persists_by_address_and_firmware(tmp_path):
+    path = tmp_path / "gatt.json"
+    cache = GattHandleCache(path)
+    assert cache.get(ADDRESS, 1.0) is None
+    cache.set(ADDRESS, 1.0, CharacteristicHandles(read=16, write=13))
+
+    reloaded = GattHandleCache(path)
+    assert reloaded.get(ADDRESS.upper(), 1.0) == CharacteristicHandles(16, 13)
+    assert reloaded.get(ADDRESS, 1.1) is None
+    assert len(reloaded) == 1
+
+    reloaded.remove(ADDRESS)
+    assert GattHandleCache(path).get(ADDRESS, 1.0) is None
+
+
+def test_gatt_handle_cache_ignores_unreadable_file(tmp_path):
+    path = tmp_path / "gatt.json"
+    path.write_text("not json")
+    cache = GattHandleCache(path)
+    assert cache.get(ADDRESS, 1.0) is None
+    cache.set(ADDRESS, 1.0, CharacteristicHandles(16, 13))
+    assert GattHandleCache(path).get(ADDRESS, 1.0) == CharacteristicHandles(16, 13)
+
+
+def test_resolve_characteristics_uses_cached_handles(gatt_cache):
+    services = make_services({16: str(READ_CHAR_UUID), 13: str(WRITE_CHAR_UUID)})
+    device = make_device()
+    device._resolve_characteristics(services)
+    assert gatt_cache.get(ADDRESS, 1.0) == CharacteristicHandles(16, 13)
+
+    services.get_characteristic.reset_mock()
+    make_device()._resolve_characteristics(services)
+    assert [call.args[0] for call in services.get_characteristic.call_args_list] == [
+        16,
+        13,
+    ]
+
+
+def test_resolve_characteristics_replaces_stale_handles(gatt_cache):
+    gatt_cache.set(ADDRESS, 1.0, CharacteristicHandles(16, 13))
+    device = make_device()
+    device._resolve_characteristics(
+        make_services({20: str(READ_CHAR_UUID), 17: str(WRITE_CHAR_UUID)})
+    )
+    assert device._read_char.handle == 20
+    assert gatt_cache.get(ADDRESS, 1.0) == CharacteristicHandles(20, 17)
+
+    with pytest.raises(CharacteristicMissingError):
+        device._resolve_characteristics(make_services({}))
+    assert gatt_cache.get(ADDRESS, 1.0) is None
+
+
+def test_resolve_characteristics_before_firmware_is_known(gatt_cache):
+    gatt_cache.set(ADDRESS, 6.3, CharacteristicHandles(16, 13))
+    services = make_services({16: str(READ_CHAR_UUID), 13: str(WRITE_CHAR_UUID)})
+
+    # Right after a restart the firmware is not known until get_basic_info
+    device = SwitchbotDevice(generate_ble_device(ADDRESS, "any"))
+    device._resolve_characteristics(services)
+    assert [call.args[0] for call in services.get_characteristic.call_args_list] == [
+        16,
+        13,
+    ]
+    assert gatt_cache._entries[ADDRESS.upper()]["firmware"] == 6.3
+
+    # Handles of other firmware are looked up again
+    services.get_characteristic.reset_mock()
+    make_device(firmware=6.4)._resolve_characteristics(services)
+    assert [call.args[0] for call in services.get_characteristic.call_args_list] == [
+        READ_CHAR_UUID,
+        WRITE_CHAR_UUID,
+    ]
+    assert gatt_cache._entries[ADDRESS.upper()]["firmware"] == 6.4
+
+
+@pytest.mark.asyncio
+async def test_gatt_handle_cache_writes_in_background(tmp_path):
+    path = tmp_path / "gatt.json"
+    cache = GattHandleCache(path)
+    set_gatt_handle_cache(cache)
+    try:
+        with patch("switchbot.gatt_cache.open", wraps=open, create=True) as mock_open:
+            cache.set(ADDRESS, 1.0, CharacteristicHandles(16, 13))
+            cache.set("11:22:33:44:55:66", 1.0, CharacteristicHandles(20, 17))
+            mock_open.assert_not_called()
+            await cache.async_flush()
+        assert mock_open.call_count == 1
+        reloaded = GattHandleCache(path)
+        assert reloaded.get(ADDRESS) == CharacteristicHandles(16, 13)
+        assert len(reloaded) == 2
+    finally:
+        set_gatt_handle_cache(None)
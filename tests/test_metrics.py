@@ -0,0 +1,124 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bleak.exc import BleakDBusError
+
+from switchbot import (
+    ConnectionScheduler,
+    DeviceMetrics,
+    Histogram,
+    RetryPolicy,
+    format_prometheus,
+    get_connection_scheduler,
+    set_connection_scheduler,
+)
+
+from .test_device import make_adapter_advertisement, make_curtain
+
+
+@pytest.fixture(autouse=True)
+def connection_scheduler():
+    """Give every test its own connection scheduler."""
+    original = get_connection_scheduler()
+    set_connection_scheduler(ConnectionScheduler())
+    yield
+    set_connection_scheduler(original)
+
+
+def test_histogram_buckets():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.cumulative_counts() == [2, 3, 4]
+    assert histogram.count == 4
+    assert histogram.mean == pytest.approx(2.65 / 4)
+    assert Histogram().mean is None
+
+
+def test_format_prometheus():
+    metrics = DeviceMetrics("AA:BB:CC:DD:EE:FF", latency_buckets=(0.5, 1.0))
+    metrics.record_connect("hci0", 0.75)
+    metrics.timeouts += 2
+    text = metrics.as_prometheus()
+    lines = text.splitlines()
+    assert "# TYPE switchbot_timeouts_total counter" in lines
+    assert 'switchbot_timeouts_total{address="AA:BB:CC:DD:EE:FF"} 2' in lines
+    assert (
+        'switchbot_adapter_connects_total{address="AA:BB:CC:DD:EE:FF",adapter="hci0"} 1'
+        in lines
+    )
+    assert "# TYPE switchbot_connect_seconds histogram" in lines
+    assert 'switchbot_connect_seconds_bucket{address="AA:BB:CC:DD:EE:FF",le="0.5"} 0' in (
+        lines
+    )
+    assert 'switchbot_connect_seconds_bucket{address="AA:BB:CC:DD:EE:FF",le="1.0"} 1' in (
+        lines
+    )
+    assert 'switchbot_connect_seconds_bucket{address="AA:BB:CC:DD:EE:FF",le="+Inf"} 1' in (
+        lines
+    )
+    assert 'switchbot_connect_seconds_count{address="AA:BB:CC:DD:EE:FF"} 1' in lines
+
+    other = DeviceMetrics('11:22:"3')
+    text = format_prometheus([metrics, other])
+    assert text.count("# TYPE switchbot_timeouts_total counter") == 1
+    assert 'switchbot_timeouts_total{address="11:22:\\"3"} 0' in text.splitlines()
+
+
+@pytest.mark.asyncio
+async def test_device_records_metrics():
+    curtain = make_curtain(retry_policy=RetryPolicy(base_delay=0.0, jitter=0.0))
+    heard = make_adapter_advertisement("hci1", -65)
+    curtain._sightings.update("hci1", heard.rssi, heard.device)
+
+    client = MagicMock()
+    client.start_notify = AsyncMock()
+    client.disconnect = AsyncMock()
+
+    async def _write_gatt_char(char, command, response):
+        if client.write_gatt_char.await_count == 1:
+            raise BleakDBusError("org.bluez.Error.Failed", [])
+        loop = asyncio.get_running_loop()
+        loop.call_soon(curtain._notification_handler, 0, bytearray(b"\x01"))
+
+    client.write_gatt_char = AsyncMock(side_effect=_write_gatt_char)
+    with patch("switchbot.devices.device.establish_connection", return_value=client):
+        assert await curtain._send_command("570f01", retry=1) == b"\x01"
+    curtain._cancel_disconnect_timer()
+
+    metrics = curtain.metrics
+    assert metrics.commands == 1
+    assert metrics.retries == 1
+    assert metrics.dbus_errors == 1
+    assert metrics.connects == 2
+    assert metrics.connects_by_adapter == {"hci1": 2}
+    assert metrics.connect_time.count == 2
+    assert metrics.command_time.count == 1
+    assert metrics.lock_wait_time.count == 1
+    assert metrics.rssi.count == 1
+    assert metrics.rssi.sum == -65
+
+    curtain._disconnected(client)
+    assert metrics.unexpected_disconnects == 1
+
+
+@pytest.mark.asyncio
+async def test_connect_time_excludes_slot_wait():
+    scheduler = ConnectionScheduler(slots_per_adapter=1)
+    set_connection_scheduler(scheduler)
+    curtain = make_curtain()
+    holder = await scheduler.acquire("hci0")
+    client = MagicMock()
+    client.start_notify = AsyncMock()
+    with patch("switchbot.devices.device.establish_connection", return_value=client):
+        connect = asyncio.create_task(curtain._ensure_connected())
+        await asyncio.sleep(0.2)
+        holder.release()
+        await connect
+    curtain._cancel_disconnect_timer()
+
+    assert curtain.metrics.connect_time.count == 1
+    assert curtain.metrics.connect_time.sum < 0.1
+    assert scheduler.get_stats("hci0").max_wait >= 0.2
@@ -0,0 +1,103 @@
+from unittest.mock import patch
+
+import pytest
+
+from switchbot import (
+    LRUParseCache,
+    PerAddressParseCache,
+    TTLParseCache,
+    get_parse_cache,
+    parse_advertisement_data,
+    set_parse_cache,
+)
+from switchbot.parse_cache import DEFAULT_PER_ADDRESS_CACHE_SIZE, MISSING
+
+from .test_adv_parser import generate_advertisement_data, generate_ble_device
+
+SERVICE_UUID = "0000fd3d-0000-1000-8000-00805f9b34fb"
+
+
+@pytest.fixture
+def parse_cache():
+    """Install a fresh parse cache for the test."""
+    original = get_parse_cache()
+    cache = LRUParseCache(maxsize=8)
+    set_parse_cache(cache)
+    yield cache
+    set_parse_cache(original)
+
+
+def test_lru_parse_cache_evicts_least_recently_used():
+    cache = LRUParseCache(maxsize=2)
+    cache.set("a", 1, "one")
+    cache.set("a", 2, "two")
+    assert cache.get("a", 1) == "one"
+    cache.set("a", 3, "three")
+    assert cache.get("a", 2) is MISSING
+    assert cache.get("a", 1) == "one"
+    assert len(cache) == 2
+    assert cache.stats.hits == 2
+    assert cache.stats.misses == 1
+    assert cache.stats.evictions == 1
+    assert cache.stats.hit_rate == pytest.approx(2 / 3)
+
+
+def test_ttl_parse_cache_expires_entries():
+    cache = TTLParseCache(ttl=10)
+    with patch("switchbot.parse_cache.time.monotonic", return_value=100):
+        cache.set("a", 1, "one")
+        assert cache.get("a", 1) == "one"
+    with patch("switchbot.parse_cache.time.monotonic", return_value=111):
+        assert cache.get("a", 1) is MISSING
+    assert len(cache) == 0
+    assert cache.stats.evictions == 1
+
+
+def test_per_address_parse_cache_keeps_one_slot_per_address():
+    cache = PerAddressParseCache()
+    cache.set("a", 1, "one")
+    cache.set("b", 1, "other")
+    assert cache.get("a", 1) == "one"
+    cache.set("a", 2, "two")
+    assert cache.get("a", 1) is MISSING
+    assert cache.get("a", 2) == "two"
+    assert cache.get("b", 1) == "other"
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+
+
+def test_per_address_parse_cache_maxsize():
+    cache = PerAddressParseCache(maxsize=1)
+    cache.set("a", 1, "one")
+    cache.set("b", 1, "other")
+    assert cache.get("a", 1) is MISSING
+    assert len(cache) == 1
+
+    cache = PerAddressParseCache()
+    for idx in range(DEFAULT_PER_ADDRESS_CACHE_SIZE + 1):
+        cache.set(f"address-{idx}", 1, idx)
+    assert len(cache) == DEFAULT_PER_ADDRESS_CACHE_SIZE
+    assert cache.get("address-0", 1) is MISSING
+
+
+def test_parse_cache_key_ignores_mac_address_prefix(parse_cache):
+    """Two curtains in the same state share one cache entry."""
+    service_data = {SERVICE_UUID: b"c\xc0X\x00\x11\x04"}
+    first = parse_advertisement_data(
+        generate_ble_device("aa:bb:cc:dd:ee:ff", "any"),
+        generate_advertisement_data(
+            manufacturer_data={2409: b"\xe7\xabF\xac\x8f\x92|\x0f\x00\x11\x04"},
+            service_data=service_data,
+        ),
+    )
+    second = parse_advertisement_data(
+        generate_ble_device("aa:bb:cc:dd:ee:00", "any"),
+        generate_advertisement_data(
+            manufacturer_data={2409: b"\x00\x00\x00\x00\x00\x00|\x0f\x00\x11\x04"},
+            service_data=service_data,
+        ),
+    )
+    assert first.data == second.data
+    assert parse_cache.stats.misses == 1
+    assert parse_cache.stats.hits == 1
+    assert len(parse_cache) == 1
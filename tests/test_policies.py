@@ -0,0 +1,102 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from bleak.exc import BleakError
+from bleak_retry_connector import BleakNotFoundError
+
+from switchbot import AdaptiveTimeout, KeepAlivePolicy, RetryAction, RetryPolicy
+from switchbot.devices.device import DEFAULT_RETRY_POLICY, CharacteristicMissingError
+
+
+def test_adaptive_timeout_uses_ceiling_until_enough_samples():
+    timeout = AdaptiveTimeout(floor=0.5, ceiling=5.0, margin=0.2, min_samples=3)
+    assert timeout.timeout == 5.0
+    assert timeout.latency is None
+    timeout.record(0.1)
+    timeout.record(0.1)
+    assert timeout.timeout == 5.0
+    timeout.record(0.1)
+    assert timeout.timeout == 0.5
+
+
+def test_adaptive_timeout_tracks_percentile_plus_margin():
+    timeout = AdaptiveTimeout(
+        floor=0.1, ceiling=5.0, margin=0.25, percentile=0.9, min_samples=10
+    )
+    for latency in range(1, 11):
+        timeout.record(latency / 10)
+    assert timeout.samples == 10
+    assert timeout.latency == pytest.approx(0.9)
+    assert timeout.timeout == pytest.approx(1.15)
+
+    for _ in range(10):
+        timeout.record_timeout(timeout.timeout)
+    assert timeout.timeout > 1.15
+    for _ in range(10):
+        timeout.record(60)
+    assert timeout.timeout == 5.0
+
+
+def test_adaptive_timeout_window():
+    timeout = AdaptiveTimeout(floor=0.0, margin=0.0, min_samples=1, window=2)
+    timeout.record(3.0)
+    timeout.record(0.2)
+    timeout.record(0.1)
+    assert timeout.samples == 2
+    assert timeout.timeout == pytest.approx(0.2)
+
+
+def test_adaptive_timeout_rejects_floor_above_ceiling():
+    with pytest.raises(ValueError):
+        AdaptiveTimeout(floor=2.0, ceiling=1.0)
+
+
+def test_retry_policy_classifies_errors():
+    policy = RetryPolicy()
+    assert policy.classify(BleakNotFoundError("gone")) is RetryAction.ABORT
+    assert policy.classify(asyncio.TimeoutError()) is RetryAction.RECONNECT
+    assert policy.classify(BleakError("failed")) is RetryAction.RECONNECT
+    assert policy.classify(ValueError("bug")) is RetryAction.ABORT
+    assert (
+        DEFAULT_RETRY_POLICY.classify(CharacteristicMissingError("rx"))
+        is RetryAction.RECONNECT
+    )
+
+
+def test_retry_policy_backoff_with_jitter():
+    policy = RetryPolicy(base_delay=1.0, max_delay=3.0, multiplier=2.0, jitter=0.5)
+    with patch("switchbot.policies.random.random", return_value=0.0):
+        assert [policy.delay(attempt) for attempt in range(4)] == [1.0, 2.0, 3.0, 3.0]
+    with patch("switchbot.policies.random.random", return_value=1.0):
+        assert policy.delay(1) == 1.0
+
+
+def _record_commands(policy, gaps):
+    now = 1000.0
+    with patch("switchbot.policies.time.monotonic") as monotonic:
+        for gap in (0.0, *gaps):
+            now += gap
+            monotonic.return_value = now
+            policy.record_command()
+
+
+def test_keep_alive_follows_command_gaps():
+    policy = KeepAlivePolicy(min_delay=2.0, max_delay=30.0, default_delay=8.5)
+    assert policy.delay == 8.5
+    _record_commands(policy, [10.0, 0.1, 12.0, 0.1, 11.0])
+    assert policy.delay == pytest.approx(18.0)
+
+
+def test_keep_alive_drops_rarely_used_connections_early():
+    policy = KeepAlivePolicy(min_delay=2.0, max_delay=30.0)
+    _record_commands(policy, [3600.0, 7200.0, 1800.0])
+    assert policy.delay == 2.0
+
+
+def test_keep_alive_counts_connections():
+    policy = KeepAlivePolicy()
+    policy.record_connection(reused=False)
+    policy.record_connection(reused=True)
+    policy.record_connection(reused=True)
+    assert (policy.connections, policy.reused) == (1, 2)
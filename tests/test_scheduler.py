@@ -0,0 +1,182 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from switchbot import (
+    ConnectionPriority,
+    ConnectionScheduler,
+    SwitchBotAdvertisement,
+    set_connection_scheduler,
+)
+from switchbot.devices.curtain import SwitchbotCurtain
+from switchbot.scheduler import get_connection_scheduler
+
+from .test_adv_parser import generate_ble_device
+
+
+@pytest.mark.asyncio
+async def test_slots_are_limited_per_adapter():
+    scheduler = ConnectionScheduler(slots_per_adapter=1)
+    first = await scheduler.acquire("hci0")
+    other_adapter = await scheduler.acquire("hci1")
+    waiter = asyncio.create_task(scheduler.acquire("hci0"))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    assert scheduler.get_stats("hci0").queued == 1
+
+    first.release()
+    first.release()
+    second = await waiter
+    stats = scheduler.get_stats("hci0")
+    assert (stats.active, stats.queued, stats.granted, stats.waited) == (1, 0, 2, 1)
+    assert stats.max_wait > 0
+    second.release()
+    other_adapter.release()
+    assert scheduler.get_stats("hci0").active == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_is_served_by_priority_then_fifo():
+    scheduler = ConnectionScheduler(slots_per_adapter=1)
+    holder = await scheduler.acquire("hci0")
+    order = []
+
+    async def _request(name, priority):
+        async with await scheduler.acquire("hci0", priority):
+            order.append(name)
+
+    tasks = [
+        asyncio.create_task(_request("meter", ConnectionPriority.LOW)),
+        asyncio.create_task(_request("bot-1", ConnectionPriority.NORMAL)),
+        asyncio.create_task(_request("bot-2", ConnectionPriority.NORMAL)),
+        asyncio.create_task(_request("lock", ConnectionPriority.HIGH)),
+    ]
+    await asyncio.sleep(0)
+    holder.release()
+    await asyncio.gather(*tasks)
+    assert order == ["lock", "bot-1", "bot-2", "meter"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = ConnectionScheduler(slots_per_adapter=1)
+    holder = await scheduler.acquire("hci0")
+    waiter = asyncio.create_task(scheduler.acquire("hci0"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert scheduler.get_stats("hci0").queued == 0
+    holder.release()
+    assert scheduler.get_stats("hci0").active == 0
+
+
+@pytest.mark.asyncio
+async def test_device_holds_slot_while_connected():
+    original = get_connection_scheduler()
+    scheduler = ConnectionScheduler(slots_per_adapter=1)
+    set_connection_scheduler(scheduler)
+    try:
+        ble_device = generate_ble_device("AA:BB:CC:DD:EE:FF", "any")
+        curtain = SwitchbotCurtain(ble_device)
+        curtain.update_from_advertisement(
+            SwitchBotAdvertisement(
+                "AA:BB:CC:DD:EE:FF", {"data": {}, "model": "c"}, ble_device, -70
+            )
+        )
+        client = MagicMock()
+        client.start_notify = AsyncMock()
+        client.disconnect = AsyncMock()
+        with patch(
+            "switchbot.devices.device.establish_connection", return_value=client
+        ):
+            await curtain._ensure_connected()
+        assert scheduler.get_stats("hci0").active == 1
+
+        curtain._cancel_disconnect_timer()
+        await curtain._execute_disconnect()
+        assert scheduler.get_stats("hci0").active == 0
+
+        with patch(
+            "switchbot.devices.device.establish_connection",
+            side_effect=asyncio.TimeoutError,
+        ), pytest.raises(asyncio.TimeoutError):
+            await curtain._ensure_connected()
+        assert scheduler.get_stats("hci0").active == 0
+    finally:
+        set_connection_scheduler(original)
+
+
+@pytest.mark.asyncio
+async def test_idle_slots_are_reclaimed_for_waiting_requests():
+    scheduler = ConnectionScheduler(slots_per_adapter=1)
+    holder = await scheduler.acquire("hci0")
+    reclaim = MagicMock(return_value=False)
+    holder.reclaim = reclaim
+    waiter = asyncio.create_task(scheduler.acquire("hci0"))
+    await asyncio.sleep(0)
+    # The holder is busy
+    reclaim.assert_called_once_with()
+    assert not waiter.done()
+
+    reclaim.side_effect = lambda: holder.release() or True
+    holder.idle()
+    second = await waiter
+    assert reclaim.call_count == 2
+    assert scheduler.get_stats("hci0").reclaimed == 1
+
+    # Idle slots are left alone without waiting requests
+    second.reclaim = MagicMock()
+    second.idle()
+    second.reclaim.assert_not_called()
+    second.release()
+
+
+def make_connected_curtain(address: str) -> SwitchbotCurtain:
+    """Return a curtain that has received an advertisement."""
+    ble_device = generate_ble_device(address, "any")
+    curtain = SwitchbotCurtain(ble_device)
+    curtain.update_from_advertisement(
+        SwitchBotAdvertisement(address, {"data": {}, "model": "c"}, ble_device, -70)
+    )
+    return curtain
+
+
+def make_client() -> MagicMock:
+    client = MagicMock()
+    client.start_notify = AsyncMock()
+    client.disconnect = AsyncMock()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_device_connects_while_other_devices_are_idle():
+    original = get_connection_scheduler()
+    scheduler = ConnectionScheduler()
+    set_connection_scheduler(scheduler)
+    try:
+        curtains = [
+            make_connected_curtain(f"AA:BB:CC:DD:EE:0{idx}") for idx in range(4)
+        ]
+        with patch(
+            "switchbot.devices.device.establish_connection",
+            side_effect=lambda *args, **kwargs: make_client(),
+        ):
+            for curtain in curtains[:3]:
+                await curtain._ensure_connected()
+            assert scheduler.get_stats("hci0").active == 3
+
+            # A device in an operation keeps its connection
+            async with curtains[1]._operation_lock:
+                await asyncio.wait_for(curtains[3]._ensure_connected(), 1)
+
+        assert curtains[3]._client is not None
+        assert curtains[0]._client is None
+        assert curtains[1]._client is not None
+        stats = scheduler.get_stats("hci0")
+        assert (stats.active, stats.reclaimed) == (3, 1)
+        for curtain in curtains:
+            curtain._cancel_disconnect_timer()
+    finally:
+        set_connection_scheduler(original)
@@ -0,0 +1,89 @@
+import pytest
+
+from switchbot.adv_parsers.meter import process_wosensorth
+from switchbot.adv_parsers.plug import process_woplugmini
+
+np = pytest.importorskip("numpy")
+
+from switchbot.adv_parsers.vectorized import (  # noqa: E402
+    decode_woplugmini,
+    decode_wosensorth,
+)
+
+ROWS = 2000
+
+
+def _random_payloads(length: int, seed: int) -> "np.ndarray":
+    """Return random payloads, including rows of zeros."""
+    payloads = np.random.default_rng(seed).integers(
+        0, 256, size=(ROWS, length), dtype=np.uint8
+    )
+    payloads[:10] = 0
+    return payloads
+
+
+def _assert_meter_columns_match(columns, data, mfr_data):
+    for row in range(len(columns["valid"])):
+        expected = process_wosensorth(
+            bytes(data[row]) if data is not None else None,
+            bytes(mfr_data[row]) if mfr_data is not None else None,
+        )
+        assert bool(columns["valid"][row]) is bool(expected)
+        if not expected:
+            continue
+        assert columns["temperature"][row] == expected["temperature"]
+        assert columns["temperature_f"][row] == expected["temp"]["f"]
+        assert bool(columns["fahrenheit"][row]) is expected["fahrenheit"]
+        assert columns["humidity"][row] == expected["humidity"]
+        if columns["battery"] is None:
+            assert expected["battery"] is None
+        else:
+            assert columns["battery"][row] == expected["battery"]
+
+
+def test_decode_wosensorth_service_data():
+    data = _random_payloads(6, 1)
+    _assert_meter_columns_match(decode_wosensorth(data=data), data, None)
+
+
+def test_decode_wosensorth_mfr_data():
+    mfr_data = _random_payloads(11, 2)
+    _assert_meter_columns_match(decode_wosensorth(mfr_data=mfr_data), None, mfr_data)
+
+
+def test_decode_wosensorth_service_and_mfr_data():
+    data = _random_payloads(3, 3)
+    mfr_data = _random_payloads(12, 4)
+    _assert_meter_columns_match(
+        decode_wosensorth(data=data, mfr_data=mfr_data), data, mfr_data
+    )
+
+
+def test_decode_wosensorth_indoor_outdoor_meter_capture():
+    data = np.array([list(b"w\x00\xe4")], dtype=np.uint8)
+    mfr_data = np.array(
+        [list(b"\xaa\xbb\xcc\xdd\xee\xff\xe0\x0f\x06\x985\x00")], dtype=np.uint8
+    )
+    _assert_meter_columns_match(
+        decode_wosensorth(data=data, mfr_data=mfr_data), data, mfr_data
+    )
+
+
+def test_decode_woplugmini():
+    mfr_data = _random_payloads(14, 5)
+    mfr_data[::3, 7] = 0x80
+    columns = decode_woplugmini(mfr_data)
+    for row in range(ROWS):
+        expected = process_woplugmini(None, bytes(mfr_data[row]))
+        assert bool(columns["isOn"][row]) is expected["isOn"]
+        assert columns["wifi_rssi"][row] == expected["wifi_rssi"]
+        assert columns["power"][row] == expected["power"]
+
+
+def test_decode_rejects_bad_shapes():
+    with pytest.raises(ValueError):
+        decode_woplugmini(np.zeros(14, dtype=np.uint8))
+    with pytest.raises(ValueError):
+        decode_woplugmini(np.zeros((2, 11), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        decode_wosensorth()